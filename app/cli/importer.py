@@ -0,0 +1,299 @@
+"""Import recipes from a JSON array or a NDJSON file
+
+    The file is streamed and each record validated as a ``RecipeImport``,
+    the valid ones are inserted in batches by the ``insert_recipes``
+    function of the DB with a bounded number of batches in flight.
+
+        python -m app.cli.importer recipes.ndjson --user <uuid>
+"""
+import io
+import sys
+import json
+import time
+import codecs
+import random
+import asyncio
+import logging
+import argparse
+from pathlib import Path
+from collections.abc import Iterator
+from typing import Any, BinaryIO, TextIO
+
+import httpx
+from pydantic import UUID4
+from pydantic_core import ValidationError
+from supabase._async.client import AsyncClient
+
+from app.logging import logger
+from app.core.settings import settings
+from app.controller import RecipesController
+from app.db import Repository
+from app.schemas.recipes import RecipeImport
+
+CHUNK_SIZE = 1 << 20
+_SEPARATORS = ' \t\n\r,'
+# Characters of a literal cut by the end of a chunk, as -Infinity
+_LOOKAHEAD = 16
+
+
+def _json_array(file: BinaryIO, chunk_size: int = CHUNK_SIZE) -> Iterator[Any]:
+    """Items of a JSON array decoded one at a time, only the chunk of the
+        current item is kept in memory. An item that is not valid JSON
+        stops the reading with its byte offset in the file
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder('utf-8-sig')()
+    head = file.read(chunk_size)
+    # Byte offset of the start of the buffer in the file
+    offset = len(codecs.BOM_UTF8) if head.startswith(codecs.BOM_UTF8) else 0
+    buffer = text.decode(head)
+    position = len(buffer) - len(buffer.lstrip())
+    if not buffer.startswith('[', position):
+        raise ValueError('The file is neither a JSON array nor NDJSON')
+    position += 1
+    error = None
+    while True:
+        while position < len(buffer) and buffer[position] in _SEPARATORS:
+            position += 1
+        if position < len(buffer):
+            if buffer[position] == ']':
+                return
+            try:
+                value, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError as decode_error:
+                error = decode_error
+                # Only an item cut by the end of the chunk is read further
+                if error.pos < len(buffer) - _LOOKAHEAD and not error.msg.startswith('Unterminated string'):
+                    raise ValueError(_invalid(error, offset)) from None
+            else:
+                error = None
+                yield value
+                continue
+        chunk = file.read(chunk_size)
+        if not chunk:
+            raise ValueError(_invalid(error, offset) if error else 'Unterminated JSON array')
+        offset += len(buffer[:position].encode())
+        buffer = buffer[position:] + text.decode(chunk)
+        position = 0
+
+
+def _invalid(error: json.JSONDecodeError, offset: int) -> str:
+    return f'Invalid JSON at byte {offset + len(error.doc[:error.pos].encode())}: {error.msg}'
+
+
+def read_records(file: BinaryIO) -> Iterator[tuple[int, Any]]:
+    """read_records
+        Records of a JSON array or NDJSON file with their position, the
+        item of the array or the line of the file. NDJSON lines are kept
+        as bytes to be validated straight from JSON
+        \f
+        :param file: file opened in binary mode
+    """
+    if not isinstance(file, io.BufferedReader):
+        file = io.BufferedReader(file)
+    if file.peek(CHUNK_SIZE).lstrip(b'\xef\xbb\xbf \t\n\r')[:1] == b'[':
+        yield from enumerate(_json_array(file), 1)
+        return
+    for number, line in enumerate(file, 1):
+        if line.strip():
+            yield number, line
+
+
+class ImportStats:
+    """Counters of the progress of an import"""
+    __slots__ = ('read', 'invalid', 'imported', 'existing', 'failed', 'retries', 'started')
+
+    def __init__(self) -> None:
+        self.read = self.invalid = self.imported = self.existing = self.failed = self.retries = 0
+        self.started = time.perf_counter()
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    @property
+    def rate(self) -> float:
+        """Recipes inserted per second"""
+        return self.imported / max(self.elapsed, 1e-9)
+
+    def __str__(self) -> str:
+        return (
+            f'{self.read} read, {self.imported} imported, {self.existing} existing, '
+            f'{self.invalid} invalid, {self.failed} failed, {self.retries} retries '
+            f'in {self.elapsed:.1f}s ({self.rate:.0f} recipes/s)'
+        )
+
+
+class Importer:
+    """Importer
+        Validate the records and insert them in batches. A batch is only
+        built when one of the ``concurrency`` slots is free, so reading
+        the file waits for the DB and at most ``concurrency + 1`` batches
+        are kept in memory. Failed batches are retried with exponential
+        backoff, the ids derived by the validation keep them and the
+        imports of the same file again idempotent
+        \f
+        :param client: DB session client with the role allowed to insert
+        :param user_id: owner of the records without one
+        :param batch_size: recipes of each insert
+        :param concurrency: maximum number of batches in flight
+        :param retries: attempts to insert a failed batch again
+        :param backoff: base seconds to wait before a retry
+        :param rejects: where to write the invalid and failed records
+    """
+
+    def __init__(
+            self,
+            client: AsyncClient,
+            user_id: UUID4 | None = None,
+            batch_size: int = settings.IMPORT_BATCH_SIZE,
+            concurrency: int = settings.IMPORT_CONCURRENCY,
+            retries: int = settings.IMPORT_RETRIES,
+            backoff: float = 0.5,
+            rejects: TextIO | None = None) -> None:
+        self.client = client
+        self.context = {'user_id': user_id}
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.rejects = rejects
+        self.stats = ImportStats()
+
+    async def run(self, records: Iterator[tuple[int, Any]], progress: float | None = None) -> ImportStats:
+        """run
+            Import all the records, the progress is logged every
+            ``progress`` seconds when given
+            \f
+            :param records: records with their position in the file
+            :param progress: seconds between the progress reports
+        """
+        self.stats = ImportStats()
+        slots = asyncio.Semaphore(self.concurrency)
+        tasks: set[asyncio.Task] = set()
+        reporter = asyncio.create_task(self._report(progress)) if progress else None
+
+        def release(task: asyncio.Task) -> None:
+            tasks.discard(task)
+            slots.release()
+
+        try:
+            for batch in self._batches(records):
+                await slots.acquire()
+                task = asyncio.create_task(self._insert(batch))
+                tasks.add(task)
+                task.add_done_callback(release)
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            if reporter is not None:
+                reporter.cancel()
+        return self.stats
+
+    def _batches(self, records: Iterator[tuple[int, Any]]) -> Iterator[list[tuple[int, RecipeImport]]]:
+        batch = []
+        for position, record in records:
+            self.stats.read += 1
+            try:
+                if isinstance(record, (bytes, str)):
+                    model = RecipeImport.model_validate_json(record, context=self.context)
+                else:
+                    model = RecipeImport.model_validate(record, context=self.context)
+            except ValidationError as error:
+                self.stats.invalid += 1
+                logger.debug('Invalid recipe at %d "%s"', position, error.title)
+                self._reject(position, error.errors(include_url=False, include_context=False))
+                continue
+            batch.append((position, model))
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    async def _insert(self, batch: list[tuple[int, RecipeImport]]) -> None:
+        models = [model for _, model in batch]
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self.stats.retries += 1
+                # Full jitter so the retried batches do not arrive together
+                await asyncio.sleep(random.uniform(0, self.backoff * 2 ** attempt))
+            try:
+                response = await RecipesController.save_many(self.client, models)
+            except httpx.HTTPError as error:
+                logger.error('Error at the DB API request "%s"', error)
+                continue
+            if response.success:
+                self.stats.imported += response.count
+                self.stats.existing += len(models) - response.count
+                return
+        self.stats.failed += len(models)
+        logger.error(
+            'Batch of the recipes %d to %d failed after %d attempts',
+            batch[0][0],
+            batch[-1][0],
+            self.retries + 1
+        )
+        for position, _ in batch:
+            self._reject(position, 'Insert failed')
+
+    def _reject(self, position: int, error: Any) -> None:
+        if self.rejects is not None:
+            self.rejects.write(json.dumps({'position': position, 'error': error}, default=str) + '\n')
+
+    async def _report(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            logger.info('Import progress: %s', self.stats)
+
+
+def _arguments(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog='python -m app.cli.importer',
+        description='Import recipes from a JSON array or NDJSON file, - reads the standard input')
+    parser.add_argument('file', help='JSON array or NDJSON file of recipes')
+    parser.add_argument('--user', type=str, default=None, help='Owner of the recipes without user_id')
+    parser.add_argument('--batch-size', type=int, default=settings.IMPORT_BATCH_SIZE)
+    parser.add_argument('--concurrency', type=int, default=settings.IMPORT_CONCURRENCY)
+    parser.add_argument('--retries', type=int, default=settings.IMPORT_RETRIES)
+    parser.add_argument('--rejects', type=Path, default=None, help='NDJSON file of the rejected records')
+    parser.add_argument('--progress', type=float, default=5.0, help='Seconds between progress reports')
+    return parser.parse_args(argv)
+
+
+async def _main(arguments: argparse.Namespace) -> ImportStats:
+    client = await Repository.get_client(settings.SERVICE_KEY.get_secret_value())
+    rejects = arguments.rejects.open('w') if arguments.rejects else None
+    source = sys.stdin.buffer if arguments.file == '-' else open(arguments.file, 'rb')
+    try:
+        importer = Importer(
+            client,
+            user_id=arguments.user,
+            batch_size=arguments.batch_size,
+            concurrency=arguments.concurrency,
+            retries=arguments.retries,
+            rejects=rejects)
+        return await importer.run(read_records(source), progress=arguments.progress)
+    finally:
+        if source is not sys.stdin.buffer:
+            source.close()
+        if rejects is not None:
+            rejects.close()
+        await Repository.close_pool()
+
+
+def main(argv: list[str] | None = None) -> int:
+    arguments = _arguments(argv)
+    logging.basicConfig(level=logging.INFO, format='[%(asctime)s] %(levelname)s %(message)s')
+    try:
+        stats = asyncio.run(_main(arguments))
+    except ValueError as error:
+        logger.error('Cannot read "%s": %s', arguments.file, error)
+        return 2
+    logger.info('Import finished: %s', stats)
+    return 0 if not stats.failed and not stats.invalid else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
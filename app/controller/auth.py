@@ -1,33 +1,22 @@
-from collections.abc import AsyncGenerator
-
 from jwt import ExpiredSignatureError
 
 from pydantic import UUID4
-from postgrest.exceptions import APIError
-from supabase._async.client import AsyncClient
 
 from gotrue import AuthResponse
 from gotrue.errors import AuthApiError
 
-from app.db import Repository
+from app.db import Repository, ClientView
 from app.logging import logger
 from app.schemas.auth import Token, TokenPayload
 from app.schemas.response import ControllerResponse
-from app.core.deps.auth import LoginForm, HTTPCredentials, RefreshTokenForm
+from app.core.deps.auth import LoginForm, HTTPCredentials, RefreshTokenForm, AuthContext
 
 
 # TODO: Handle exceptions in Authentication
-def current_user(auth: HTTPCredentials) -> UUID4 | None:
-    if auth is None:
+def current_user(payload: AuthContext) -> UUID4 | None:
+    if payload is None:
         return None
-    user = None
-    token = auth.credentials
-    try:
-        payload: TokenPayload = TokenPayload.decode_token(token)
-        user = payload.sub
-    except ExpiredSignatureError:
-        pass
-    return user
+    return payload.sub
 
 class _AuthController:
     """_AuthController
@@ -44,32 +33,15 @@ class _AuthController:
     def __init__(self) -> None:
         self._repo = Repository
 
-    async def auth_client(self, auth: HTTPCredentials) -> AsyncGenerator[AsyncClient, None, None]:
-        if auth is None:
-            yield None
-        token = auth.credentials
-        if not current_user(auth):
-            yield None
-        client = None
-        try:
-            client = await self._repo.get_client()
-            client._auth_token = {
-                "apiKey": client.supabase_key,
-                "Authorization": f"Bearer {token}",
-            }
-            yield client
-        except APIError as error:
-            logger.error(
-                'Cannot set Supabase auth client "%s - %s"',
-                error.code,
-                error.message,)
-        finally:
-            if client:
-                await client.postgrest.aclose()
-                await client.storage.aclose()
-                await client.auth.close()
+    async def auth_client(self, auth: HTTPCredentials, payload: AuthContext) -> ClientView | None:
+        if auth is None or payload is None:
+            return None
+        return await self._repo.get_client(auth.credentials, expires_at=payload.exp)
 
-    async def no_auth(self) -> AsyncClient:
+    async def no_auth(self) -> ClientView:
+        """Anonymous client shared by all public requests, its connections
+            belong to the pool and are released on shutdown
+        """
         return await self._repo.get_client()
 
     async def refresh_token(
@@ -107,7 +79,7 @@ class _AuthController:
     async def login(self, data: LoginForm) -> ControllerResponse[Token | None]:
         response = ControllerResponse[Token]()
         try:
-            client: AsyncClient  = await self._repo.get_client()
+            client: ClientView = await self._repo.get_client()
             sign_in: AuthResponse = await client.auth.sign_in_with_password(
                 {
                     'email': data.email,
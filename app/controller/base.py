@@ -1,14 +1,137 @@
+import time
+import asyncio
 import inspect
+import functools
 from abc import ABC, abstractmethod
 from typing import Generic, TypeVar
 
-from pydantic import BaseModel, UUID4
+from pydantic import BaseModel, TypeAdapter, UUID4
+from pydantic_core import ValidationError
+
+from postgrest.exceptions import APIError
 from supabase._async.client import AsyncClient
 
+from app.logging import logger
+from app.core.settings import settings
+from app.schemas.response import ControllerResponse, Errors, BulkItem, BulkStatus
+from app.schemas.base import CommonQueryDepend, CountStrategy
+from app.utils.pagination import encode_cursor, decode_cursor
+from app.utils.conditional import version
+from app.utils.singleflight import SingleFlight
+from app.utils.metrics import counter, histogram
+from app.utils.tracing import tracer
+
 _SaveT = TypeVar('_SaveT', bound=BaseModel)
 _Return = TypeVar('_Return', bound=BaseModel)
 _Params = TypeVar('_Params', bound=BaseModel)
 
+
+@functools.cache
+def _list_adapter(model: type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(list[model])
+
+
+flights = SingleFlight()
+
+# SQLSTATE of the violation of a unique constraint
+UNIQUE_VIOLATION = '23505'
+
+calls = histogram(
+    'controller_call_duration_seconds',
+    'Latency of the calls of the controller methods by table and method',
+    ('table', 'method'))
+errors = counter(
+    'controller_errors',
+    'Errors of the DB API and of the validation of its data by controller',
+    ('controller', 'error'))
+
+
+def _arguments(args: tuple) -> tuple[str, ...]:
+    """Normalized arguments of a controller call"""
+    return tuple(
+        arg.model_dump_json() if isinstance(arg, BaseModel) else str(arg)
+        for arg in args
+    )
+
+
+def read_through(method):
+    """read_through
+        Serve the successful responses of a read method from the cache of
+        the controller, keyed by the method and its normalized arguments.
+        The client is not part of the key, only use it on resources with
+        the same content for every user
+        \f
+        :param method: controller coroutine to cache
+    """
+    @functools.wraps(method)
+    async def wrapper(self, client: AsyncClient, *args):
+        key = (method.__name__, *_arguments(args))
+        response = self._cache.get(key)
+        if response is not None:
+            return response
+        response = await method(self, client, *args)
+        if response.success:
+            self._cache.set(key, response)
+        return response
+    return wrapper
+
+
+def coalesce(method):
+    """coalesce
+        Share one in-flight call of a read method between the concurrent
+        identical requests, keyed by the controller, the method, its
+        normalized arguments and the authorization scope of the client
+        \f
+        :param method: controller coroutine to coalesce
+    """
+    @functools.wraps(method)
+    async def wrapper(self, client: AsyncClient, *args):
+        label = f'{type(self).__name__.lstrip("_")}.{method.__name__}'
+        key = (label, getattr(client, 'scope', id(client)), *_arguments(args))
+        return await flights.do(key, lambda: method(self, client, *args), label)
+    return wrapper
+
+
+def observed(method):
+    """observed
+        Record the latency of the calls of a controller method, and trace
+        them in a span, applied to the public coroutines of every controller
+        \f
+        :param method: controller coroutine to observe
+    """
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            with tracer.span(
+                    f'{type(self).__name__.lstrip("_")}.{method.__name__}',
+                    **{'db.collection.name': self._table}):
+                return await method(self, *args, **kwargs)
+        finally:
+            calls.labels(self._table, method.__name__).observe(time.perf_counter() - start)
+    return wrapper
+
+
+def invalidates(method):
+    """invalidates
+        Clear the cache of the controller after a write that changed at
+        least one row, or that failed after it may have changed some
+        \f
+        :param method: controller coroutine that writes the resource
+    """
+    @functools.wraps(method)
+    async def wrapper(self, client: AsyncClient, *args):
+        try:
+            response = await method(self, client, *args)
+        except BaseException:
+            self._cache.clear()
+            raise
+        if response.success or response.count:
+            self._cache.clear()
+        return response
+    return wrapper
+
+
 class BaseController(
     ABC,
     Generic[_SaveT, _Return, _Params]):
@@ -27,10 +150,309 @@ class BaseController(
             cls._instance = super().__new__(cls)
         return cls._instance
 
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        for name, member in list(vars(cls).items()):
+            if not name.startswith('_') and inspect.iscoroutinefunction(member):
+                setattr(cls, name, observed(member))
+
     @abstractmethod
     def __init__(self, *args, **kwargs) -> None:
         """ init method, must include least the db client"""
 
+    def loader_stats(self) -> dict[str, int]:
+        """Loads and batched queries of the records requested by id"""
+        return self._loader.stats()
+
+    def _failed(self, error: APIError | ValidationError) -> None:
+        """Count an error of the DB API or of the validation of its data"""
+        errors.labels(type(self).__name__.lstrip('_'), type(error).__name__).inc()
+
+    @staticmethod
+    def _paginate(query, params: CommonQueryDepend):
+        """_paginate
+            Order the query by the keyset (created_at, id) and limit it to
+            the requested page. Keyset pagination is used when a cursor is
+            given, otherwise the page and skip offset.
+            One extra row is requested to know if a next page exists
+            \f
+            :param query: select request builder
+            :param params: pagination query parameters
+        """
+        query.params = query.params.set('order', 'created_at.asc,id.asc')
+        query.limit(params.limit + 1)
+        if params.cursor:
+            query = BaseController._after(query, params.cursor)
+        else:
+            query.offset(params.page * params.limit + params.skip)
+        return query
+
+    @staticmethod
+    def _after(query, cursor: str):
+        """Filter the records that follow the keyset of the cursor"""
+        created_at, model_id = decode_cursor(cursor)
+        query.params = query.params.add(
+            'or',
+            f'(created_at.gt."{created_at}",'
+            f'and(created_at.eq."{created_at}",id.gt.{model_id}))'
+        )
+        return query
+
+    @staticmethod
+    def _count_strategy(params: CommonQueryDepend) -> CountStrategy:
+        """Count strategy requested, the server setting by default"""
+        return params.count or CountStrategy(settings.COUNT_STRATEGY)
+
+    @staticmethod
+    def _next_cursor(records: list[dict], limit: int) -> str | None:
+        """Cursor of the last record of the page, None at the last page"""
+        if len(records) <= limit:
+            return None
+        last = records[limit - 1]
+        return encode_cursor(last['created_at'], last['id'])
+
+    @staticmethod
+    def _validate(model: type[BaseModel], records: list[dict]) -> list[BaseModel]:
+        """Validate all the records of a page in a single call of the
+            cached adapter of the model
+        """
+        with tracer.span('validate', **{'model': model.__name__, 'records': len(records)}):
+            return _list_adapter(model).validate_python(records, from_attributes=True)
+
+    @staticmethod
+    def _dump(model: type[BaseModel], models: list[BaseModel]) -> list[dict]:
+        """JSON compatible rows of a batch of models in a single call of
+            the cached adapter of the model
+        """
+        return _list_adapter(model).dump_python(models, mode='json')
+
+    @staticmethod
+    def _version(response: ControllerResponse, records: list[dict], count: int | None = None) -> None:
+        """Set the version and last modification of the records served"""
+        response.version, response.updated_at = version(records, count)
+
+    async def _load_many(self, client: AsyncClient, ids: list[str]) -> dict[str, dict]:
+        """Records of the ids in a single query, indexed by their id"""
+        response_db = await client.table(getattr(self, '_view', self._table))\
+            .select('*')\
+            .in_('id', ids)\
+            .execute()
+        return {record['id']: record for record in response_db.data}
+
+    async def modified(self, client: AsyncClient, model_id: UUID4) -> ControllerResponse:
+        """modified
+            Version of a resource from a query of its modification date
+            only, enough to answer the conditional requests
+            \f
+            :param client: DB session client
+            :param model_id: id of the resource
+        """
+        response = ControllerResponse()
+        try:
+            response_db = await client.table(self._table)\
+                .select('id,updated_at')\
+                .eq('id', model_id)\
+                .maybe_single()\
+                .execute()
+        except (APIError, ValidationError) as error:
+            self._failed(error)
+            if isinstance(error, APIError):
+                logger.error(
+                    'Error at the DB API request "%s - %s"',
+                    error.code,
+                    error.message
+                )
+            else:
+                logger.debug(
+                    'Validation Error at cats data from DB "%s" total "%d"',
+                    error.title,
+                    error.error_count()
+                )
+            response.success = False
+            return response
+
+        if response_db is None:
+            response.success = False
+            response.error = Errors.NO_RETURN
+            return response
+
+        self._version(response, [response_db.data])
+        return response
+
+    @staticmethod
+    def _bulk_error(error: APIError | ValidationError) -> None:
+        if isinstance(error, APIError):
+            logger.error(
+                'Error at the DB API bulk request "%s - %s"',
+                error.code,
+                error.message
+            )
+        else:
+            logger.debug(
+                'Validation Error at bulk data from DB "%s" total "%d"',
+                error.title,
+                error.error_count()
+            )
+
+    async def _save_many(
+            self,
+            client: AsyncClient,
+            models: list[BaseModel],
+            model_out: type[BaseModel],
+            on_conflict: str = 'name') -> ControllerResponse:
+        """_save_many
+            Insert all the models in a single request, the ones that
+            conflict with an existing row are kept as they are and
+            reported as existing ones, repeated ones in the same request
+            as duplicates
+            \f
+            :param client: DB session client
+            :param models: models to insert
+            :param model_out: schema of the records returned
+            :param on_conflict: unique column of the resource
+        """
+        response = ControllerResponse[list[BulkItem[model_out]]]()
+        items: list[BulkItem | None] = [None] * len(models)
+        keys: dict[str, int] = {}
+        for index, model in enumerate(models):
+            key = str(getattr(model, on_conflict))
+            if key in keys:
+                items[index] = BulkItem[model_out](index=index, status=BulkStatus.DUPLICATE)
+            else:
+                keys[key] = index
+        try:
+            response_db = await client.table(self._table)\
+                .upsert(
+                    [
+                        models[index].model_dump(mode='json', exclude_none=True)
+                        for index in keys.values()
+                    ],
+                    on_conflict=on_conflict,
+                    ignore_duplicates=True)\
+                .execute()
+            created = {str(record[on_conflict]): record for record in response_db.data}
+            for key, index in keys.items():
+                record = created.get(key)
+                items[index] = BulkItem[model_out](
+                    index=index,
+                    status=BulkStatus.CREATED if record else BulkStatus.EXISTS,
+                    id=record['id'] if record else None,
+                    data=model_out.model_validate(record, from_attributes=True) if record else None)
+        except (APIError, ValidationError) as error:
+            self._failed(error)
+            self._bulk_error(error)
+            response.success = False
+            return response
+        response.data = items
+        response.count = len(created)
+        return response
+
+    async def _update_many(
+            self,
+            client: AsyncClient,
+            models: list[BaseModel],
+            model_out: type[BaseModel]) -> ControllerResponse:
+        """_update_many
+            Update each model with its own request, at most
+            ``BULK_CONCURRENCY`` of them in flight. Only the existing rows
+            are updated, missing ids are reported as not found, the
+            models that collide with the unique name of another row as
+            conflicts and the other errors of the DB as failed items
+            \f
+            :param client: DB session client
+            :param models: models to update, all with their id
+            :param model_out: schema of the records returned
+        """
+        response = ControllerResponse[list[BulkItem[model_out]]]()
+        items: list[BulkItem | None] = [None] * len(models)
+        ids: dict[str, int] = {}
+        for index, model in enumerate(models):
+            if str(model.id) in ids:
+                items[index] = BulkItem[model_out](index=index, status=BulkStatus.DUPLICATE, id=str(model.id))
+            else:
+                ids[str(model.id)] = index
+        slots = asyncio.Semaphore(settings.BULK_CONCURRENCY)
+
+        async def update(model_id: str, index: int) -> None:
+            async with slots:
+                try:
+                    response_db = await client.table(self._table)\
+                        .update(models[index].model_dump(mode='json', exclude={'id'}))\
+                        .eq('id', model_id)\
+                        .execute()
+                except APIError as error:
+                    # The other items may be written already, the error
+                    # is reported on its item instead of failing them all
+                    conflict = error.code == UNIQUE_VIOLATION
+                    if not conflict:
+                        self._failed(error)
+                        self._bulk_error(error)
+                    items[index] = BulkItem[model_out](
+                        index=index,
+                        status=BulkStatus.CONFLICT if conflict else BulkStatus.FAILED,
+                        id=model_id)
+                    return
+            record = response_db.data[0] if response_db.data else None
+            data = None
+            if record:
+                try:
+                    data = model_out.model_validate(record, from_attributes=True)
+                except ValidationError as error:
+                    self._failed(error)
+                    self._bulk_error(error)
+            items[index] = BulkItem[model_out](
+                index=index,
+                status=BulkStatus.UPDATED if record else BulkStatus.NOT_FOUND,
+                id=model_id,
+                data=data)
+
+        # Every update ends before an unexpected error is raised
+        results = await asyncio.gather(
+            *(update(model_id, index) for model_id, index in ids.items()),
+            return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        response.data = items
+        response.count = sum(item.status is BulkStatus.UPDATED for item in items)
+        return response
+
+    async def _delete_many(self, client: AsyncClient, ids: list[str]) -> ControllerResponse:
+        """_delete_many
+            Delete all the ids in a single request, repeated ids are
+            reported as duplicates at their position in the request
+            \f
+            :param client: DB session client
+            :param ids: ids of the resources in the order of the request
+        """
+        response = ControllerResponse[list[BulkItem]]()
+        items: list[BulkItem | None] = [None] * len(ids)
+        first: dict[str, int] = {}
+        for index, model_id in enumerate(ids):
+            if model_id in first:
+                items[index] = BulkItem(index=index, status=BulkStatus.DUPLICATE, id=model_id)
+            else:
+                first[model_id] = index
+        try:
+            response_db = await client.table(self._table)\
+                .delete()\
+                .in_('id', list(first))\
+                .execute()
+        except APIError as error:
+            self._failed(error)
+            self._bulk_error(error)
+            response.success = False
+            return response
+        deleted = {record['id'] for record in response_db.data}
+        for model_id, index in first.items():
+            items[index] = BulkItem(
+                index=index,
+                status=BulkStatus.DELETED if model_id in deleted else BulkStatus.NOT_FOUND,
+                id=model_id)
+        response.data = items
+        response.count = len(deleted)
+        return response
+
     @abstractmethod
     async def save(self, client: AsyncClient, model: _SaveT) -> _Return:
         """save
@@ -63,4 +485,9 @@ class BaseController(
 
 __all__ = [
     'BaseController',
+    'read_through',
+    'coalesce',
+    'flights',
+    'invalidates',
+    'observed',
 ]
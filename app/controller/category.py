@@ -7,14 +7,18 @@ from postgrest.exceptions import APIError
 from supabase._async.client import AsyncClient
 
 from app.logging import logger
-from app.controller.base import BaseController
-from app.schemas.response import ControllerResponse
+from app.core.settings import settings
+from app.utils.cache import LRUCache
+from app.utils.loader import BatchLoader
+from app.controller.base import BaseController, read_through, invalidates, coalesce
+from app.schemas.response import ControllerResponse, Errors
 from app.utils import MultipleResponse, SingleResponse
 from app.schemas.categories import (
     CategoryOut,
     CategoryInDB,
     CategoryFilter,
     CategorySave,
+    CategoryUpdate,
 )
 
 Category = SingleResponse[CategoryInDB]
@@ -38,8 +42,13 @@ class _CategoriesController(
 
     def __init__(self, *args, **kwarg) -> None:
         self._table = 'categories'
+        self._cache = LRUCache(
+            settings.REFERENCE_CACHE_SIZE,
+            ttl=settings.REFERENCE_CACHE_TTL)
+        self._loader = BatchLoader(self._load_many, settings.LOADER_MAX_BATCH)
         super().__init__(args, kwarg)
 
+    @invalidates
     async def save(self, client: AsyncClient, model: CategorySave) -> _Return:
         response = ControllerResponse()
         response_db = None
@@ -52,6 +61,7 @@ class _CategoriesController(
                     count='exact')\
                 .execute()
         except (APIError, ValidationError) as error:
+            self._failed(error)
             if isinstance(error, APIError):
                 logger.error(
                     'Error at the DB API request "%s - %s"',
@@ -76,6 +86,7 @@ class _CategoriesController(
             response.count = response_db.count
             response.data = model_out
         except ValidationError as error:
+            self._failed(error)
             logger.debug(
                     'Validation Error "%s" total "%d"',
                     error.title,
@@ -84,6 +95,7 @@ class _CategoriesController(
             response.success= False
         return response
 
+    @invalidates
     async def update(self, client: AsyncClient, model: CategorySave) -> _Return:
         response = ControllerResponse()
         response_db = None
@@ -95,6 +107,7 @@ class _CategoriesController(
                 .eq('id', model.id)\
                 .execute()
         except (APIError, ValidationError) as error:
+            self._failed(error)
             if isinstance(error, APIError):
                 logger.error(
                     'Error at the DB API request "%s - %s"',
@@ -119,6 +132,7 @@ class _CategoriesController(
             response.count = response_db.count
             response.data = model_out
         except ValidationError as error:
+            self._failed(error)
             logger.debug(
                     'Validation Error "%s" total "%d"',
                     error.title,
@@ -127,20 +141,23 @@ class _CategoriesController(
             response.success= False
         return response
 
+    @read_through
+    @coalesce
     async def select(self, client: AsyncClient, params: CategoryFilter) -> _Return:
         response = ControllerResponse()
         response_db = None
-        last_element = params.page * params.limit
-        final_element = (params.page + 1) * params.limit
+        strategy = self._count_strategy(params)
         try:
             query = client.table(self._table)\
-                .select(_CategoriesController._queries.ALL.value, count='exact')\
-                .range(last_element, final_element)
+                .select(_CategoriesController._queries.ALL.value, count=strategy.method)
 
+            if params.ids:
+                query.in_('id', params.ids.split(','))
             if params.name:
                 query.like('name', f'%{params.name}%')
-            response_db: Categories = await query.execute()
+            response_db: Categories = await self._paginate(query, params).execute()
         except (APIError, ValidationError) as error:
+            self._failed(error)
             if isinstance(error, APIError):
                 logger.error(
                     'Error at the DB API request "%s - %s"',
@@ -156,17 +173,15 @@ class _CategoriesController(
             response.success = False
             return response
 
-        if not response_db.count:
-            response.success = False
-            return response
-
+        # No match is an empty page, not an error
         try:
-            response.data = [
-                CategoryOut.model_validate(record, from_attributes=True)
-                for record in response_db.data
-            ]
+            response.data = self._validate(CategoryOut, response_db.data[:params.limit])
             response.count = response_db.count
+            response.count_strategy = strategy.value
+            self._version(response, response_db.data[:params.limit], response_db.count)
+            response.cursor = self._next_cursor(response_db.data, params.limit)
         except ValidationError as error:
+            self._failed(error)
             logger.debug(
                 'Validation Error "%s" total "%d"',
                 error.title,
@@ -175,18 +190,18 @@ class _CategoriesController(
             response.success= False
         return response
 
+    @read_through
+    @coalesce
     async def unique(self, client: AsyncClient, model_id: UUID4) -> _Return:
         response = ControllerResponse()
         response_db = None
         try:
-            response_db: Category = await client.table(self._table)\
-                .select(
-                    _CategoriesController._queries.ALL.value,
-                    count='exact')\
-                .eq('id', model_id)\
-                .single()\
-                .execute()
+            response_db = await self._loader.load(
+                client,
+                getattr(client, 'scope', id(client)),
+                str(model_id))
         except (APIError, ValidationError) as error:
+            self._failed(error)
             if isinstance(error, APIError):
                 logger.error(
                     'Error at the DB API request "%s - %s"',
@@ -202,15 +217,18 @@ class _CategoriesController(
             response.success = False
             return response
 
-        if not response_db.count:
+        if response_db is None:
             response.success = False
+            response.error = Errors.NO_RETURN
             return response
 
         try:
-            model_out = CategoryOut.model_validate(response_db.data, from_attributes=True)
+            model_out = CategoryOut.model_validate(response_db, from_attributes=True)
             response.count = 1
             response.data = model_out
+            self._version(response, [response_db])
         except ValidationError as error:
+            self._failed(error)
             logger.debug(
                 'Validation Error "%s" total "%d"',
                 error.title,
@@ -219,6 +237,7 @@ class _CategoriesController(
             response.success= False
         return response
 
+    @invalidates
     async def delete(self, client: AsyncClient, model_id: UUID4) -> _Return:
         response = ControllerResponse()
         try:
@@ -228,6 +247,7 @@ class _CategoriesController(
                 .execute()
             response.count = response_db.count
         except APIError as error:
+            self._failed(error)
             logger.error(
                 'Error at the DB API request "%s - %s"',
                 error.code,
@@ -236,3 +256,24 @@ class _CategoriesController(
             response.success = False
             return response
         return response
+
+    @invalidates
+    async def save_many(self, client: AsyncClient, models: list[CategorySave]) -> ControllerResponse:
+        return await self._save_many(client, models, CategoryOut)
+
+    @invalidates
+    async def update_many(self, client: AsyncClient, models: list[CategoryUpdate]) -> ControllerResponse:
+        return await self._update_many(client, models, CategoryOut)
+
+    @invalidates
+    async def delete_many(self, client: AsyncClient, ids: list[str]) -> ControllerResponse:
+        return await self._delete_many(client, ids)
+
+    @read_through
+    @coalesce
+    async def modified(self, client: AsyncClient, model_id: UUID4) -> _Return:
+        return await super().modified(client, model_id)
+
+    def cache_stats(self) -> dict[str, int]:
+        """Hits, misses and size of the cache of the controller"""
+        return self._cache.stats()
@@ -4,23 +4,29 @@ from pydantic import UUID4
 from pydantic_core import ValidationError
 
 from postgrest.exceptions import APIError
+from postgrest.types import ReturnMethod
 from supabase._async.client import AsyncClient
 
 from app.logging import logger
-from app.controller.base import BaseController
-from app.schemas.response import ControllerResponse
+from app.core.settings import settings
+from app.utils.loader import BatchLoader
+from app.controller.base import BaseController, coalesce
+from app.schemas.response import ControllerResponse, Errors
 from app.utils import MultipleResponse, SingleResponse
 from app.schemas.recipes import (
     RecipeOut,
     RecipeInDB,
     RecipeSave,
-    RecipeFilter
+    RecipeFilter,
+    RecipeExport,
+    RecipeSummary,
+    TagMatch
 )
 
 Recipe = SingleResponse[RecipeInDB]
 Recipes = MultipleResponse[list[RecipeInDB]]
 
-_Return = ControllerResponse[RecipeOut | list[RecipeOut] | None]
+_Return = ControllerResponse[RecipeOut | list[RecipeOut] | list[RecipeSummary] | None]
 
 class _RecipesController(
     BaseController[
@@ -33,13 +39,17 @@ class _RecipesController(
     class Queries(Enum):
         """Queries to perform in postgres api syntax"""
         INFO = '*'
+        SUMMARY = 'id,title,image,images,category'
 
     _queries = Queries
 
     def __init__(self, *args, **kwargs):
         self._table = 'recipes'
         self._rcp_insert = 'insert_recipe'
+        self._rcp_insert_many = 'insert_recipes'
+        self._rcp_search = 'search_recipes'
         self._view = 'recipes_full'
+        self._loader = BatchLoader(self._load_many, settings.LOADER_MAX_BATCH)
         super().__init__(args, kwargs)
 
     async def save(self, client: AsyncClient, model: RecipeSave) -> _Return:
@@ -49,6 +59,7 @@ class _RecipesController(
                 'recipe_json': model.model_dump(mode='json')
             }).execute()
         except (APIError, ValidationError) as error:
+            self._failed(error)
             if isinstance(error, APIError):
                 logger.error(
                     'Error at the DB API request "%s - %s"',
@@ -69,30 +80,101 @@ class _RecipesController(
         response.data = RecipeOut.model_validate(response_db.data, from_attributes=True)
         return response
 
+    async def save_many(self, client: AsyncClient, models: list[RecipeSave]) -> _Return:
+        """save_many
+            Insert a batch of recipes with their tags in a single request,
+            the recipes with an id already stored are skipped. The count
+            of the response is the number of recipes inserted
+            \f
+            :param client: DB session client
+            :param models: recipes to insert with their ids assigned
+        """
+        response = ControllerResponse()
+        try:
+            response_db = await client.rpc(self._rcp_insert_many, {
+                'recipes_json': self._dump(RecipeSave, models)
+            }).execute()
+        except APIError as error:
+            self._failed(error)
+            logger.error(
+                'Error at the DB API request "%s - %s"',
+                error.code,
+                error.message
+            )
+            response.success = False
+            return response
+        response.count = response_db.data or 0
+        return response
+
+    async def set_images(self, client: AsyncClient, model_id: UUID4, images: dict) -> _Return:
+        """set_images
+            Store the URLs of the variants of the image of a recipe
+            \f
+            :param client: DB session client
+            :param model_id: id of the recipe
+            :param images: URLs by variant and format
+        """
+        response = ControllerResponse()
+        try:
+            response_db: Recipes = await client.table(self._table)\
+                .update({'images': images}, count='exact', returning=ReturnMethod.minimal)\
+                .eq('id', str(model_id))\
+                .execute()
+            response.count = response_db.count
+        except APIError as error:
+            self._failed(error)
+            logger.error(
+                'Error at the DB API request "%s - %s"',
+                error.code,
+                error.message
+            )
+            response.success = False
+            return response
+        if not response.count:
+            response.success = False
+            response.error = Errors.NO_RETURN
+        return response
+
     async def update(self, client: AsyncClient, model: RecipeSave) -> _Return:
         # TODO: Make the store procedure to update a recipe
         # Also call it here, search if supabase sanitize the input data
         raise NotImplementedError('Update Recipe not implemented yet')
 
+    @coalesce
     async def select(self, client: AsyncClient,  params: RecipeFilter) -> _Return:
-        response = ControllerResponse[list[RecipeOut]]()
+        response = ControllerResponse[list[RecipeOut] | list[RecipeSummary]]()
         response_db = None
-        last_element = params.page * params.limit
-        final_element = (params.page + 1) * params.limit
+        strategy = self._count_strategy(params)
+        columns = params.fields or _RecipesController._queries.SUMMARY.value
+        model = RecipeSummary
+        if columns == _RecipesController._queries.INFO.value:
+            model = RecipeOut
+        else:
+            # Keyset of the pagination cursor and version of the records
+            columns = f'{columns},created_at,updated_at'
         try:
-            query = client.table(self._view)\
-                .select(_RecipesController._queries.INFO.value, count='exact')\
-                .range(last_element, final_element)
+            if params.q:
+                query = client.rpc(self._rcp_search, {'q': params.q})
+                query.params = query.params.set('select', columns)
+                if strategy.method:
+                    query.headers['Prefer'] = f'count={strategy.method}'
+            else:
+                query = client.table(self._view)\
+                    .select(columns, count=strategy.method)
 
-            if params.category:
-                query.eq('category_id', params.category)
+            if params.ids:
+                query.in_('id', params.ids.split(','))
             if params.title:
-                query.like('title', f'%{params.title}%')
-            # TODO: extract id from list of json objects
-            # if params.tag:
-            #     query.eq('tags.id', params.tag)
+                # Trigram index of the titles
+                query.ilike('title', f'%{params.title}%')
+            query = self._filter(query, params)
+            if params.q:
+                query = self._rank(query, params)
+            else:
+                query = self._paginate(query, params)
             response_db: Recipes = await query.execute()
         except (APIError, ValidationError) as error:
+            self._failed(error)
             if isinstance(error, APIError):
                 logger.error(
                     'Error at the DB API request "%s - %s"',
@@ -108,16 +190,95 @@ class _RecipesController(
             response.success = False
             return response
 
-        if not response_db.count:
+        # No match is an empty page, not an error
+        try:
+            response.data = self._validate(model, response_db.data[:params.limit])
+            response.count = response_db.count
+            response.count_strategy = strategy.value
+            self._version(response, response_db.data[:params.limit], response_db.count)
+            if params.q:
+                if len(response_db.data) > params.limit:
+                    response.next_page = params.page + 2
+            else:
+                response.cursor = self._next_cursor(response_db.data, params.limit)
+        except ValidationError as error:
+            self._failed(error)
+            logger.debug(
+                'Validation Error "%s" total "%d"',
+                error.title,
+                error.error_count()
+            )
+            response.success= False
+        return response
+
+    @staticmethod
+    def _filter(query, params: RecipeFilter | RecipeExport):
+        """Filters of the category and tags shared by the listing and the export"""
+        if params.category:
+            query.eq('category_id', params.category)
+        if params.tag:
+            # Array operators over the GIN index of recipes.tag_ids
+            tags = params.tag.split(',')
+            if params.tag_match is TagMatch.ALL:
+                query.contains('tag_ids', tags)
+            else:
+                query.ov('tag_ids', tags)
+        return query
+
+    async def export(
+            self,
+            client: AsyncClient,
+            params: RecipeExport,
+            cursor: str | None = None) -> _Return:
+        """export
+            Batch of the catalog export that follows the cursor. The batches
+            walk the keyset (created_at, id) without counting the records,
+            so every batch costs the same no matter how deep it is
+            \f
+            :param client: DB session client
+            :param params: filters of the export
+            :param cursor: keyset of the last record of the previous batch
+        """
+        response = ControllerResponse[list[RecipeOut] | list[RecipeSummary]]()
+        response_db = None
+        limit = settings.EXPORT_BATCH_SIZE
+        columns = params.fields or _RecipesController._queries.INFO.value
+        model = RecipeSummary
+        if columns == _RecipesController._queries.INFO.value:
+            model = RecipeOut
+        else:
+            columns = f'{columns},created_at'
+        try:
+            query = client.table(self._view).select(columns)
+            query = self._filter(query, params)
+            query.params = query.params.set('order', 'created_at.asc,id.asc')
+            query.limit(limit + 1)
+            if cursor:
+                query = self._after(query, cursor)
+            response_db: Recipes = await query.execute()
+        except (APIError, ValidationError) as error:
+            self._failed(error)
+            if isinstance(error, APIError):
+                logger.error(
+                    'Error at the DB API request "%s - %s"',
+                    error.code,
+                    error.message
+                )
+            else:
+                logger.debug(
+                    'Validation Error at cats data from DB "%s" total "%d"',
+                    error.title,
+                    error.error_count()
+                )
             response.success = False
             return response
+
         try:
-            response.data = [
-                RecipeOut.model_validate(record, from_attributes=True)
-                for record in response_db.data
-            ]
-            response.count = response_db.count
+            response.data = self._validate(model, response_db.data[:limit])
+            response.count = len(response.data)
+            response.cursor = self._next_cursor(response_db.data, limit)
         except ValidationError as error:
+            self._failed(error)
             logger.debug(
                 'Validation Error "%s" total "%d"',
                 error.title,
@@ -126,18 +287,33 @@ class _RecipesController(
             response.success= False
         return response
 
+    @staticmethod
+    def _rank(query, params: RecipeFilter):
+        """_rank
+            Order the search results by relevance, the rank changes with
+            the search terms so they are paginated by page and skip.
+            One extra row is requested to know if a next page exists
+            \f
+            :param query: rpc request builder of the search
+            :param params: pagination query parameters
+        """
+        query.params = query.params\
+            .set('order', 'rank.desc,created_at.asc,id.asc')\
+            .set('limit', params.limit + 1)\
+            .set('offset', params.page * params.limit + params.skip)
+        return query
+
+    @coalesce
     async def unique(self, client: AsyncClient, model_id: UUID4) -> _Return:
         response = ControllerResponse[RecipeOut]()
         response_db = None
         try:
-            response_db: Recipe = await client.table(self._view)\
-                .select(_RecipesController._queries.INFO.value, count='exact')\
-                .eq('id', model_id)\
-                .single()\
-                .execute()
-            if not response.count:
-                return None
+            response_db = await self._loader.load(
+                client,
+                getattr(client, 'scope', id(client)),
+                str(model_id))
         except (APIError, ValidationError) as error:
+            self._failed(error)
             if isinstance(error, APIError):
                 logger.error(
                     'Error at the DB API request "%s - %s"',
@@ -153,15 +329,18 @@ class _RecipesController(
             response.success = False
             return response
 
-        if not response_db.count:
+        if response_db is None:
             response.success = False
+            response.error = Errors.NO_RETURN
             return response
 
         try:
-            model_out = RecipeOut.model_validate(response_db.data, from_attributes=True)
+            model_out = RecipeOut.model_validate(response_db, from_attributes=True)
             response.count = 1
             response.data = model_out
+            self._version(response, [response_db])
         except ValidationError as error:
+            self._failed(error)
             logger.debug(
                 'Validation Error "%s" total "%d"',
                 error.title,
@@ -170,6 +349,10 @@ class _RecipesController(
             response.success= False
         return response
 
+    @coalesce
+    async def modified(self, client: AsyncClient, model_id: UUID4) -> _Return:
+        return await super().modified(client, model_id)
+
     async def delete(self, client: AsyncClient, model_id: UUID4) -> _Return:
         response = ControllerResponse()
         try:
@@ -179,6 +362,7 @@ class _RecipesController(
                 .execute()
             response.count = response_db.count
         except APIError as error:
+            self._failed(error)
             logger.error(
                 'Error at the DB API request "%s - %s"',
                 error.code,
@@ -1,8 +1,6 @@
-from . import deps
 from .settings import settings
 
 
 __all__ = [
-    'deps',
     'settings'
 ]
@@ -1,9 +1,10 @@
-from app.core.deps.auth import HTTPCredentials, LoginForm, RefreshTokenForm
+from app.core.deps.auth import HTTPCredentials, LoginForm, RefreshTokenForm, AuthContext
 from app.core.deps.session import User, Anon, Client
 
 
 __all__ = [
     'Anon',
+    'AuthContext',
     'User',
     'Client',
     'LoginForm',
@@ -1,9 +1,10 @@
 from typing import Annotated
 
+from jwt import ExpiredSignatureError
 from fastapi import Depends, Body
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
-from app.schemas.auth import RefreshToken, Login
+from app.schemas.auth import RefreshToken, Login, TokenPayload
 
 oauth_token = HTTPBearer(
     scheme_name='JWTBearer',
@@ -14,4 +15,18 @@ LoginForm = Annotated[Login, Body()]
 
 HTTPCredentials = Annotated[HTTPAuthorizationCredentials, Depends(oauth_token)]
 
+
+def token_payload(auth: HTTPCredentials) -> TokenPayload | None:
+    """Request scoped authentication context, FastAPI caches the
+        dependency per request so the token is decoded only once
+    """
+    if auth is None:
+        return None
+    try:
+        return TokenPayload.decode_token(auth.credentials)
+    except ExpiredSignatureError:
+        return None
+
+AuthContext = Annotated[TokenPayload | None, Depends(token_payload)]
+
 RefreshTokenForm = Annotated[RefreshToken, Depends(RefreshToken.as_from())]
@@ -5,15 +5,28 @@ from fastapi import FastAPI
 from postgrest.exceptions import APIError
 
 from app.db import Repository
-from app.logging import logger
+from app.logging import logger, log_queue
+from app.storage import processor
+from app.core.settings import settings
+from app.utils.tracing import tracer, exporter
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
+    log_queue.start(settings.LOG_DEBUG_SAMPLE_RATIO, settings.LOG_LEVEL)
+    tracer.configure(
+        exporter(
+            settings.TRACING_EXPORTER,
+            settings.TRACING_FILE,
+            settings.TRACING_OTLP_ENDPOINT,
+            settings.TRACING_SERVICE_NAME),
+        settings.TRACING_SAMPLE_RATIO)
+    await tracer.start()
     logger.info('Supabase admin client session')
     try:
 
         await Repository.init_admin()
+        await Repository.init_pool()
         yield
     except APIError as error:
         logger.error(
@@ -21,4 +34,8 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
             error.code, error.details
         )
     finally:
+        await Repository.close_pool()
         await Repository.close_admin()
+        processor.shutdown()
+        await tracer.shutdown()
+        log_queue.stop()
@@ -0,0 +1,318 @@
+import re
+import gzip
+import time
+import uuid
+import hashlib
+from collections.abc import Callable
+
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.logging import request_id
+from app.utils.cache import LRUCache
+from app.utils.metrics import gauge, histogram
+from app.utils.tracing import tracer
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+
+def _encoders(level: int) -> dict[str, Callable[[bytes], bytes]]:
+    """Available encoders in order of preference of the server"""
+    encoders = {}
+    if zstandard is not None:
+        compressor = zstandard.ZstdCompressor(level=3)
+        encoders['zstd'] = compressor.compress
+    if brotli is not None:
+        encoders['br'] = lambda body: brotli.compress(body, quality=5)
+    encoders['gzip'] = lambda body: gzip.compress(body, compresslevel=level, mtime=0)
+    return encoders
+
+
+def negotiate(accept_encoding: str, available: tuple[str, ...]) -> str | None:
+    """negotiate
+        Encoding with the highest quality of the Accept-Encoding header,
+        ties are broken by the order of preference of the server
+        \f
+        :param accept_encoding: value of the header
+        :param available: encodings supported by the server
+    """
+    weights: dict[str, float] = {}
+    for item in accept_encoding.split(','):
+        coding, _, params = item.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        weights[coding] = quality
+    default = weights.get('*', 0.0)
+    best, best_quality = None, 0.0
+    for coding in available:
+        quality = weights.get(coding, default)
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+class CompressionMiddleware:
+    """CompressionMiddleware
+        Compress the complete responses with zstd, brotli or gzip, the
+        first ones only when their packages are installed. Streaming
+        responses, small bodies, non textual content and already encoded
+        responses are sent untouched. Large bodies are compressed in a
+        worker thread and the compressed bytes of the latest bodies are
+        kept to answer repeated identical responses
+    """
+
+    COMPRESSIBLE = (
+        'application/json',
+        'application/xml',
+        'application/javascript',
+        'image/svg+xml',
+        'text/',
+    )
+
+    def __init__(
+            self,
+            app: ASGIApp,
+            minimum_size: int = 1024,
+            thread_size: int = 64 * 1024,
+            cache_size: int = 64,
+            level: int = 6) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.thread_size = thread_size
+        self.encoders = _encoders(level)
+        self.cache: LRUCache[tuple[str, bytes], bytes] = LRUCache(cache_size)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(
+            Headers(scope=scope).get('accept-encoding', ''),
+            tuple(self.encoders))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await self.app(scope, receive, _Responder(self, encoding, send))
+
+    def compressible(self, headers: Headers, status: int) -> bool:
+        content_type = headers.get('content-type', '')
+        return status not in (204, 206, 304) \
+            and 'content-encoding' not in headers \
+            and content_type.startswith(self.COMPRESSIBLE)
+
+    async def compress(self, encoding: str, body: bytes) -> bytes:
+        key = (encoding, hashlib.blake2b(body, digest_size=16).digest())
+        compressed = self.cache.get(key)
+        if compressed is None:
+            encoder = self.encoders[encoding]
+            if len(body) >= self.thread_size:
+                compressed = await anyio.to_thread.run_sync(encoder, body)
+            else:
+                compressed = encoder(body)
+            self.cache.set(key, compressed)
+        return compressed
+
+
+class _Responder:
+    """Send callable that holds the start of the response until the
+        first chunk of the body tells if it is streamed
+    """
+    __slots__ = ('middleware', 'encoding', 'send', 'start')
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send) -> None:
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send = send
+        self.start: Message | None = None
+
+    async def __call__(self, message: Message) -> None:
+        if message['type'] == 'http.response.start':
+            self.start = message
+            return
+        if self.start is None:
+            await self.send(message)
+            return
+        if message['type'] != 'http.response.body':
+            # The file extensions send the body without the application,
+            # it is never compressed
+            start, self.start = self.start, None
+            await self.send(start)
+            await self.send(message)
+            return
+
+        start, self.start = self.start, None
+        body = message.get('body', b'')
+        start['headers'] = list(start.get('headers', []))
+        headers = MutableHeaders(raw=start['headers'])
+        if message.get('more_body', False) \
+                or len(body) < self.middleware.minimum_size \
+                or not self.middleware.compressible(headers, start['status']):
+            await self.send(start)
+            await self.send(message)
+            return
+
+        body = await self.middleware.compress(self.encoding, body)
+        headers['Content-Encoding'] = self.encoding
+        headers['Content-Length'] = str(len(body))
+        headers.add_vary_header('Accept-Encoding')
+        await self.send(start)
+        await self.send({'type': 'http.response.body', 'body': body})
+
+
+requests_latency = histogram(
+    'http_request_duration_seconds',
+    'Latency of the HTTP requests by method, route template and status',
+    ('method', 'route', 'status'))
+requests_in_flight = gauge(
+    'http_requests_in_flight',
+    'HTTP requests being served')
+
+
+def route_template(scope: Scope, root_path: str) -> str:
+    """Template of the route that served a request, the routers leave
+        the route matched or the path of the mounted app in the scope
+    """
+    route = scope.get('route')
+    if route is not None:
+        return route.path
+    mounted = scope.get('root_path', '')
+    if mounted != root_path:
+        return f'{mounted.removeprefix(root_path)}/{{path}}'
+    return 'unmatched'
+
+
+class MetricsMiddleware:
+    """MetricsMiddleware
+        Record the latency of the HTTP requests, until the last chunk of
+        their body is sent, and the number of requests being served. The
+        routes are labelled by their template so the ids of the paths do
+        not create a series per resource
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        root_path = scope.get('root_path', '')
+        # An exception raised before the response is a server error
+        status = 500
+
+        async def send_status(message: Message) -> None:
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        in_flight = requests_in_flight.labels()
+        in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_status)
+        finally:
+            in_flight.dec()
+            requests_latency\
+                .labels(scope['method'], route_template(scope, root_path), status)\
+                .observe(time.perf_counter() - start)
+
+
+class TracingMiddleware:
+    """TracingMiddleware
+        Server span of each HTTP request, child of the traceparent sent by
+        the client. The span is named by the route template once the
+        request is routed, the spans of the dependencies, controllers and
+        PostgREST calls are nested in it
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http' or not tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+        root_path = scope.get('root_path', '')
+        headers = Headers(scope=scope)
+        with tracer.span(
+                scope['method'],
+                kind='SERVER',
+                traceparent=headers.get('traceparent'),
+                **{
+                    'http.request.method': scope['method'],
+                    'url.path': scope['path'],
+                }) as span:
+
+            async def send_status(message: Message) -> None:
+                if message['type'] == 'http.response.start':
+                    span.set_attribute('http.response.status_code', message['status'])
+                    if message['status'] >= 500:
+                        span.status = 'ERROR'
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_status)
+            finally:
+                route = route_template(scope, root_path)
+                span.name = f'{scope["method"]} {route}'
+                span.set_attribute('http.route', route)
+
+
+class RequestIdMiddleware:
+    """RequestIdMiddleware
+        Correlation id of each request, the X-Request-ID of the client or a
+        new one, set in the context of the logs and sent back in the
+        response
+    """
+    VALID = re.compile(r'^[\w\-.:]{1,128}$')
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        value = Headers(scope=scope).get('x-request-id', '')
+        if not self.VALID.match(value):
+            value = uuid.uuid4().hex
+
+        async def send_id(message: Message) -> None:
+            if message['type'] == 'http.response.start':
+                MutableHeaders(scope=message)['X-Request-ID'] = value
+            await send(message)
+
+        token = request_id.set(value)
+        try:
+            await self.app(scope, receive, send_id)
+        finally:
+            request_id.reset(token)
+
+
+__all__ = [
+    'negotiate',
+    'route_template',
+    'CompressionMiddleware',
+    'MetricsMiddleware',
+    'TracingMiddleware',
+    'RequestIdMiddleware',
+]
@@ -1,7 +1,8 @@
 import secrets
+from typing import Literal
 
 from pydantic import Field
-from pydantic import HttpUrl, SecretStr, PositiveInt
+from pydantic import HttpUrl, SecretStr, PositiveInt, PositiveFloat, NonNegativeInt
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
@@ -21,6 +22,160 @@ class Settings(BaseSettings):
     ANON_KEY: SecretStr
     SUPABASE_URL: HttpUrl
 
+    POOL_MAX_CONNECTIONS: PositiveInt = Field(
+        default=100,
+        description='Maximum number of connections opened to Supabase'
+    )
+    POOL_MAX_KEEPALIVE: PositiveInt = Field(
+        default=20,
+        description='Maximum number of idle connections kept alive'
+    )
+    POOL_KEEPALIVE_EXPIRY: PositiveFloat = Field(
+        default=30.0,
+        description='Seconds before an idle connection is closed'
+    )
+    POOL_TIMEOUT: PositiveFloat = Field(
+        default=10.0,
+        description='Timeout in seconds of the requests to Supabase'
+    )
+    CLIENT_CACHE_SIZE: PositiveInt = Field(
+        default=1024,
+        description='Maximum number of authenticated clients kept in cache'
+    )
+    COUNT_STRATEGY: Literal['exact', 'planned', 'estimated', 'none'] = Field(
+        default='exact',
+        description='Default strategy to count the records of the list queries'
+    )
+    TOKEN_CACHE_SIZE: PositiveInt = Field(
+        default=4096,
+        description='Maximum number of verified token payloads kept in cache'
+    )
+    REFERENCE_CACHE_SIZE: PositiveInt = Field(
+        default=256,
+        description='Maximum number of tags and categories responses kept in cache'
+    )
+    REFERENCE_CACHE_TTL: PositiveFloat = Field(
+        default=60.0,
+        description='Seconds a cached tags or categories response is served'
+    )
+    LOADER_MAX_BATCH: PositiveInt = Field(
+        default=100,
+        description='Maximum number of records fetched by id in a single query'
+    )
+    BULK_MAX_SIZE: PositiveInt = Field(
+        default=1000,
+        description='Maximum number of items of a bulk request'
+    )
+    BULK_CONCURRENCY: PositiveInt = Field(
+        default=8,
+        description='Maximum number of updates in flight of a bulk update'
+    )
+    EXPORT_BATCH_SIZE: PositiveInt = Field(
+        default=500,
+        description='Number of records fetched by each query of the catalog export'
+    )
+    IMPORT_BATCH_SIZE: PositiveInt = Field(
+        default=1000,
+        description='Number of recipes of each insert of the import command'
+    )
+    IMPORT_CONCURRENCY: PositiveInt = Field(
+        default=8,
+        description='Maximum number of batches in flight of the import command'
+    )
+    IMPORT_RETRIES: NonNegativeInt = Field(
+        default=3,
+        description='Attempts of the import command to insert a failed batch again'
+    )
+    STORAGE_BACKEND: Literal['local', 'supabase'] = Field(
+        default='local',
+        description='Backend of the uploaded images, a directory of the server or Supabase Storage'
+    )
+    STORAGE_PATH: str = Field(
+        default='media',
+        description='Directory of the images of the local storage'
+    )
+    STORAGE_PUBLIC_URL: str = Field(
+        default='http://localhost:8000/media',
+        description='URL the images of the local storage are served from'
+    )
+    STORAGE_BUCKET: str = Field(
+        default='recipes',
+        description='Public bucket of the images in Supabase Storage'
+    )
+    STORAGE_MAX_AGE: PositiveInt = Field(
+        default=365 * 24 * 3600,
+        description='Seconds the content addressed images of the local storage are cached by the clients'
+    )
+    IMAGE_MAX_SIZE: PositiveInt = Field(
+        default=5 * 1024 * 1024,
+        description='Maximum size in bytes of an uploaded image'
+    )
+    IMAGE_WORKERS: PositiveInt = Field(
+        default=2,
+        description='Processes that generate the variants of the uploaded images'
+    )
+    IMAGE_QUEUE_DEPTH: NonNegativeInt = Field(
+        default=16,
+        description='Images waiting for a process, further images are stored without variants'
+    )
+    IMAGE_FORMATS: list[Literal['webp', 'avif']] = Field(
+        default=['webp', 'avif'],
+        description='Encodings of the image variants, the ones the installed Pillow cannot encode are skipped'
+    )
+    IMAGE_QUALITY: PositiveInt = Field(
+        default=80,
+        le=100,
+        description='Quality of the encoders of the image variants'
+    )
+    LOG_LEVEL: Literal['DEBUG', 'INFO', 'WARNING', 'ERROR'] = Field(
+        default='INFO',
+        description='Level of the loggers of the application, DEBUG writes the sampled debug records'
+    )
+    LOG_DEBUG_SAMPLE_RATIO: float = Field(
+        default=1.0,
+        ge=0.0,
+        le=1.0,
+        description='Ratio of the debug log records written, the other levels are always written'
+    )
+    METRICS_ENABLED: bool = Field(
+        default=True,
+        description='Record the metrics of the requests and controllers and serve them at /metrics'
+    )
+    TRACING_EXPORTER: Literal['none', 'console', 'file', 'otlp'] = Field(
+        default='none',
+        description='Destination of the spans of the requests, tracing is disabled with none'
+    )
+    TRACING_FILE: str = Field(
+        default='traces.ndjson',
+        description='File the spans are appended to by the file exporter'
+    )
+    TRACING_OTLP_ENDPOINT: str = Field(
+        default='http://localhost:4318/v1/traces',
+        description='OTLP/HTTP endpoint of the collector of the otlp exporter'
+    )
+    TRACING_SAMPLE_RATIO: float = Field(
+        default=1.0,
+        ge=0.0,
+        le=1.0,
+        description='Ratio of the traces started by the API that are exported'
+    )
+    TRACING_SERVICE_NAME: str = Field(
+        default='recipes-api',
+        description='Name of the service of the exported spans'
+    )
+    COMPRESSION_MIN_SIZE: PositiveInt = Field(
+        default=1024,
+        description='Minimum size in bytes of a response body to compress it'
+    )
+    COMPRESSION_THREAD_SIZE: PositiveInt = Field(
+        default=64 * 1024,
+        description='Size in bytes from which a body is compressed in a worker thread'
+    )
+    COMPRESSION_CACHE_SIZE: PositiveInt = Field(
+        default=64,
+        description='Maximum number of compressed bodies kept in cache'
+    )
+
     model_config = SettingsConfigDict(
         validate_default=False,
         env_file=('.local.env', '.prod.env'),
@@ -1,5 +1,7 @@
-from .db import Repository
+from .db import Repository, ClientPool, ClientView
 
 __all__ = [
-    'Repository'
+    'Repository',
+    'ClientPool',
+    'ClientView'
 ]
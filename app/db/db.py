@@ -1,21 +1,220 @@
 import copy
+import hashlib
+from types import MappingProxyType
+from collections.abc import Mapping
+
+import httpx
+from httpx import Headers, Limits, Timeout
 
 from gotrue import AsyncMemoryStorage
+from postgrest import AsyncPostgrestClient
+from storage3 import AsyncStorageClient
 
 from supabase.client import ClientOptions
+from supabase._async.auth_client import AsyncSupabaseAuthClient
 from supabase._async.client import AsyncClient, create_client
 
 from ..core.settings import settings
+from ..utils.cache import LRUCache
+from ..utils.tracing import tracer, TracingTransport
+
+
+class _ScopedSession:
+    """Proxy of a shared httpx session that injects the headers of a view
+
+        The proxy never owns the connections, closing it is a no-op and
+        the underlying session is only closed by the pool. It only exposes
+        what the PostgREST and storage clients read and is read only, so a
+        view cannot change the headers or the auth of the shared session
+    """
+    __slots__ = ('_session', '_headers')
+
+    def __init__(self, session: httpx.AsyncClient, headers: dict[str, str]) -> None:
+        object.__setattr__(self, '_session', session)
+        object.__setattr__(self, '_headers', MappingProxyType(dict(headers)))
+
+    def __setattr__(self, name: str, value) -> None:
+        raise AttributeError(f'Cannot set "{name}", the session is shared by all the views')
+
+    @property
+    def base_url(self) -> httpx.URL:
+        return self._session.base_url
+
+    @property
+    def headers(self) -> Mapping[str, str]:
+        """Read only copy of the headers sent by the view"""
+        headers = Headers(self._session.headers)
+        headers.update(self._headers)
+        return MappingProxyType(dict(headers))
+
+    async def request(self, method: str, url, *, headers=None, **kwargs) -> httpx.Response:
+        scoped = Headers(headers)
+        scoped.update(self._headers)
+        return await self._session.request(method, url, headers=scoped, **kwargs)
+
+    async def aclose(self) -> None:
+        """Connections are owned by the pool"""
+
+
+class _ScopedStorageClient(AsyncStorageClient):
+    """Storage client bound to the pooled storage session"""
+
+    def __init__(self, session: httpx.AsyncClient, headers: dict[str, str]) -> None:
+        self._shared = session
+        super().__init__(str(session.base_url), headers)
+
+    def _create_session(self, base_url: str, headers: dict[str, str], timeout: int):
+        return _ScopedSession(self._shared, headers)
+
+
+class _PooledPostgrestClient(AsyncPostgrestClient):
+    """PostgREST client whose session runs over the pool transport"""
+
+    def __init__(self, base_url: str, transport: httpx.AsyncBaseTransport, **kwargs) -> None:
+        self._transport = transport
+        super().__init__(base_url, **kwargs)
+
+    def create_session(self, base_url: str, headers: dict[str, str], timeout) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=timeout,
+            transport=self._transport)
+
+
+class ClientView:
+    """ClientView
+        Cheap per-request handle over the pooled Supabase sessions, it
+        only owns the authorization headers used for each request
+    """
+    __slots__ = ('supabase_key', 'scope', 'postgrest', '_auth_token', '_pool', '_storage')
+
+    def __init__(self, pool: 'ClientPool', token: str | None = None) -> None:
+        self._pool = pool
+        self._storage = None
+        self.supabase_key = pool.key
+        # Identity of the authorization, shared by the views of a token
+        self.scope = 'anon' if token is None else hashlib.sha256(token.encode()).hexdigest()
+        self._auth_token = {
+            'apiKey': pool.key,
+            'Authorization': f'Bearer {token or pool.key}',
+        }
+        self.postgrest = copy.copy(pool.postgrest)
+        self.postgrest.session = _ScopedSession(pool.postgrest.session, self._auth_token)
+
+    def table(self, table_name: str):
+        return self.postgrest.from_(table_name)
+
+    def from_(self, table_name: str):
+        return self.postgrest.from_(table_name)
+
+    def rpc(self, fn: str, params: dict):
+        return self.postgrest.rpc(fn, params)
+
+    @property
+    def storage(self) -> AsyncStorageClient:
+        if self._storage is None:
+            self._storage = _ScopedStorageClient(self._pool.storage, self._auth_token)
+        return self._storage
+
+    @property
+    def auth(self) -> AsyncSupabaseAuthClient:
+        """Stateless GoTrue client, a new one is returned on each access
+            to not share sessions between users
+        """
+        return AsyncSupabaseAuthClient(
+            url=self._pool.auth_url,
+            headers=dict(self._auth_token),
+            auto_refresh_token=False,
+            persist_session=False,
+            storage=AsyncMemoryStorage(),
+            http_client=self._pool.http,
+        )
+
+    async def aclose(self) -> None:
+        """Views do not own connections, kept to match the client interface"""
+
+
+class ClientPool:
+    """ClientPool
+        Long-lived httpx connection pool shared by the PostgREST, storage
+        and GoTrue sessions of every client view
+    """
+
+    def __init__(
+            self,
+            url: str,
+            key: str,
+            limits: Limits,
+            timeout: Timeout,
+            schema: str = 'public',
+            max_views: int = 1024,
+            transport: httpx.AsyncBaseTransport | None = None) -> None:
+        self.key = key
+        self.rest_url = f'{url}/rest/v1'
+        self.auth_url = f'{url}/auth/v1'
+        self.storage_url = f'{url}/storage/v1'
+        self._transport = transport or httpx.AsyncHTTPTransport(limits=limits)
+        # Every session shares the connections, each request is traced
+        traced = TracingTransport(self._transport)
+        self.http = httpx.AsyncClient(timeout=timeout, transport=traced)
+        self.storage = httpx.AsyncClient(
+            base_url=self.storage_url,
+            timeout=timeout,
+            transport=traced)
+        self.postgrest = _PooledPostgrestClient(
+            self.rest_url,
+            traced,
+            schema=schema,
+            headers={
+                'apiKey': key,
+                'Authorization': f'Bearer {key}',
+            },
+            timeout=timeout)
+        self.closed = False
+        self.anonymous = ClientView(self)
+        self.views: LRUCache[str, ClientView] = LRUCache(max_views)
+
+    def view(self, token: str | None = None, expires_at: float | None = None) -> ClientView:
+        """View authorized with the token, the anonymous view is shared
+            between all the requests without token.
+            Views of tokens with a known expiration are cached until then
+        """
+        if token is None:
+            return self.anonymous
+        if expires_at is None:
+            return ClientView(self, token)
+        key = hashlib.sha256(token.encode()).hexdigest()
+        view = self.views.get(key)
+        if view is None:
+            view = ClientView(self, token)
+            self.views.set(key, view, expires_at=expires_at)
+        return view
+
+    def stats(self) -> dict[str, int]:
+        """Client views cached and connections of the pool"""
+        # httpx does not expose its connection pool, read it when present
+        connections = getattr(getattr(self._transport, '_pool', None), 'connections', [])
+        return {
+            'views': len(self.views),
+            'connections': len(connections),
+            'idle_connections': sum(1 for connection in connections if connection.is_idle()),
+        }
+
+    async def aclose(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        self.views.clear()
+        await self.postgrest.aclose()
+        await self.storage.aclose()
+        await self.http.aclose()
 
 
 class Repository:
     """Supabase repository to administrate connections to DB"""
     admin: AsyncClient = None
-    client_options = ClientOptions(
-        auto_refresh_token=False,
-        postgrest_client_timeout=10,
-        storage=AsyncMemoryStorage()
-    )
+    pool: ClientPool = None
 
     @classmethod
     async def init_admin(cls):
@@ -37,10 +236,35 @@ class Repository:
         await cls.admin.storage.aclose()
 
     @classmethod
-    async def get_client(cls,) -> AsyncClient | None:
-        client: AsyncClient = await create_client(
-            settings.SUPABASE_URL.unicode_string(),
+    async def init_pool(cls, transport: httpx.AsyncBaseTransport | None = None):
+        if cls.pool is not None and not cls.pool.closed:
+            await cls.pool.aclose()
+        cls.pool = ClientPool(
+            settings.SUPABASE_URL.unicode_string().rstrip('/'),
             settings.ANON_KEY.get_secret_value(),
-            options=copy.deepcopy(cls.client_options)
+            limits=Limits(
+                max_connections=settings.POOL_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.POOL_MAX_KEEPALIVE,
+                keepalive_expiry=settings.POOL_KEEPALIVE_EXPIRY
+            ),
+            timeout=Timeout(settings.POOL_TIMEOUT),
+            max_views=settings.CLIENT_CACHE_SIZE,
+            transport=transport
         )
-        return client
+
+    @classmethod
+    async def close_pool(cls):
+        if cls.pool is None:
+            return
+        await cls.pool.aclose()
+        cls.pool = None
+
+    @classmethod
+    async def get_client(cls, token: str | None = None, expires_at: float | None = None) -> ClientView:
+        """Per-request view over the pool, the anonymous key is used
+            when no token is given
+        """
+        with tracer.span('Repository.get_client', authenticated=token is not None):
+            if cls.pool is None or cls.pool.closed:
+                await cls.init_pool()
+            return cls.pool.view(token, expires_at)
@@ -0,0 +1,94 @@
+-- Tag filter of the recipes
+--
+-- Denormalizes the tags of each recipe into `recipes.tag_ids`, kept in sync
+-- from the `recipes_tags` junction table, so PostgREST can filter with the
+-- array operators `cs` (all the tags) and `ov` (any of the tags) through a
+-- GIN index instead of unnesting the aggregated tags of every recipe.
+--
+-- Assumed schema (Supabase project of the API):
+--   recipes(id, created_at, updated_at, title, description, ingredients,
+--           instructions, image, category_id -> categories, user_id)
+--   tags(id, created_at, updated_at, name)
+--   categories(id, created_at, updated_at, name)
+--   recipes_tags(recipe_id -> recipes, tag_id -> tags)
+
+begin;
+
+alter table public.recipes
+    add column if not exists tag_ids uuid[] not null default '{}';
+
+update public.recipes as r
+set tag_ids = coalesce(
+    (select array_agg(rt.tag_id order by rt.tag_id)
+     from public.recipes_tags as rt
+     where rt.recipe_id = r.id),
+    '{}');
+
+create index if not exists recipes_tag_ids_idx
+    on public.recipes using gin (tag_ids);
+
+-- Reverse lookups of the junction table, also used by the trigger below
+create index if not exists recipes_tags_tag_id_recipe_id_idx
+    on public.recipes_tags (tag_id, recipe_id);
+
+create or replace function public.sync_recipe_tag_ids()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    target uuid := coalesce(new.recipe_id, old.recipe_id);
+begin
+    update public.recipes
+    set tag_ids = coalesce(
+        (select array_agg(tag_id order by tag_id)
+         from public.recipes_tags
+         where recipe_id = target),
+        '{}')
+    where id = target;
+    if tg_op = 'UPDATE' and new.recipe_id is distinct from old.recipe_id then
+        update public.recipes
+        set tag_ids = coalesce(
+            (select array_agg(tag_id order by tag_id)
+             from public.recipes_tags
+             where recipe_id = old.recipe_id),
+            '{}')
+        where id = old.recipe_id;
+    end if;
+    return null;
+end;
+$$;
+
+drop trigger if exists recipes_tags_sync_tag_ids on public.recipes_tags;
+create trigger recipes_tags_sync_tag_ids
+    after insert or update or delete on public.recipes_tags
+    for each row execute function public.sync_recipe_tag_ids();
+
+-- The view keeps its columns and exposes the array to filter by
+drop view if exists public.recipes_full;
+create view public.recipes_full
+with (security_invoker = on)
+as
+select
+    r.id,
+    r.created_at,
+    r.updated_at,
+    r.title,
+    r.description,
+    r.ingredients,
+    r.instructions,
+    r.image,
+    r.user_id,
+    r.category_id,
+    r.tag_ids,
+    to_jsonb(c) as category,
+    coalesce(
+        (select jsonb_agg(to_jsonb(t) order by t.name)
+         from public.tags as t
+         where t.id = any (r.tag_ids)),
+        '[]'::jsonb) as tags
+from public.recipes as r
+left join public.categories as c on c.id = r.category_id;
+
+commit;
@@ -0,0 +1,82 @@
+-- Ranked full-text search of the recipes
+--
+-- Adds a weighted `tsvector` over the title, description and ingredients
+-- of the recipes with its GIN index, a trigram index of the titles for the
+-- `ilike` filter and the short prefix fallback, and the `search_recipes`
+-- function called by the API as `/rpc/search_recipes`.
+--
+-- Depends on 0001_recipe_tag_ids.sql for the `recipes_full` view.
+
+begin;
+
+create extension if not exists pg_trgm with schema extensions;
+
+alter table public.recipes
+    add column if not exists search tsvector
+    generated always as (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(ingredients, '')), 'C')
+    ) stored;
+
+create index if not exists recipes_search_idx
+    on public.recipes using gin (search);
+
+create index if not exists recipes_title_trgm_idx
+    on public.recipes using gin (title extensions.gin_trgm_ops);
+
+-- Rows of the view ranked by relevance, PostgREST applies the filters,
+-- ordering, projection and pagination requested over the result set.
+-- Queries of less than three characters or without any lexeme, and full
+-- text searches without matches, fall back to the trigram similarity and
+-- prefix of the titles
+create or replace function public.search_recipes(q text)
+returns table (
+    id uuid,
+    created_at timestamptz,
+    updated_at timestamptz,
+    title text,
+    description text,
+    ingredients text,
+    instructions text,
+    image text,
+    user_id uuid,
+    category_id uuid,
+    tag_ids uuid[],
+    category jsonb,
+    tags jsonb,
+    rank real
+)
+language plpgsql
+stable
+security invoker
+set search_path = public, extensions
+as $$
+#variable_conflict use_column
+declare
+    term text := btrim(q);
+    tsq tsquery := websearch_to_tsquery('english', btrim(q));
+begin
+    if char_length(term) >= 3 and numnode(tsq) > 0 then
+        return query
+            select v.*, ts_rank_cd(r.search, tsq) as rank
+            from public.recipes as r
+            join public.recipes_full as v on v.id = r.id
+            where r.search @@ tsq;
+        if found then
+            return;
+        end if;
+    end if;
+
+    return query
+        select v.*, similarity(r.title, term) as rank
+        from public.recipes as r
+        join public.recipes_full as v on v.id = r.id
+        where r.title ilike replace(replace(term, '%', '\%'), '_', '\_') || '%'
+           or r.title % term;
+end;
+$$;
+
+grant execute on function public.search_recipes(text) to anon, authenticated;
+
+commit;
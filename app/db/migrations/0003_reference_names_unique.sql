@@ -0,0 +1,18 @@
+-- Unique names of tags and categories
+--
+-- The bulk creation of tags and categories inserts the whole batch with
+-- `on_conflict=name` and `resolution=ignore-duplicates`, PostgREST needs a
+-- unique constraint on the column to resolve the conflicts, otherwise the
+-- insert fails with `42P10`.
+--
+-- Existing duplicated names must be merged before applying the migration.
+
+begin;
+
+create unique index if not exists tags_name_key
+    on public.tags (name);
+
+create unique index if not exists categories_name_key
+    on public.categories (name);
+
+commit;
@@ -0,0 +1,60 @@
+-- Batched insert of recipes
+--
+-- `insert_recipe` stores one recipe per request, the import command sends
+-- batches of recipes to `insert_recipes` instead, a single statement that
+-- inserts the recipes and their tags. The ids are assigned by the client so
+-- a batch retried after a lost response is not inserted twice, the recipes
+-- already stored are skipped and only the new ones are counted.
+--
+-- Assumed schema: the one of `0001_recipe_tag_ids.sql`, with the primary
+-- key of `recipes_tags` on `(recipe_id, tag_id)`.
+
+begin;
+
+create or replace function public.insert_recipes(recipes_json jsonb)
+returns integer
+language plpgsql
+volatile
+security invoker
+set search_path = public
+as $$
+declare
+    inserted integer;
+begin
+    with input as (
+        select *
+        from jsonb_to_recordset(recipes_json) as r (
+            id uuid,
+            title text,
+            description text,
+            ingredients text,
+            instructions text,
+            image text,
+            category_id uuid,
+            user_id uuid,
+            tags uuid[]
+        )
+    ), stored as (
+        insert into public.recipes (
+            id, title, description, ingredients, instructions, image, category_id, user_id
+        )
+        select id, title, description, ingredients, instructions, image, category_id, user_id
+        from input
+        on conflict (id) do nothing
+        returning id
+    ), tagged as (
+        insert into public.recipes_tags (recipe_id, tag_id)
+        select distinct input.id, tag.id
+        from input
+        join stored using (id)
+        cross join lateral unnest(coalesce(input.tags, '{}')) as tag (id)
+    )
+    select count(*) into inserted from stored;
+    return inserted;
+end;
+$$;
+
+revoke execute on function public.insert_recipes(jsonb) from public, anon;
+grant execute on function public.insert_recipes(jsonb) to authenticated, service_role;
+
+commit;
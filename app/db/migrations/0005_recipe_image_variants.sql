@@ -0,0 +1,94 @@
+-- Variants of the recipe images
+--
+-- The API stores the original image of a recipe and generates resized
+-- variants of it in background, once they are stored their URLs are set in
+-- `images` as `{"thumbnail": {"webp": "...", "avif": "..."}, ...}`. The
+-- recipes created before, or whose variants could not be generated, keep
+-- `images` null and only have their original `image`.
+--
+-- Depends on 0002_recipe_search.sql for the `search_recipes` function.
+
+begin;
+
+alter table public.recipes
+    add column if not exists images jsonb;
+
+-- The new column is appended so the view can be replaced in place
+create or replace view public.recipes_full
+with (security_invoker = on)
+as
+select
+    r.id,
+    r.created_at,
+    r.updated_at,
+    r.title,
+    r.description,
+    r.ingredients,
+    r.instructions,
+    r.image,
+    r.user_id,
+    r.category_id,
+    r.tag_ids,
+    to_jsonb(c) as category,
+    coalesce(
+        (select jsonb_agg(to_jsonb(t) order by t.name)
+         from public.tags as t
+         where t.id = any (r.tag_ids)),
+        '[]'::jsonb) as tags,
+    r.images
+from public.recipes as r
+left join public.categories as c on c.id = r.category_id;
+
+-- The returned table changes, the function is dropped and created again
+drop function if exists public.search_recipes(text);
+create function public.search_recipes(q text)
+returns table (
+    id uuid,
+    created_at timestamptz,
+    updated_at timestamptz,
+    title text,
+    description text,
+    ingredients text,
+    instructions text,
+    image text,
+    user_id uuid,
+    category_id uuid,
+    tag_ids uuid[],
+    category jsonb,
+    tags jsonb,
+    images jsonb,
+    rank real
+)
+language plpgsql
+stable
+security invoker
+set search_path = public, extensions
+as $$
+#variable_conflict use_column
+declare
+    term text := btrim(q);
+    tsq tsquery := websearch_to_tsquery('english', btrim(q));
+begin
+    if char_length(term) >= 3 and numnode(tsq) > 0 then
+        return query
+            select v.*, ts_rank_cd(r.search, tsq) as rank
+            from public.recipes as r
+            join public.recipes_full as v on v.id = r.id
+            where r.search @@ tsq;
+        if found then
+            return;
+        end if;
+    end if;
+
+    return query
+        select v.*, similarity(r.title, term) as rank
+        from public.recipes as r
+        join public.recipes_full as v on v.id = r.id
+        where r.title ilike replace(replace(term, '%', '\%'), '_', '\_') || '%'
+           or r.title % term;
+end;
+$$;
+
+grant execute on function public.search_recipes(text) to anon, authenticated;
+
+commit;
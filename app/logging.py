@@ -1,3 +1,167 @@
+import copy
+import json
+import queue
+import random
 import logging
+import logging.config
+from pathlib import Path
+from datetime import datetime, timezone
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
 
 logger = logging.getLogger('fastapi')
+
+CONFIG_FILE = Path(__file__).absolute().parent.joinpath('logger_config.json')
+
+# Correlation id of the request being served, set by the middleware
+request_id: ContextVar[str | None] = ContextVar('request_id', default=None)
+
+
+class ContextFilter(logging.Filter):
+    """Add the request id and the trace id of the current span to the
+        records, it runs in the thread of the caller where the context
+        variables are set
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        # Imported here, the tracing imports the logger of this module
+        from app.utils.tracing import tracer
+        record.request_id = request_id.get()
+        span = tracer.current()
+        record.trace_id = span.trace_id if span is not None else None
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """SamplingFilter
+        Keep a ratio of the records up to a level, the noisy debug records
+        are sampled while the warnings and errors are always kept
+        \f
+        :param ratio: ratio of the records kept
+        :param level: highest level sampled
+    """
+
+    def __init__(self, ratio: float = 1.0, level: int = logging.DEBUG) -> None:
+        super().__init__()
+        self.ratio = ratio
+        self.level = level
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno > self.level or self.ratio >= 1.0 or random.random() < self.ratio
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per record with the correlation fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'timestamp': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'module': record.module,
+            'function': record.funcName,
+            'line': record.lineno,
+            'message': record.getMessage(),
+            'request_id': getattr(record, 'request_id', None),
+            'trace_id': getattr(record, 'trace_id', None),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class _QueueHandler(QueueHandler):
+    """Enqueue the records of a logger with the handlers it had, the
+        message is merged with its arguments before leaving the thread
+    """
+
+    def __init__(self, records: queue.Queue, sinks: list[logging.Handler]) -> None:
+        super().__init__(records)
+        self.sinks = sinks
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        record.sinks = self.sinks
+        return record
+
+
+class _Dispatcher(logging.Handler):
+    """Handler of the listener, each record is emitted by the handlers of
+        the logger that queued it
+    """
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        for handler in record.sinks:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+        return True
+
+
+class LogQueue:
+    """LogQueue
+        Apply the logging configuration and move the handlers of its
+        loggers behind a queue, the records are formatted and written by
+        a listener thread so a log call never writes in the event loop
+        \f
+        :param config_file: JSON of the ``logging.config`` dict schema
+    """
+
+    def __init__(self, config_file: Path = CONFIG_FILE) -> None:
+        self.config_file = config_file
+        self.listener: QueueListener | None = None
+        self._handlers: dict[str, list[logging.Handler]] = {}
+
+    def start(self, debug_sample_ratio: float = 1.0, level: str | None = None) -> None:
+        """start
+            Configure the loggers and start the listener
+            \f
+            :param debug_sample_ratio: ratio of the debug records written
+            :param level: level of the loggers instead of the configured one
+        """
+        if self.listener is not None:
+            return
+        config = json.loads(self.config_file.read_text())
+        logging.config.dictConfig(config)
+        records: queue.Queue = queue.Queue()
+        filters = [ContextFilter(), SamplingFilter(debug_sample_ratio)]
+        for name in config.get('loggers', {}):
+            named = logging.getLogger(name)
+            if level is not None:
+                named.setLevel(level)
+            self._handlers[name] = named.handlers[:]
+            handler = _QueueHandler(records, named.handlers[:])
+            for log_filter in filters:
+                handler.addFilter(log_filter)
+            named.handlers = [handler]
+        self.listener = QueueListener(records, _Dispatcher())
+        self.listener.start()
+
+    def stop(self) -> None:
+        """Write the queued records and give the loggers their handlers"""
+        if self.listener is None:
+            return
+        self.listener.stop()
+        self.listener = None
+        for name, handlers in self._handlers.items():
+            logging.getLogger(name).handlers = handlers
+        self._handlers.clear()
+
+
+log_queue = LogQueue()
+
+__all__ = [
+    'logger',
+    'request_id',
+    'log_queue',
+    'LogQueue',
+    'ContextFilter',
+    'SamplingFilter',
+    'JSONFormatter',
+]
@@ -1,21 +1,63 @@
+from urllib.parse import urlsplit
+
 from fastapi import FastAPI
 from fastapi.exceptions import RequestValidationError
+from starlette.exceptions import HTTPException
 
 from app import routers
+from app.routers import metrics
 from app.core.events import lifespan
 from app.core.settings import settings
-from app.utils.exceptions.handlers import validation_error
+from app.storage import storage, LocalStorage, MediaFiles
+from app.core.middleware import (
+    CompressionMiddleware,
+    MetricsMiddleware,
+    TracingMiddleware,
+    RequestIdMiddleware
+)
+from app.utils.responses import CoreJSONResponse
+from app.utils.exceptions.handlers import validation_error, http_error
 
 
 app = FastAPI(
     lifespan=lifespan,
     debug=settings.DEBUG,
     title=settings.PROJECT_NAME,
+    default_response_class=CoreJSONResponse,
     summary='API madded following well practice for an e-commerce of food')
 
 app.exception_handler(RequestValidationError)(validation_error)
+app.exception_handler(HTTPException)(http_error)
+
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MIN_SIZE,
+    thread_size=settings.COMPRESSION_THREAD_SIZE,
+    cache_size=settings.COMPRESSION_CACHE_SIZE
+)
+
+app.add_middleware(TracingMiddleware)
+
+# The latency includes the compression and the tracing
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+# Added last to be the outermost, every log of a request carries its id
+app.add_middleware(RequestIdMiddleware)
 
 app.include_router(
     routers.router,
     prefix='/api'
 )
+
+if settings.METRICS_ENABLED:
+    app.include_router(metrics.router)
+
+# The images of the local storage are served from the path of their URL,
+# a proxy in front of the API can serve the same directory instead
+if isinstance(storage, LocalStorage):
+    app.mount(
+        urlsplit(settings.STORAGE_PUBLIC_URL).path.rstrip('/') or '/media',
+        MediaFiles(storage, max_age=settings.STORAGE_MAX_AGE),
+        name='media'
+    )
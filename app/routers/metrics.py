@@ -0,0 +1,73 @@
+from fastapi import APIRouter, Response
+
+from app.db import Repository
+from app.storage import processor
+from app.schemas.auth import TokenPayload
+from app.controller import TagsController, RecipesController, CategoriesController
+from app.controller.base import flights
+from app.utils.metrics import CONTENT_TYPE, registry, counter, gauge
+
+_CONTROLLERS = {
+    'tags': TagsController,
+    'recipes': RecipesController,
+    'categories': CategoriesController,
+}
+
+
+def _caches() -> dict[str, dict[str, int]]:
+    return {
+        'tags': TagsController.cache_stats(),
+        'categories': CategoriesController.cache_stats(),
+        'tokens': TokenPayload.cache_stats(),
+    }
+
+
+def _by_cache(field: str):
+    return lambda: {(name, ): stats[field] for name, stats in _caches().items()}
+
+
+def _by_loader(field: str):
+    return lambda: {
+        (name, ): controller.loader_stats()[field]
+        for name, controller in _CONTROLLERS.items()
+    }
+
+
+def _pool() -> dict[tuple[str], int]:
+    if Repository.pool is None or Repository.pool.closed:
+        return {}
+    return {(state, ): value for state, value in Repository.pool.stats().items()}
+
+
+gauge('supabase_clients', 'Client views cached and connections opened to Supabase', ('state', ), _pool)
+gauge('cache_entries', 'Entries of the in-memory caches', ('cache', ), _by_cache('size'))
+counter('cache_hits', 'Hits of the in-memory caches', ('cache', ), _by_cache('hits'))
+counter('cache_misses', 'Misses of the in-memory caches', ('cache', ), _by_cache('misses'))
+counter('cache_evictions', 'Evictions of the in-memory caches', ('cache', ), _by_cache('evictions'))
+gauge('singleflight_in_flight', 'Shared calls being executed', (), lambda: {(): len(flights)})
+counter(
+    'singleflight_executed',
+    'Calls executed by the single flight by method',
+    ('method', ),
+    lambda: {(label, ): value for label, value in flights.executed.items()})
+counter(
+    'singleflight_collapsed',
+    'Calls served by a shared call by method',
+    ('method', ),
+    lambda: {(label, ): value for label, value in flights.collapsed.items()})
+counter('loader_loads', 'Records requested by id', ('controller', ), _by_loader('loads'))
+counter('loader_batches', 'Queries of the records requested by id', ('controller', ), _by_loader('batches'))
+gauge('image_processing_pending', 'Images being processed or waiting for a worker', (), lambda: {(): processor.pending})
+counter('image_processing_processed', 'Images whose variants were generated', (), lambda: {(): processor.processed})
+counter('image_processing_rejected', 'Images rejected as the queue was full', (), lambda: {(): processor.rejected})
+
+router = APIRouter()
+
+
+@router.get('/metrics', include_in_schema=False)
+async def metrics() -> Response:
+    """Metrics of the API in the Prometheus text format"""
+    return Response(registry.render(), media_type=CONTENT_TYPE)
+
+
+__all__ = ['router']
@@ -1,23 +1,32 @@
 from typing import Annotated
 
-from fastapi import status, Depends
-from fastapi import APIRouter, Request
+from fastapi import status, Body, Depends, Query
+from fastapi import APIRouter, HTTPException, Request
 
-from app.utils import PathID
+from app.utils import PathID, UUIDItems, UUIDList, next_link
 from app.core.deps import Anon, Client, User
 from app.controller import CategoriesController
-from app.schemas.response import Errors, Response
+from app.core.settings import settings
+from app.schemas.response import Errors, Response, BulkItem
 from app.schemas.categories import (
     CategoryIn,
     CategoryOut,
     CategoryFilter,
-    CategorySave
+    CategorySave,
+    CategoryUpdate
+)
+from app.utils.conditional import (
+    cache_headers,
+    is_conditional,
+    not_modified,
+    not_modified_response
 )
 from app.utils.exceptions.common import (
     not_found,
     server_error,
     expired_token,
     unauthenticated,
+    unprocessed_entity
 )
 
 Responses = Response[list[CategoryOut] | CategoryOut | None]
@@ -35,7 +44,6 @@ async def categories(
         category_query: Annotated[CategoryFilter, Depends()]=None
     ):
     # Indexing pages at zero in server
-    next_params = category_query.model_copy(update={'page': category_query.page + 1})
     category_query.page -= 1
 
     response = await CategoriesController.select(client, category_query)
@@ -44,14 +52,17 @@ async def categories(
             request,
             'Internal error retrieving categories resources')
 
-    return Response[list[CategoryOut]](
+    headers = cache_headers(request, response.version, response.updated_at)
+    if not_modified(request, headers):
+        return not_modified_response(headers)
+    return Response[list[CategoryOut]].render(
+        headers=headers,
         count=response.count,
+        count_strategy=response.count_strategy,
         data=response.data,
         resource_type='Category',
         path=request.url.path,
-        next=request.url.path + request.url.replace_query_params(
-            **next_params.model_dump(mode='json', exclude_none=True, exclude_defaults=True)
-        ).query
+        next=next_link(request, response.cursor)
     )
 
 
@@ -65,6 +76,12 @@ async def category(
         client: Anon,
         model_id: PathID
     ):
+    if is_conditional(request):
+        current = await CategoriesController.modified(client, model_id)
+        headers = cache_headers(request, current.version, current.updated_at)
+        if not_modified(request, headers):
+            return not_modified_response(headers)
+
     response = await CategoriesController.unique(client, model_id)
 
     if response.error == Errors.NO_RETURN:
@@ -79,7 +96,8 @@ async def category(
             'Error retrieving Category',
         )
 
-    return Response[CategoryOut](
+    return Response[CategoryOut].render(
+        headers=cache_headers(request, response.version, response.updated_at),
         data=response.data,
         resource_type='Category',
         count=response.count,
@@ -189,3 +207,126 @@ async def delete(
         resource_type='Category',
         count=response.count,
         path=request.url.path)
+
+
+@router.post(
+    '/bulk',
+    response_model=Response[list[BulkItem[CategoryOut]]],
+    response_model_exclude_none=True,
+    description='Save many category resources in a single request')
+async def save_many(
+        request: Request,
+        user: User,
+        client: Client,
+        new_categories: Annotated[
+            list[CategoryIn],
+            Body(min_length=1, max_length=settings.BULK_MAX_SIZE)]
+    ):
+    """POST Category bulk
+        Items with a name already stored are reported as existing, the
+        repeated ones in the request as duplicates
+        \f
+        :param request: request from client
+        :param user: authenticated user
+        :param client: DB session client
+        :param new_categories: categories to store
+    """
+    if not user:
+        raise unauthenticated(request)
+
+    response = await CategoriesController.save_many(
+        client,
+        [CategorySave(**model.model_dump(mode='python')) for model in new_categories])
+    if not response.success:
+        raise server_error(
+            request,
+            'Internal error storing resources',
+        )
+
+    return Response[list[BulkItem[CategoryOut]]].render(
+        data=response.data,
+        resource_type='Category',
+        count=response.count,
+        path=request.url.path
+    )
+
+
+@router.patch(
+    '/bulk',
+    response_model=Response[list[BulkItem[CategoryOut]]],
+    response_model_exclude_none=True,
+    description='Update many category resources in a single request')
+async def update_many(
+        request: Request,
+        user: User,
+        client: Client,
+        categories: Annotated[
+            list[CategoryUpdate],
+            Body(min_length=1, max_length=settings.BULK_MAX_SIZE)]
+    ):
+    """PATCH Category bulk
+        Items without a stored resource are reported as not found, the
+        repeated ids in the request as duplicates
+        \f
+        :param request: request from client
+        :param user: authenticated user
+        :param client: DB session client
+        :param categories: categories to update with their ids
+    """
+    if not user:
+        raise unauthenticated(request)
+
+    response = await CategoriesController.update_many(client, categories)
+    if not response.success:
+        raise server_error(
+            request,
+            'Internal error updating resources',
+        )
+
+    return Response[list[BulkItem[CategoryOut]]].render(
+        data=response.data,
+        resource_type='Category',
+        count=response.count,
+        path=request.url.path
+    )
+
+
+@router.delete(
+    '/bulk',
+    response_model=Response[list[BulkItem]],
+    response_model_exclude_none=True,
+    description='Delete many category resources in a single request')
+async def delete_many(
+        request: Request,
+        user: User,
+        client: Client,
+        ids: Annotated[UUIDItems, Query(description='Comma separated ids of the resources to delete')]
+    ):
+    if not user:
+        raise unauthenticated(request)
+
+    ids = ids.split(',')
+    if len(ids) > settings.BULK_MAX_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=unprocessed_entity(
+                request,
+                data=[{'type': 'too_long', 'loc': 'query-> ids', 'msg': f'At most {settings.BULK_MAX_SIZE} ids'}],
+                msg='Unprocessed entity, too many resources to delete'
+            )
+        )
+
+    response = await CategoriesController.delete_many(client, ids)
+    if not response.success:
+        raise server_error(
+            request,
+            'Internal error deleting resources',
+        )
+
+    return Response[list[BulkItem]].render(
+        message='Resources delete successfully',
+        data=response.data,
+        resource_type='Category',
+        count=response.count,
+        path=request.url.path
+    )
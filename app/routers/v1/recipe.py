@@ -1,33 +1,94 @@
 from typing import Annotated
+from collections.abc import AsyncIterator
 
-from fastapi import status, Depends, Body
-from fastapi import APIRouter, Request, UploadFile
+import httpx
+from fastapi import status, Depends
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from pydantic import UUID4
+from pydantic_core import ValidationError
+from storage3.utils import StorageException
+from supabase._async.client import AsyncClient
 
 from app.logging import logger
-from app.utils import PathID, ImageFile
+from app.utils import PathID, next_link
+from app.storage import (
+    storage,
+    processor,
+    StagedFile,
+    StreamingForm,
+    ProcessingBusy,
+    UploadError,
+    UploadTooLarge,
+    UnsupportedMedia
+)
+from app.core.settings import settings
+from app.utils.responses import ndjson
 from app.controller import RecipesController
 from app.core.deps import Anon, Client, User
-from app.schemas.response import Errors, Response
+from app.schemas.response import ControllerResponse, Errors, Response
 from app.schemas.recipes import (
     RecipeIn,
     RecipeOut,
     RecipeSave,
     RecipeFilter,
+    RecipeExport,
+    RecipeSummary,
+)
+from app.utils.conditional import (
+    cache_headers,
+    is_conditional,
+    not_modified,
+    not_modified_response
 )
 from app.utils.exceptions.common import (
     not_found,
+    bad_request,
     server_error,
     expired_token,
-    unauthenticated
+    unauthenticated,
+    payload_too_large,
+    unprocessed_entity,
+    unsupported_media_type
 )
 
 
-# TODO: Make real save uploaded files
-def fake_save(file: UploadFile):
-    logger.debug('Fake saving "%s"', file.filename)
-    return f'http://localhost:8000/{file.filename}'
+# Bytes of the form besides the image, the recipe and the multipart framing
+FORM_MAX_SIZE = 64 * 1024
+
+
+async def _process_image(client: AsyncClient, recipe_id: UUID4, image: StagedFile) -> None:
+    """Store the variants of the image of a new recipe, run once the
+        response was sent. The recipe keeps only its original image when
+        the processing queue is full or the processing fails
+    """
+    variants = []
+    try:
+        variants = await processor.variants(image.path, storage.staging)
+        prefix = image.key.rsplit('.', 1)[0]
+        images = {}
+        for name, format_name, variant in variants:
+            stored = await storage.store(
+                client,
+                variant,
+                key=f'{prefix}/{name}.{format_name}',
+                discard=False)
+            images.setdefault(name, {})[format_name] = stored.url
+        response = await RecipesController.set_images(client, recipe_id, images)
+        if not response.success:
+            logger.error('Cannot set the image variants of the recipe "%s"', recipe_id)
+    except ProcessingBusy:
+        logger.warning('Image of the recipe "%s" kept without variants, the queue is full', recipe_id)
+    except Exception as error:
+        # Nothing can be reported to the client once the response was sent
+        logger.error('Error processing the image of the recipe "%s" "%s"', recipe_id, error)
+    finally:
+        for _, _, variant in variants:
+            await variant.discard()
+        await image.discard()
 
-Responses = Response[list[RecipeOut] | RecipeOut | dict]
+
+Responses = Response[list[RecipeOut] | list[RecipeSummary] | RecipeOut | dict]
 
 router = APIRouter()
 
@@ -35,14 +96,23 @@ router = APIRouter()
     '/',
     response_model=Responses,
     response_model_exclude_none=True,
-    description='Get all recipes available',)
+    description='Get all recipes available, only the summary fields unless other fields are requested',)
 async def recipes(
         request: Request,
         client: Anon,
         recipe_query: Annotated[RecipeFilter, Depends()]=None
     ):
+    if recipe_query.q and recipe_query.cursor:
+        # Ranked results have no keyset, they are paginated by page
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=unprocessed_entity(
+                request,
+                data=[{'type': 'value_error', 'loc': 'query-> cursor', 'msg': 'A search is paginated by page, not by cursor'}],
+                msg='Unprocessed entity, cursor given with a search'
+            )
+        )
     # Indexing pages at zero in server
-    next_params = recipe_query.model_copy(update={'page': recipe_query.page + 1})
     recipe_query.page -= 1
 
     response = await RecipesController.select(client, recipe_query)
@@ -52,14 +122,75 @@ async def recipes(
             'Error retrieving recipes resources',
         )
 
-    return Response[list[RecipeOut]](
+    headers = cache_headers(request, response.version, response.updated_at)
+    if not_modified(request, headers):
+        return not_modified_response(headers)
+    return Response[list[RecipeOut] | list[RecipeSummary]].render(
+        headers=headers,
         count=response.count,
+        count_strategy=response.count_strategy,
         data=response.data,
         resource_type='Recipe',
         path=request.url.path,
-        next=request.url.path + request.url.replace_query_params(
-            **next_params.model_dump(mode='json', exclude_defaults=True, exclude_none=True)
-        ).query
+        next=next_link(request, response.cursor, response.next_page)
+    )
+
+
+async def _export(
+        client: AsyncClient,
+        params: RecipeExport,
+        response: ControllerResponse) -> AsyncIterator[bytes]:
+    """Lines of the export, the next batch is only requested once the
+        previous one was sent so a slow client holds the export back and
+        a single batch is kept in memory
+    """
+    while True:
+        if response.data:
+            yield ndjson(response.data)
+        if response.cursor is None:
+            return
+        cursor = response.cursor
+        response = await RecipesController.export(client, params, cursor)
+        if not response.success:
+            # The status was already sent, the connection is aborted so
+            # the client does not take the export as complete
+            logger.error('Recipes export interrupted after cursor "%s"', cursor)
+            raise RuntimeError('Recipes export interrupted')
+
+
+@router.get(
+    '/export',
+    response_class=StreamingResponse,
+    responses={
+        status.HTTP_200_OK: {
+            'content': {'application/x-ndjson': {}},
+            'description': 'One recipe per line ordered by creation date',
+        }
+    },
+    description='Export all the recipes as newline delimited JSON')
+async def export(
+        request: Request,
+        client: Anon,
+        export_query: Annotated[RecipeExport, Depends()]=None
+    ):
+    """GET Recipes export
+        Stream the whole catalog, or the recipes of the filters, in
+        batches over the keyset of the recipes instead of pages
+        \f
+        :param request: request from client
+        :param client: DB session client
+        :param export_query: recipe fields to filter
+    """
+    response = await RecipesController.export(client, export_query)
+    if not response.success:
+        raise server_error(
+            request,
+            'Error exporting recipes resources',
+        )
+
+    return StreamingResponse(
+        _export(client, export_query, response),
+        media_type='application/x-ndjson'
     )
 
 
@@ -73,6 +204,12 @@ async def recipe(
         client: Anon,
         model_id: PathID
     ):
+    if is_conditional(request):
+        current = await RecipesController.modified(client, model_id)
+        headers = cache_headers(request, current.version, current.updated_at)
+        if not_modified(request, headers):
+            return not_modified_response(headers)
+
     response = await RecipesController.unique(client, model_id)
 
     if response.error == Errors.NO_RETURN:
@@ -87,7 +224,8 @@ async def recipe(
             'Internal error retrieving recipe',
         )
 
-    return Response[RecipeOut](
+    return Response[RecipeOut].render(
+        headers=cache_headers(request, response.version, response.updated_at),
         data=response.data,
         resource_type='Recipe',
         count=response.count,
@@ -100,19 +238,102 @@ async def recipe(
     response_model=Responses,
     response_model_exclude_none=True,
     status_code=status.HTTP_201_CREATED,
-    description='Save a new recipe resource')
+    description='Save a new recipe resource, the image is streamed to the storage',
+    openapi_extra={
+        'requestBody': {
+            'required': True,
+            'content': {
+                'multipart/form-data': {
+                    'schema': {
+                        'type': 'object',
+                        'required': ['recipe_new'],
+                        'properties': {
+                            'recipe_new': {
+                                'type': 'string',
+                                'description': 'Recipe information content as JSON',
+                            },
+                            'image': {
+                                'type': 'string',
+                                'format': 'binary',
+                                'description': 'Image file for the recipes',
+                            },
+                        },
+                    }
+                }
+            },
+        }
+    })
 async def save(
         request: Request,
         user: User,
         client: Client,
-        image: ImageFile=None,
-        recipe_new: RecipeIn=Body(description='Recipe information content'),
+        background: BackgroundTasks,
     ):
+    """POST Recipe
+        The multipart body is parsed while it is received, the image is
+        staged in chunks with its hash and rejected as soon as its size
+        or type are not accepted
+        \f
+        :param request: request from client
+        :param user: authenticated user
+        :param client: DB session client
+    """
     if not user:
         raise unauthenticated(request)
+
+    length = request.headers.get('content-length', '')
+    if length.isdigit() and int(length) > settings.IMAGE_MAX_SIZE + FORM_MAX_SIZE:
+        raise payload_too_large(
+            request,
+            f'The body exceeds the limit of {settings.IMAGE_MAX_SIZE + FORM_MAX_SIZE} bytes',
+        )
+
+    form = StreamingForm(request.headers, storage.staging, settings.IMAGE_MAX_SIZE, FORM_MAX_SIZE)
+    try:
+        await form.parse(request.stream())
+    except UploadTooLarge as error:
+        raise payload_too_large(request, str(error)) from error
+    except UnsupportedMedia as error:
+        raise unsupported_media_type(request, str(error)) from error
+    except UploadError as error:
+        raise bad_request(request, str(error)) from error
+
+    image = form.files.pop('image', None)
+    await form.discard()
+    try:
+        recipe_new = RecipeIn.model_validate_json(form.fields.get('recipe_new', ''))
+    except ValidationError as error:
+        if image is not None:
+            await image.discard()
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=unprocessed_entity(
+                request,
+                data=[
+                    {
+                        'type': _error['type'],
+                        'loc': '-> '.join(['recipe_new', *[str(loc) for loc in _error['loc']]]),
+                        'msg': _error['msg']
+                    } for _error in error.errors()
+                ],
+                msg='Unprocessed entity recipe_new'
+            )
+        ) from error
+
     url_image = None
-    if image:
-        url_image = fake_save(image)
+    # The staged original is kept to generate its variants in background
+    process = image is not None and processor.available
+    if image is not None:
+        try:
+            url_image = (await storage.store(client, image, discard=not process)).url
+        except (OSError, httpx.HTTPError, StorageException) as error:
+            logger.error('Error storing the image "%s"', error)
+            await image.discard()
+            raise server_error(
+                request,
+                'Internal error storing the image',
+            ) from error
+
     recipe_save = RecipeSave.model_validate(
         {
             'image': url_image,
@@ -123,11 +344,16 @@ async def save(
     response = await RecipesController.save(client, recipe_save)
 
     if not response.success:
+        if process:
+            await image.discard()
         raise server_error(
             request,
             'Internal error storing resource',
         )
 
+    if process:
+        background.add_task(_process_image, client, response.data.id, image)
+
     return Response[RecipeOut](
         status=status.HTTP_201_CREATED,
         data=response.data,
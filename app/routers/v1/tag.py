@@ -1,23 +1,32 @@
 from typing import Annotated
 
-from fastapi import status, Depends
-from fastapi import APIRouter, Request
+from fastapi import status, Body, Depends, Query
+from fastapi import APIRouter, HTTPException, Request
 
-from app.utils import PathID
+from app.utils import PathID, UUIDItems, UUIDList, next_link
 from app.controller import TagsController
 from app.core.deps import Anon, Client, User
-from app.schemas.response import Errors, Response
+from app.core.settings import settings
+from app.schemas.response import Errors, Response, BulkItem
 from app.schemas.tags import (
     TagIn,
     TagOut,
     TagFilter,
-    TagSave
+    TagSave,
+    TagUpdate
+)
+from app.utils.conditional import (
+    cache_headers,
+    is_conditional,
+    not_modified,
+    not_modified_response
 )
 from app.utils.exceptions.common import (
     not_found,
     server_error,
     expired_token,
-    unauthenticated
+    unauthenticated,
+    unprocessed_entity
 )
 
 
@@ -50,7 +59,6 @@ async def tags(
         :param tag_query: tag fields to filter.
     """
     # Indexing pages at zero in server
-    next_params = tag_query.model_copy(update={'page': tag_query.page + 1})
     tag_query.page -= 1
 
     response = await TagsController.select(client, tag_query)
@@ -60,14 +68,17 @@ async def tags(
             'Internal error retrieving tags resources',
         )
 
-    return Response[list[TagOut]](
+    headers = cache_headers(request, response.version, response.updated_at)
+    if not_modified(request, headers):
+        return not_modified_response(headers)
+    return Response[list[TagOut]].render(
+        headers=headers,
         count=response.count,
+        count_strategy=response.count_strategy,
         data=response.data,
         resource_type='Tag',
         path=request.url.path,
-        next=request.url.path + request.url.replace_query_params(
-            **next_params.model_dump(mode='json', exclude_none=True, exclude_defaults=True)
-        ).query
+        next=next_link(request, response.cursor)
     )
 
 
@@ -81,6 +92,12 @@ async def tag(
         client: Anon,
         model_id: PathID
     ):
+    if is_conditional(request):
+        current = await TagsController.modified(client, model_id)
+        headers = cache_headers(request, current.version, current.updated_at)
+        if not_modified(request, headers):
+            return not_modified_response(headers)
+
     response = await TagsController.unique(client, model_id)
 
     if response.error == Errors.NO_RETURN:
@@ -95,7 +112,8 @@ async def tag(
             'Internal error retrieving tag',
         )
 
-    return Response[TagOut](
+    return Response[TagOut].render(
+        headers=cache_headers(request, response.version, response.updated_at),
         data=response.data,
         resource_type='Tag',
         count=response.count,
@@ -205,3 +223,126 @@ async def delete(
         resource_type='Tag',
         count=response.count,
         path=request.url.path)
+
+
+@router.post(
+    '/bulk',
+    response_model=Response[list[BulkItem[TagOut]]],
+    response_model_exclude_none=True,
+    description='Save many tag resources in a single request')
+async def save_many(
+        request: Request,
+        user: User,
+        client: Client,
+        new_tags: Annotated[
+            list[TagIn],
+            Body(min_length=1, max_length=settings.BULK_MAX_SIZE)]
+    ):
+    """POST Tag bulk
+        Items with a name already stored are reported as existing, the
+        repeated ones in the request as duplicates
+        \f
+        :param request: request from client
+        :param user: authenticated user
+        :param client: DB session client
+        :param new_tags: tags to store
+    """
+    if not user:
+        raise unauthenticated(request)
+
+    response = await TagsController.save_many(
+        client,
+        [TagSave(**model.model_dump(mode='python')) for model in new_tags])
+    if not response.success:
+        raise server_error(
+            request,
+            'Internal error storing resources',
+        )
+
+    return Response[list[BulkItem[TagOut]]].render(
+        data=response.data,
+        resource_type='Tag',
+        count=response.count,
+        path=request.url.path
+    )
+
+
+@router.patch(
+    '/bulk',
+    response_model=Response[list[BulkItem[TagOut]]],
+    response_model_exclude_none=True,
+    description='Update many tag resources in a single request')
+async def update_many(
+        request: Request,
+        user: User,
+        client: Client,
+        tags: Annotated[
+            list[TagUpdate],
+            Body(min_length=1, max_length=settings.BULK_MAX_SIZE)]
+    ):
+    """PATCH Tag bulk
+        Items without a stored resource are reported as not found, the
+        repeated ids in the request as duplicates
+        \f
+        :param request: request from client
+        :param user: authenticated user
+        :param client: DB session client
+        :param tags: tags to update with their ids
+    """
+    if not user:
+        raise unauthenticated(request)
+
+    response = await TagsController.update_many(client, tags)
+    if not response.success:
+        raise server_error(
+            request,
+            'Internal error updating resources',
+        )
+
+    return Response[list[BulkItem[TagOut]]].render(
+        data=response.data,
+        resource_type='Tag',
+        count=response.count,
+        path=request.url.path
+    )
+
+
+@router.delete(
+    '/bulk',
+    response_model=Response[list[BulkItem]],
+    response_model_exclude_none=True,
+    description='Delete many tag resources in a single request')
+async def delete_many(
+        request: Request,
+        user: User,
+        client: Client,
+        ids: Annotated[UUIDItems, Query(description='Comma separated ids of the resources to delete')]
+    ):
+    if not user:
+        raise unauthenticated(request)
+
+    ids = ids.split(',')
+    if len(ids) > settings.BULK_MAX_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=unprocessed_entity(
+                request,
+                data=[{'type': 'too_long', 'loc': 'query-> ids', 'msg': f'At most {settings.BULK_MAX_SIZE} ids'}],
+                msg='Unprocessed entity, too many resources to delete'
+            )
+        )
+
+    response = await TagsController.delete_many(client, ids)
+    if not response.success:
+        raise server_error(
+            request,
+            'Internal error deleting resources',
+        )
+
+    return Response[list[BulkItem]].render(
+        message='Resources delete successfully',
+        data=response.data,
+        resource_type='Tag',
+        count=response.count,
+        path=request.url.path
+    )
@@ -4,21 +4,26 @@ from .tags import (
     TagOut,
     TagInDB,
     TagFilter,
-    TagSave
+    TagSave,
+    TagUpdate
 )
 from .recipes import (
     RecipeIn,
     RecipeOut,
     RecipeInDB,
     RecipeFilter,
-    RecipeSave
+    RecipeSave,
+    RecipeExport,
+    RecipeImport,
+    RecipeSummary
 )
 from .categories import (
     CategoryIn,
     CategoryOut,
     CategoryInDB,
     CategoryFilter,
-    CategorySave
+    CategorySave,
+    CategoryUpdate
 )
 
 __all__ = [
@@ -27,15 +32,20 @@ __all__ = [
     'TagInDB',
     'TagFilter',
     'TagSave',
+    'TagUpdate',
     'RecipeIn',
     'RecipeOut',
     'RecipeInDB',
     'RecipeSave',
     'RecipeFilter',
+    'RecipeExport',
+    'RecipeImport',
+    'RecipeSummary',
     'CategoryIn',
     'CategoryOut',
     'CategoryInDB',
     'CategorySave',
+    'CategoryUpdate',
     'CategoryFilter',
     'Response',
     'ControllerResponse'
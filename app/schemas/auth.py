@@ -1,4 +1,5 @@
 import time
+import hashlib
 import inspect
 from functools import lru_cache
 from typing_extensions import TypedDict
@@ -10,9 +11,13 @@ from fastapi import Request, HTTPException, Form
 from pydantic import BaseModel, ValidationError, Field
 from pydantic import PositiveInt, HttpUrl, UUID4, EmailStr
 
+from app.utils.cache import LRUCache
 from app.utils.exceptions.common import unprocessed_entity
 from app.core.settings import settings
 
+# Verified token payloads shared by the process, keyed by token digest
+_verified_tokens: LRUCache[str, 'TokenPayload'] = LRUCache(settings.TOKEN_CACHE_SIZE)
+
 
 @lru_cache(maxsize=None, typed=True)
 def form_body(cls: type[BaseModel]):
@@ -23,7 +28,7 @@ def form_body(cls: type[BaseModel]):
         form_params.append(
             inspect.Parameter(
                 name,
-                inspect.Parameter.POSITIONAL_ONLY,
+                inspect.Parameter.KEYWORD_ONLY,
                 annotation=field.annotation,
                 default=Form(
                     field.default if not field.default else ...,
@@ -58,7 +63,7 @@ def form_body(cls: type[BaseModel]):
             ) from error
 
     signature = inspect.signature(_as_form)
-    form_params.append(signature.parameters['request'])
+    form_params.insert(0, signature.parameters['request'])
     signature = signature.replace(parameters=form_params)
     _as_form.__signature__ = signature
 
@@ -145,10 +150,23 @@ class TokenPayload(BaseModel):
 
     @classmethod
     def decode_token(cls, token: str):
+        """Verify and validate the token, verified payloads are memoized
+            until their expiration time
+        """
+        digest = hashlib.sha256(token.encode()).hexdigest()
+        if (cached := _verified_tokens.get(digest)) is not None:
+            return cached
         payload = jwt.decode(
             token,
             key=settings.SECRET.get_secret_value(),
             audience=['authenticated'],
             algorithms=[settings.ALGORITHM]
         )
-        return cls.model_validate(payload)
+        model = cls.model_validate(payload)
+        _verified_tokens.set(digest, model, expires_at=model.exp)
+        return model
+
+    @staticmethod
+    def cache_stats() -> dict[str, int]:
+        """Hit and miss counters of the verified tokens cache"""
+        return _verified_tokens.stats()
@@ -1,7 +1,12 @@
+from enum import Enum, unique
+
 from pydantic.alias_generators import to_camel
 from pydantic import BaseModel, ConfigDict, Field
 from pydantic import UUID4, AwareDatetime, NonNegativeInt, PositiveInt
 
+from ..utils._types import UUIDList
+from ..utils.pagination import CursorField
+
 
 # TODO: Search how to use the alias in the correct way
 class ConfigModel(BaseModel):
@@ -24,7 +29,30 @@ class ModelInDB(Model):
     created_at: AwareDatetime
     updated_at: AwareDatetime
 
+@unique
+class CountStrategy(str, Enum):
+    """Strategies available in PostgREST to count the rows of a query"""
+    EXACT = 'exact'
+    PLANNED = 'planned'
+    ESTIMATED = 'estimated'
+    NONE = 'none'
+
+    @property
+    def method(self) -> str | None:
+        """Count method sent to PostgREST, None skips the count"""
+        return None if self is CountStrategy.NONE else self.value
+
 class CommonQueryDepend(ConfigModel):
     page: NonNegativeInt | None = Field(default=1, description='Number of the current page requested')
     skip: NonNegativeInt | None = Field(default=0, description='Number items to skip')
     limit: PositiveInt | None = Field(default=100, description='Content length of the page')
+    cursor: CursorField | None = Field(
+        default=None,
+        description='Opaque cursor of the page to retrieve, taken from the next link. '
+                    'Overrides page and skip')
+    count: CountStrategy | None = Field(
+        default=None,
+        description='Strategy to count the total of records, the server setting by default')
+    ids: UUIDList | None = Field(
+        default=None,
+        description='Comma separated ids of the records to retrieve in a single request')
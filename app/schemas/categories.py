@@ -1,3 +1,5 @@
+from pydantic import UUID4
+
 from ..utils import NameField
 from .base import Model, ModelInDB, CommonQueryDepend, ConfigModel
 
@@ -17,5 +19,9 @@ class CategoryFilter(CommonQueryDepend):
 class CategorySave(CategoryIn, Model):
     """Category schema to update an existing resource"""
 
+class CategoryUpdate(CategoryIn):
+    """Category schema of each item of a bulk update"""
+    id: UUID4
+
 class CategoryInDB(ModelInDB, CategoryOut):
     """Category Schema response from data base"""
@@ -1,9 +1,12 @@
 import json
+import uuid
+from enum import Enum, unique
+from typing import Annotated
 
-from pydantic import UUID4, AnyHttpUrl
-from pydantic.functional_validators import model_validator
+from pydantic import UUID4, AnyHttpUrl, Field, StringConstraints, ValidationInfo
+from pydantic.functional_validators import model_validator, AfterValidator
 
-from ..utils import TitleField
+from ..utils import TitleField, UUIDList
 from .tags import TagInDB, TagOut
 from .categories import CategoryInDB, CategoryOut
 from .base import Model, ModelInDB, CommonQueryDepend, ConfigModel
@@ -24,6 +27,10 @@ class RecipeIn(ConfigModel):
             return cls(**json.loads(value))
         return value
 
+# URLs of the resized variants of the image by name and format,
+# as {"thumbnail": {"webp": "https://..."}}
+ImageVariants = dict[str, dict[str, AnyHttpUrl]]
+
 class RecipeOut(Model):
     """Recipe schema from the server"""
     title: TitleField
@@ -31,19 +38,109 @@ class RecipeOut(Model):
     ingredients: str
     instructions: str
     image: AnyHttpUrl | None = None
+    images: ImageVariants | None = None
     tags: list[TagOut] | None = None
     category: CategoryOut | None = None
 
+class RecipeSummary(Model):
+    """Recipe schema with only the projected fields of the server"""
+    title: TitleField | None = None
+    description: str | None = None
+    ingredients: str | None = None
+    instructions: str | None = None
+    image: AnyHttpUrl | None = None
+    images: ImageVariants | None = None
+    tags: list[TagOut] | None = None
+    category: CategoryOut | None = None
+
+def _validate_fields(value: str) -> str:
+    fields = [name.strip() for name in value.split(',') if name.strip()]
+    if fields == ['*']:
+        return '*'
+    unknown = set(fields).difference(RecipeOut.model_fields)
+    if unknown or not fields:
+        raise ValueError(
+            f'Unknown recipe fields "{", ".join(sorted(unknown))}", '
+            f'available: {", ".join(RecipeOut.model_fields)}')
+    return ','.join(dict.fromkeys(['id', *fields]))
+
+RecipeFields = Annotated[str, AfterValidator(_validate_fields)]
+
+SearchField = Annotated[str, StringConstraints(strip_whitespace=True, min_length=1, max_length=200)]
+
+@unique
+class TagMatch(str, Enum):
+    """Semantics of the filter by several tags"""
+    ANY = 'any'
+    ALL = 'all'
+
 class RecipeSave(Model, RecipeIn):
     """Recipe Schema to update an existing resource"""
     user_id: UUID4
     image: AnyHttpUrl | None = None
 
+_IMPORT_NAMESPACE = uuid.UUID('8f3c1e52-6a0d-4b7e-9c21-5d4f7a9e0b13')
+
+class RecipeImport(RecipeSave):
+    """Recipe schema of the records of an import file, the nested tags and
+        category of the exported recipes are reduced to their ids, the
+        owner of the validation context fills the missing one and the
+        missing id is derived from the owner and the title, so a retried
+        batch or a file imported again is not duplicated
+    """
+
+    @model_validator(mode='before')
+    @classmethod
+    def normalize_import(cls, value, info: ValidationInfo):
+        if not isinstance(value, dict):
+            return value
+        value = dict(value)
+        if value.get('tags'):
+            value['tags'] = [
+                tag.get('id') if isinstance(tag, dict) else tag
+                for tag in value['tags']
+            ]
+        if isinstance(value.get('category'), dict) and not value.get('category_id'):
+            value['category_id'] = value['category'].get('id')
+        if not value.get('user_id') and info.context:
+            value['user_id'] = info.context.get('user_id')
+        if not value.get('id'):
+            # The ids are UUID4, the name based hash keeps the version 4 bits
+            name = f"{value.get('user_id')}:{value.get('title')}"
+            value['id'] = uuid.UUID(bytes=uuid.uuid5(_IMPORT_NAMESPACE, name).bytes, version=4)
+        return value
+
 class RecipeFilter(CommonQueryDepend):
     """Recipe schema of available filters fields"""
     title: TitleField | None = None
-    tag: UUID4 | None = None
+    q: SearchField | None = Field(
+        default=None,
+        description='Full text search over the title, description and ingredients, '
+                    'results are ranked by relevance and paginated by page')
+    tag: UUIDList | None = Field(
+        default=None,
+        description='Comma separated ids of the tags of the recipes')
+    tag_match: TagMatch = Field(
+        default=TagMatch.ANY,
+        description='Recipes with any or all of the tags given')
+    category: UUID4 | None = None
+    fields: RecipeFields | None = Field(
+        default=None,
+        description='Comma separated fields of the recipes to retrieve, * for all of them. '
+                    'Summary fields by default')
+
+class RecipeExport(ConfigModel):
+    """Recipe schema of the filters of the catalog export"""
+    tag: UUIDList | None = Field(
+        default=None,
+        description='Comma separated ids of the tags of the recipes')
+    tag_match: TagMatch = Field(
+        default=TagMatch.ANY,
+        description='Recipes with any or all of the tags given')
     category: UUID4 | None = None
+    fields: RecipeFields | None = Field(
+        default=None,
+        description='Comma separated fields of the recipes to export, all of them by default')
 
 class RecipeInDB(RecipeOut, ModelInDB):
     """Recipe schema response from the Data Base"""
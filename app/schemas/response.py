@@ -1,11 +1,11 @@
-from enum import  IntEnum, auto
+from enum import  Enum, IntEnum, auto, unique
 from typing import Generic, TypeVar
 
-from fastapi import status
+from fastapi import status, responses
 
 from pydantic import Field
 from pydantic import BaseModel, ConfigDict
-from pydantic import PositiveInt, StrictBool, NonNegativeInt
+from pydantic import PositiveInt, StrictBool, NonNegativeInt, AwareDatetime
 
 
 Resource = TypeVar('Resource', BaseModel, list[BaseModel], dict, list[dict])
@@ -19,6 +19,29 @@ class Errors(IntEnum):
     UNAUTHORIZED = auto()
 
 
+@unique
+class BulkStatus(str, Enum):
+    """Outcome of each item of a bulk operation"""
+    CREATED = 'created'
+    UPDATED = 'updated'
+    DELETED = 'deleted'
+    EXISTS = 'exists'
+    DUPLICATE = 'duplicate'
+    CONFLICT = 'conflict'
+    FAILED = 'failed'
+    NOT_FOUND = 'not_found'
+
+
+class BulkItem(BaseModel, Generic[Resource]):
+    """Result of an item of a bulk operation, index is its position
+        in the request
+    """
+    index: NonNegativeInt
+    status: BulkStatus
+    id: str | None = None
+    data: Resource | None = None
+
+
 class Response(BaseModel, Generic[Resource]):
     """API Body Response"""
     model_config = ConfigDict(
@@ -35,9 +58,32 @@ class Response(BaseModel, Generic[Resource]):
     data: Resource | None = None
     resource_type: str | None = 'Error'
     count: NonNegativeInt | None = None
+    count_strategy: str | None = None
     path: str
     next: str | None = None
 
+    @classmethod
+    def render(cls, headers: dict[str, str] | None = None, **fields) -> responses.Response:
+        """render
+            Serialize the envelope straight to JSON bytes. The data must be
+            already validated by the controllers, the envelope is built
+            without validation and the response_model of the route is
+            skipped, it is kept only for the documentation
+            \f
+            :param headers: headers of the HTTP response
+            :param fields: fields of the envelope
+        """
+        # Imported here, app.utils imports this module through its exceptions
+        from app.utils.tracing import tracer
+        envelope = cls.model_construct(**fields)
+        with tracer.span('serialize'):
+            content = envelope.model_dump_json(exclude_none=True)
+        return responses.Response(
+            content=content,
+            status_code=envelope.status,
+            headers=headers,
+            media_type='application/json')
+
 class ControllerResponse(BaseModel, Generic[Resource]):
     """Controllers response to retrieve to routers"""
     model_config = ConfigDict(
@@ -47,7 +93,12 @@ class ControllerResponse(BaseModel, Generic[Resource]):
     )
     success: StrictBool = True
     data: Resource | None = None
-    count: NonNegativeInt = 0
+    count: NonNegativeInt | None = 0
+    count_strategy: str | None = None
+    cursor: str | None = None
+    next_page: PositiveInt | None = None
+    version: str | None = None
+    updated_at: AwareDatetime | None = None
     error: Errors | None = None
 
 
@@ -55,6 +106,8 @@ class ControllerResponse(BaseModel, Generic[Resource]):
 
 __all__ = [
     'Errors',
+    'BulkItem',
+    'BulkStatus',
     'Response',
     'ControllerResponse',
 ]
@@ -1,3 +1,5 @@
+from pydantic import UUID4
+
 from ..utils import NameField
 from .base import ConfigModel, Model, ModelInDB, CommonQueryDepend
 
@@ -16,5 +18,9 @@ class TagFilter(CommonQueryDepend):
 class TagSave(TagIn, Model):
     """Tag schema to update an existing resource"""
 
+class TagUpdate(TagIn):
+    """Tag schema of each item of a bulk update"""
+    id: UUID4
+
 class TagInDB(ModelInDB, TagOut):
     """Tag schema response from the Data Base"""
@@ -0,0 +1,52 @@
+from pathlib import Path
+
+from app.core.settings import settings
+from .base import StorageBackend, StoredFile
+from .local import LocalStorage
+from .bucket import BucketStorage
+from .serving import MEDIA_TYPES, MediaFiles
+from .variants import VARIANTS, ImageProcessor, ProcessingBusy
+from .uploads import (
+    IMAGE_TYPES,
+    StagedFile,
+    StreamingForm,
+    UploadError,
+    UploadTooLarge,
+    UnsupportedMedia
+)
+
+
+def from_settings() -> StorageBackend:
+    """Storage backend of the settings"""
+    if settings.STORAGE_BACKEND == 'supabase':
+        return BucketStorage(settings.STORAGE_BUCKET)
+    return LocalStorage(Path(settings.STORAGE_PATH), settings.STORAGE_PUBLIC_URL)
+
+
+storage = from_settings()
+processor = ImageProcessor(
+    settings.IMAGE_WORKERS,
+    settings.IMAGE_QUEUE_DEPTH,
+    formats=tuple(settings.IMAGE_FORMATS),
+    quality=settings.IMAGE_QUALITY)
+
+__all__ = [
+    'storage',
+    'processor',
+    'from_settings',
+    'VARIANTS',
+    'ImageProcessor',
+    'ProcessingBusy',
+    'IMAGE_TYPES',
+    'StoredFile',
+    'StagedFile',
+    'StreamingForm',
+    'StorageBackend',
+    'LocalStorage',
+    'MediaFiles',
+    'MEDIA_TYPES',
+    'BucketStorage',
+    'UploadError',
+    'UploadTooLarge',
+    'UnsupportedMedia',
+]
@@ -0,0 +1,80 @@
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+from pydantic import BaseModel, NonNegativeInt
+from supabase._async.client import AsyncClient
+
+from .uploads import StagedFile
+
+
+class StoredFile(BaseModel):
+    """File kept by a storage backend"""
+    key: str
+    url: str
+    size: NonNegativeInt
+    content_type: str
+    sha256: str
+    deduplicated: bool = False
+
+
+class StorageBackend(ABC):
+    """StorageBackend
+        Interface of the backends of the uploaded files. The files are
+        addressed by their content so an upload already stored is only
+        referenced again
+        \f
+        :param staging: directory of the uploads being received
+    """
+
+    def __init__(self, staging: Path) -> None:
+        self.staging = staging
+
+    async def store(
+            self,
+            client: AsyncClient,
+            file: StagedFile,
+            key: str | None = None,
+            discard: bool = True) -> StoredFile:
+        """store
+            Keep a closed staged file unless its content is already stored
+            \f
+            :param client: DB session client of the user
+            :param file: staged file closed
+            :param key: key of the file, the one of its content by default
+            :param discard: remove the staged file, it is kept to process it
+        """
+        key = key or file.key
+        try:
+            exists = await self.exists(client, key)
+            if not exists:
+                exists = not await self.put(client, key, file)
+        finally:
+            if discard:
+                await file.discard()
+        return StoredFile(
+            key=key,
+            url=await self.url(client, key),
+            size=file.size,
+            content_type=file.content_type,
+            sha256=file.sha256 or key,
+            deduplicated=exists)
+
+    @abstractmethod
+    async def exists(self, client: AsyncClient, key: str) -> bool:
+        """If a file with the key is stored"""
+
+    @abstractmethod
+    async def put(self, client: AsyncClient, key: str, file: StagedFile) -> bool:
+        """Store the staged file with the key, False when another upload
+            stored the same key first
+        """
+
+    @abstractmethod
+    async def url(self, client: AsyncClient, key: str) -> str:
+        """Public URL of the stored file"""
+
+
+__all__ = [
+    'StoredFile',
+    'StorageBackend',
+]
@@ -0,0 +1,64 @@
+import tempfile
+from pathlib import Path
+
+from supabase._async.client import AsyncClient
+
+from app.logging import logger
+from .base import StorageBackend
+from .uploads import StagedFile
+
+
+class BucketStorage(StorageBackend):
+    """BucketStorage
+        Files kept in a bucket of Supabase Storage with the authorization
+        of the user. The staged file is sent as the raw body of the upload,
+        read in chunks from a worker thread
+        \f
+        :param bucket: id of the bucket, it must be public to serve the URLs
+        :param staging: directory of the uploads being received
+        :param cache_control: max age in seconds of the stored files
+    """
+
+    def __init__(
+            self,
+            bucket: str,
+            staging: Path | None = None,
+            cache_control: int = 31536000) -> None:
+        self.bucket = bucket
+        self.cache_control = cache_control
+        super().__init__(staging or Path(tempfile.gettempdir()).joinpath('recipes-uploads'))
+
+    async def exists(self, client: AsyncClient, key: str) -> bool:
+        folder, _, name = key.rpartition('/')
+        files = await client.storage.from_(self.bucket).list(folder, {'search': name, 'limit': 1})
+        return any(item.get('name') == name for item in files)
+
+    async def put(self, client: AsyncClient, key: str, file: StagedFile) -> bool:
+        response = await client.storage.session.request(
+            'POST',
+            f'/object/{self.bucket}/{key}',
+            headers={
+                'content-type': file.content_type,
+                'cache-control': f'max-age={self.cache_control}',
+                'x-upsert': 'false',
+            },
+            content=file.chunks())
+        if response.status_code in (400, 409) and 'Duplicate' in response.text:
+            # Stored by a concurrent upload of the same content
+            return False
+        if response.is_error:
+            logger.error(
+                'Error at the Storage API request "%s - %s"',
+                response.status_code,
+                response.text
+            )
+            response.raise_for_status()
+        return True
+
+    async def url(self, client: AsyncClient, key: str) -> str:
+        return await client.storage.from_(self.bucket).get_public_url(key)
+
+
+__all__ = [
+    'BucketStorage',
+]
@@ -0,0 +1,58 @@
+import os
+import shutil
+from pathlib import Path
+
+import anyio
+from supabase._async.client import AsyncClient
+
+from .base import StorageBackend
+from .uploads import StagedFile
+
+
+class LocalStorage(StorageBackend):
+    """LocalStorage
+        Files kept in a directory of the server, the staged files are
+        received in the same directory so they are stored with an atomic
+        hard link instead of a copy
+        \f
+        :param root: directory of the stored files
+        :param public_url: URL the stored files are served from
+    """
+
+    def __init__(self, root: Path, public_url: str) -> None:
+        self.root = Path(root)
+        self.public_url = public_url.rstrip('/')
+        super().__init__(self.root.joinpath('.staging'))
+
+    def path(self, key: str) -> Path:
+        path = self.root.joinpath(key).resolve()
+        if not path.is_relative_to(self.root.resolve()):
+            raise ValueError(f'Key outside of the storage "{key}"')
+        return path
+
+    async def exists(self, client: AsyncClient, key: str) -> bool:
+        return await anyio.to_thread.run_sync(self.path(key).is_file)
+
+    async def put(self, client: AsyncClient, key: str, file: StagedFile) -> bool:
+        def _link() -> bool:
+            path = self.path(key)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # A hard link is atomic and keeps the staged file to process it
+            try:
+                os.link(file.path, path)
+            except FileExistsError:
+                return False
+            except OSError:
+                temporary = path.with_name(f'.{path.name}.{os.getpid()}')
+                shutil.copyfile(file.path, temporary)
+                os.replace(temporary, path)
+            return True
+        return await anyio.to_thread.run_sync(_link)
+
+    async def url(self, client: AsyncClient, key: str) -> str:
+        return f'{self.public_url}/{key}'
+
+
+__all__ = [
+    'LocalStorage',
+]
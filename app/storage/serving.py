@@ -0,0 +1,211 @@
+import os
+import re
+import stat
+import hashlib
+from datetime import timezone
+from email.utils import formatdate, parsedate_to_datetime
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.types import Receive, Scope, Send
+
+from .local import LocalStorage
+from .uploads import IMAGE_TYPES
+from .variants import FORMATS
+
+# Content type of each extension of the stored images and their variants
+MEDIA_TYPES: dict[str, str] = {
+    **{extension: content_type for content_type, (extension, _) in IMAGE_TYPES.items()},
+    **{f'.{name}': content_type for name, (_, content_type) in FORMATS.items()},
+}
+# The keys with a SHA-256 never change their content
+_DIGEST = re.compile(r'(?:^|/)([0-9a-f]{64})(?:[./]|$)')
+_RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+CHUNK_SIZE = 256 * 1024
+
+
+def parse_range(value: str, size: int) -> tuple[int, int] | None:
+    """parse_range
+        First and last byte of a single range of a Range header, None when
+        the header is not a single byte range and the whole file is sent
+        \f
+        :param value: value of the header
+        :param size: size of the file
+        :raises ValueError: the range is not satisfiable
+    """
+    match = _RANGE.match(value.strip())
+    if match is None or match.group(1) == match.group(2) == '':
+        return None
+    first, last = match.groups()
+    if first == '':
+        # Suffix range, the last bytes of the file
+        length = int(last)
+        if length == 0 or size == 0:
+            raise ValueError('Empty suffix range')
+        return max(size - length, 0), size - 1
+    first = int(first)
+    last = size - 1 if last == '' else min(int(last), size - 1)
+    if first > last:
+        raise ValueError('Range out of the file')
+    return first, last
+
+
+class MediaFiles:
+    """MediaFiles
+        ASGI app serving the files of a local storage. The body is sent with
+        the ``http.response.pathsend`` or ``http.response.zerocopysend``
+        extensions when the server supports them, so the kernel copies the
+        file to the socket, otherwise it is read in chunks in a worker
+        thread. Single byte ranges, conditional requests and the immutable
+        caching of the content addressed keys are supported
+        \f
+        :param storage: local storage of the files
+        :param max_age: seconds the immutable files are cached by the clients
+    """
+
+    def __init__(self, storage: LocalStorage, max_age: int = 365 * 24 * 3600) -> None:
+        self.storage = storage
+        self.max_age = max_age
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        assert scope['type'] == 'http'
+        method = scope['method']
+        if method not in ('GET', 'HEAD'):
+            await self._empty(send, 405, [(b'allow', b'GET, HEAD')])
+            return
+        # The mount leaves its path in the root path
+        key = scope['path'].removeprefix(scope.get('root_path', '')).lstrip('/')
+        stat_result = await self._stat(key)
+        if stat_result is None:
+            await self._empty(send, 404)
+            return
+
+        request = Headers(scope=scope)
+        size = stat_result.st_size
+        etag, last_modified = self._validators(key, stat_result)
+        headers = [
+            (b'content-type', self._media_type(key).encode()),
+            (b'accept-ranges', b'bytes'),
+            (b'etag', etag.encode()),
+            (b'last-modified', last_modified.encode()),
+            (b'cache-control', self._cache_control(key).encode()),
+            (b'x-content-type-options', b'nosniff'),
+        ]
+        if self._not_modified(request, etag, stat_result.st_mtime):
+            await self._empty(send, 304, headers)
+            return
+
+        status, first, last = 200, 0, size - 1
+        if 'range' in request and self._if_range(request, etag, last_modified):
+            try:
+                selected = parse_range(request['range'], size)
+            except ValueError:
+                await self._empty(send, 416, [*headers, (b'content-range', f'bytes */{size}'.encode())])
+                return
+            if selected is not None:
+                status, (first, last) = 206, selected
+                headers.append((b'content-range', f'bytes {first}-{last}/{size}'.encode()))
+        length = last - first + 1
+        headers.append((b'content-length', str(length).encode()))
+
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        if method == 'HEAD' or length == 0:
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+        await self._send_file(scope, send, self.storage.path(key), first, length, status == 200)
+
+    async def _stat(self, key: str) -> os.stat_result | None:
+        """Status of a stored file, None for the missing, hidden or
+            outside keys, the staged uploads are never served
+        """
+        if not key or any(part.startswith('.') for part in key.split('/')):
+            return None
+        try:
+            path = self.storage.path(key)
+            stat_result = await anyio.to_thread.run_sync(os.stat, path)
+        except (ValueError, OSError):
+            return None
+        return stat_result if stat.S_ISREG(stat_result.st_mode) else None
+
+    def _validators(self, key: str, stat_result: os.stat_result) -> tuple[str, str]:
+        """Strong ETag and Last-Modified, the ETag of a content addressed
+            key does not depend on the copy of the file served
+        """
+        if _DIGEST.search(key):
+            tag = hashlib.sha1(key.encode()).hexdigest()
+        else:
+            tag = hashlib.sha1(f'{key}:{stat_result.st_mtime_ns}:{stat_result.st_size}'.encode()).hexdigest()
+        return f'"{tag}"', formatdate(stat_result.st_mtime, usegmt=True)
+
+    def _cache_control(self, key: str) -> str:
+        if _DIGEST.search(key):
+            return f'public, max-age={self.max_age}, immutable'
+        return 'no-cache'
+
+    @staticmethod
+    def _media_type(key: str) -> str:
+        return MEDIA_TYPES.get(os.path.splitext(key)[1].lower(), 'application/octet-stream')
+
+    @staticmethod
+    def _not_modified(request: Headers, etag: str, modified: float) -> bool:
+        """Preconditions of a GET, If-None-Match takes precedence over
+            If-Modified-Since as stated by RFC 9110
+        """
+        if (if_none_match := request.get('if-none-match')) is not None:
+            return if_none_match.strip() == '*' or any(
+                tag.strip().removeprefix('W/') == etag
+                for tag in if_none_match.split(','))
+        if (if_modified_since := request.get('if-modified-since')) is not None:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            if since.tzinfo is None:
+                since = since.replace(tzinfo=timezone.utc)
+            return int(modified) <= since.timestamp()
+        return False
+
+    @staticmethod
+    def _if_range(request: Headers, etag: str, last_modified: str) -> bool:
+        """If the range is applied, an If-Range of another version of the
+            file asks for the whole file
+        """
+        if_range = request.get('if-range')
+        return if_range is None or if_range.strip() in (etag, last_modified)
+
+    @staticmethod
+    async def _empty(send: Send, status: int, headers: list[tuple[bytes, bytes]] | None = None) -> None:
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers or []})
+        await send({'type': 'http.response.body', 'body': b''})
+
+    @staticmethod
+    async def _send_file(scope: Scope, send: Send, path, offset: int, count: int, whole: bool) -> None:
+        extensions = scope.get('extensions') or {}
+        if whole and 'http.response.pathsend' in extensions:
+            await send({'type': 'http.response.pathsend', 'path': str(path)})
+            return
+        file = await anyio.open_file(path, 'rb')
+        try:
+            if 'http.response.zerocopysend' in extensions:
+                await send({
+                    'type': 'http.response.zerocopysend',
+                    'file': file.wrapped,
+                    'offset': offset,
+                    'count': count,
+                })
+                return
+            await file.seek(offset)
+            while count > 0:
+                chunk = await file.read(min(CHUNK_SIZE, count))
+                # A truncated file ends the body instead of hanging it
+                count = count - len(chunk) if chunk else 0
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': count > 0})
+        finally:
+            await file.aclose()
+
+
+__all__ = [
+    'MEDIA_TYPES',
+    'parse_range',
+    'MediaFiles',
+]
@@ -0,0 +1,299 @@
+import os
+import hashlib
+import tempfile
+from pathlib import Path
+from urllib.parse import parse_qsl
+from collections.abc import AsyncIterator
+
+import anyio
+from multipart.exceptions import FormParserError
+from multipart.multipart import MultipartParser, parse_options_header
+from starlette.datastructures import Headers
+
+# Accepted images, their extension and the signatures of their first bytes
+IMAGE_TYPES: dict[str, tuple[str, tuple[bytes, ...]]] = {
+    'image/png': ('.png', (b'\x89PNG\r\n\x1a\n',)),
+    'image/jpeg': ('.jpg', (b'\xff\xd8\xff',)),
+    'image/gif': ('.gif', (b'GIF87a', b'GIF89a')),
+    'image/webp': ('.webp', (b'RIFF',)),
+}
+_SNIFF_SIZE = 12
+
+
+class UploadError(Exception):
+    """Invalid upload, the message is safe to show to the client"""
+
+
+class UploadTooLarge(UploadError):
+    """The upload is larger than the limit"""
+
+
+class UnsupportedMedia(UploadError):
+    """The upload is not one of the accepted types"""
+
+
+def sniff(head: bytes) -> str | None:
+    """Image type of the first bytes of a file, None when unknown"""
+    for content_type, (_, signatures) in IMAGE_TYPES.items():
+        if head.startswith(signatures):
+            if content_type == 'image/webp' and head[8:12] != b'WEBP':
+                continue
+            return content_type
+    return None
+
+
+class StagedFile:
+    """StagedFile
+        Upload written to a temporary file while its SHA-256 is computed.
+        The writes are buffered and run with the hash in a worker thread,
+        the size and the type are checked with the first bytes so an
+        invalid upload is rejected before the rest is read
+        \f
+        :param directory: directory of the temporary file
+        :param declared_type: content type sent by the client
+        :param max_size: maximum size in bytes
+        :param buffer_size: bytes buffered before each write
+    """
+
+    def __init__(
+            self,
+            directory: Path,
+            declared_type: str,
+            max_size: int,
+            buffer_size: int = 256 * 1024) -> None:
+        self.directory = directory
+        self.declared_type = declared_type
+        self.max_size = max_size
+        self.buffer_size = buffer_size
+        self.content_type: str | None = None
+        self.size = 0
+        self.path: Path | None = None
+        self.sha256: str | None = None
+        self._hash = hashlib.sha256()
+        self._buffer = bytearray()
+        self._file = None
+
+    @classmethod
+    def existing(cls, path: Path, content_type: str, size: int) -> 'StagedFile':
+        """Staged file of a file already written, as the image variants"""
+        file = cls(path.parent, content_type, size)
+        file.path = path
+        file.size = size
+        file.content_type = content_type
+        return file
+
+    @property
+    def extension(self) -> str:
+        return IMAGE_TYPES[self.content_type][0]
+
+    @property
+    def key(self) -> str:
+        """Content addressed key, identical uploads share it"""
+        return f'images/{self.sha256[:2]}/{self.sha256}{self.extension}'
+
+    async def write(self, data: bytes) -> None:
+        self.size += len(data)
+        if self.size > self.max_size:
+            raise UploadTooLarge(f'The image exceeds the limit of {self.max_size} bytes')
+        self._buffer += data
+        if self.content_type is None and len(self._buffer) >= _SNIFF_SIZE:
+            self._check_type()
+        if len(self._buffer) >= self.buffer_size:
+            await self._flush()
+
+    async def close(self) -> None:
+        if self.content_type is None:
+            self._check_type()
+        await self._flush()
+        await anyio.to_thread.run_sync(self._file.close)
+        self.sha256 = self._hash.hexdigest()
+
+    async def discard(self) -> None:
+        """Remove the temporary file, if it was not moved by the storage"""
+        def _discard():
+            if self._file is not None:
+                self._file.close()
+            if self.path is not None and self.path.exists():
+                self.path.unlink()
+        await anyio.to_thread.run_sync(_discard)
+
+    async def chunks(self, size: int = 256 * 1024) -> AsyncIterator[bytes]:
+        """Content of the closed file read in a worker thread"""
+        file = await anyio.open_file(self.path, 'rb')
+        try:
+            while chunk := await file.read(size):
+                yield chunk
+        finally:
+            await file.aclose()
+
+    def _check_type(self) -> None:
+        content_type = sniff(bytes(self._buffer[:_SNIFF_SIZE]))
+        if content_type is None or content_type != self.declared_type:
+            raise UnsupportedMedia(
+                f'The image must be one of {", ".join(IMAGE_TYPES)} '
+                f'and match its Content-Type')
+        self.content_type = content_type
+
+    async def _flush(self) -> None:
+        data, self._buffer = bytes(self._buffer), bytearray()
+        await anyio.to_thread.run_sync(self._write, data)
+
+    def _write(self, data: bytes) -> None:
+        if self._file is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            descriptor, path = tempfile.mkstemp(dir=self.directory, suffix='.upload')
+            self._file = os.fdopen(descriptor, 'wb')
+            self.path = Path(path)
+        # hashlib releases the GIL for large buffers, as the file write
+        self._hash.update(data)
+        self._file.write(data)
+
+
+class _Part:
+    __slots__ = ('name', 'headers', 'data', 'file')
+
+    def __init__(self) -> None:
+        self.name = ''
+        self.headers: list[tuple[bytes, bytes]] = []
+        self.data = bytearray()
+        self.file: StagedFile | None = None
+
+
+class StreamingForm:
+    """StreamingForm
+        Multipart form parsed while the body is received, the files are
+        staged chunk by chunk instead of being spooled before the route
+        runs, the fields are kept in memory up to their limit
+        \f
+        :param headers: headers of the request
+        :param staging: directory of the staged files
+        :param max_file: maximum size in bytes of each file
+        :param max_field: maximum size in bytes of each field
+        :param max_parts: maximum number of parts
+    """
+
+    def __init__(
+            self,
+            headers: Headers,
+            staging: Path,
+            max_file: int,
+            max_field: int = 64 * 1024,
+            max_parts: int = 8) -> None:
+        self.headers = headers
+        self.staging = staging
+        self.max_file = max_file
+        self.max_field = max_field
+        self.max_parts = max_parts
+        self.fields: dict[str, str] = {}
+        self.files: dict[str, StagedFile] = {}
+        self._parts = 0
+        self._part = _Part()
+        self._header_name = b''
+        self._header_value = b''
+        self._writes: list[tuple[StagedFile, bytes]] = []
+        self._closes: list[StagedFile] = []
+
+    async def parse(self, stream: AsyncIterator[bytes]) -> 'StreamingForm':
+        content_type, params = parse_options_header(self.headers.get('content-type', ''))
+        if content_type == b'application/x-www-form-urlencoded':
+            return await self._parse_fields(stream)
+        if content_type != b'multipart/form-data' or b'boundary' not in params:
+            raise UploadError('The body must be multipart/form-data')
+        parser = MultipartParser(params[b'boundary'], {
+            'on_part_begin': self._on_part_begin,
+            'on_part_data': self._on_part_data,
+            'on_part_end': self._on_part_end,
+            'on_header_field': self._on_header_field,
+            'on_header_value': self._on_header_value,
+            'on_header_end': self._on_header_end,
+            'on_headers_finished': self._on_headers_finished,
+        })
+        try:
+            async for chunk in stream:
+                parser.write(chunk)
+                # The callbacks are synchronous, the file writes are
+                # awaited here so the disk is never used in the event loop
+                for file, data in self._writes:
+                    await file.write(data)
+                for file in self._closes:
+                    await file.close()
+                self._writes.clear()
+                self._closes.clear()
+            parser.finalize()
+        except FormParserError as error:
+            await self.discard()
+            raise UploadError('Malformed multipart/form-data body') from error
+        except BaseException:
+            await self.discard()
+            raise
+        return self
+
+    async def _parse_fields(self, stream: AsyncIterator[bytes]) -> 'StreamingForm':
+        """Form without files, read up to the limit of the fields"""
+        body = bytearray()
+        async for chunk in stream:
+            body += chunk
+            if len(body) > self.max_field * self.max_parts:
+                raise UploadTooLarge(f'The form exceeds {self.max_field * self.max_parts} bytes')
+        self.fields = dict(parse_qsl(body.decode('utf-8', errors='replace'), keep_blank_values=True))
+        return self
+
+    async def discard(self) -> None:
+        for file in self.files.values():
+            await file.discard()
+
+    def _on_part_begin(self) -> None:
+        self._parts += 1
+        if self._parts > self.max_parts:
+            raise UploadError(f'At most {self.max_parts} parts are accepted')
+        self._part = _Part()
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._part.file is not None:
+            self._writes.append((self._part.file, data[start:end]))
+            return
+        self._part.data += data[start:end]
+        if len(self._part.data) > self.max_field:
+            raise UploadTooLarge(f'The field "{self._part.name}" exceeds {self.max_field} bytes')
+
+    def _on_part_end(self) -> None:
+        if self._part.file is not None:
+            self._closes.append(self._part.file)
+        else:
+            self.fields[self._part.name] = self._part.data.decode('utf-8', errors='replace')
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_name += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        self._part.headers.append((self._header_name.lower(), self._header_value))
+        self._header_name = self._header_value = b''
+
+    def _on_headers_finished(self) -> None:
+        headers = Headers(raw=self._part.headers)
+        _, options = parse_options_header(headers.get('content-disposition', ''))
+        if b'name' not in options:
+            raise UploadError('The Content-Disposition of each part must have a name')
+        self._part.name = options[b'name'].decode('utf-8', errors='replace')
+        if options.get(b'filename'):
+            declared = headers.get('content-type', '').split(';')[0].strip().lower()
+            if declared not in IMAGE_TYPES:
+                raise UnsupportedMedia(f'The image must be one of {", ".join(IMAGE_TYPES)}')
+            if self._part.name in self.files:
+                raise UploadError(f'The file "{self._part.name}" was sent twice')
+            self._part.file = StagedFile(self.staging, declared, self.max_file)
+            self.files[self._part.name] = self._part.file
+
+
+__all__ = [
+    'IMAGE_TYPES',
+    'sniff',
+    'StagedFile',
+    'StreamingForm',
+    'UploadError',
+    'UploadTooLarge',
+    'UnsupportedMedia',
+]
@@ -0,0 +1,172 @@
+import os
+import asyncio
+import tempfile
+import functools
+import multiprocessing
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+from .uploads import StagedFile
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # pragma: no cover - optional dependency
+    Image = None
+
+# Longest side in pixels of each variant, images are never upscaled
+VARIANTS: dict[str, int] = {
+    'thumbnail': 160,
+    'card': 480,
+    'full': 1280,
+}
+
+# Format of Pillow and content type of the encodings of the variants
+FORMATS: dict[str, tuple[str, str]] = {
+    'webp': ('WEBP', 'image/webp'),
+    'avif': ('AVIF', 'image/avif'),
+}
+
+
+def supported(formats: tuple[str, ...]) -> tuple[str, ...]:
+    """Formats of the variants the installed Pillow can encode"""
+    if Image is None:
+        return ()
+    Image.init()
+    return tuple(name for name in formats if FORMATS[name][0] in Image.SAVE)
+
+
+def render(
+        source: str,
+        directory: str,
+        sizes: dict[str, int],
+        formats: tuple[str, ...],
+        quality: int) -> list[tuple[str, str, str, int]]:
+    """render
+        Resized variants of an image, run in the worker processes. The
+        variants are written to temporary files of the directory
+        \f
+        :param source: path of the original image
+        :param directory: directory of the variants
+        :param sizes: longest side of each variant
+        :param formats: encodings of each variant
+        :param quality: quality of the encoders
+        :return: name, format, path and size of each variant
+    """
+    variants = []
+    with Image.open(source) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+        # Largest first, each variant is resized from the previous one
+        for name, size in sorted(sizes.items(), key=lambda item: -item[1]):
+            image = image.copy()
+            image.thumbnail((size, size), Image.Resampling.LANCZOS)
+            for format_name in formats:
+                descriptor, path = tempfile.mkstemp(dir=directory, suffix=f'.{format_name}')
+                with os.fdopen(descriptor, 'wb') as file:
+                    image.save(file, format=FORMATS[format_name][0], quality=quality)
+                variants.append((name, format_name, path, os.path.getsize(path)))
+    return variants
+
+
+class ProcessingBusy(Exception):
+    """The queue of the image processing is full"""
+
+
+class ImageProcessor:
+    """ImageProcessor
+        Generate the variants of the uploaded images in a pool of
+        processes, the resize and encoding never run in the event loop.
+        At most ``workers`` images are processed at once and
+        ``queue_depth`` wait for a worker, further images are rejected
+        \f
+        :param workers: processes of the pool
+        :param queue_depth: images waiting for a worker
+        :param formats: encodings of the variants, the unsupported ones are skipped
+        :param quality: quality of the encoders
+        :param sizes: longest side of each variant
+        :param renderer: function run in the workers
+    """
+
+    def __init__(
+            self,
+            workers: int,
+            queue_depth: int,
+            formats: tuple[str, ...] = tuple(FORMATS),
+            quality: int = 80,
+            sizes: dict[str, int] = VARIANTS,
+            renderer=render) -> None:
+        self.workers = workers
+        self.queue_depth = queue_depth
+        self.formats = supported(formats)
+        self.quality = quality
+        self.sizes = dict(sizes)
+        self.renderer = renderer
+        self.pending = 0
+        self.processed = 0
+        self.rejected = 0
+        self._pool: ProcessPoolExecutor | None = None
+
+    @property
+    def available(self) -> bool:
+        """If Pillow can encode at least one of the formats"""
+        return bool(self.formats)
+
+    async def variants(self, source: Path, directory: Path) -> list[tuple[str, str, StagedFile]]:
+        """variants
+            Name, format and closed staged file of each variant of an
+            image, the caller stores and discards them
+            \f
+            :param source: path of the original image
+            :param directory: directory of the variants
+            :raises ProcessingBusy: the queue is full
+        """
+        if self.pending >= self.workers + self.queue_depth:
+            self.rejected += 1
+            raise ProcessingBusy('Too many images waiting to be processed')
+        if self._pool is None:
+            # Spawned, a fork would copy the event loop, the connections
+            # and the threads of the logging and the tracing
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn'))
+        self.pending += 1
+        try:
+            rendered = await asyncio.get_running_loop().run_in_executor(
+                self._pool,
+                functools.partial(
+                    self.renderer,
+                    str(source),
+                    str(directory),
+                    self.sizes,
+                    self.formats,
+                    self.quality))
+        finally:
+            self.pending -= 1
+        self.processed += 1
+        return [
+            (name, format_name, StagedFile.existing(Path(path), FORMATS[format_name][1], size))
+            for name, format_name, path, size in rendered
+        ]
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def stats(self) -> dict[str, int]:
+        return {
+            'pending': self.pending,
+            'processed': self.processed,
+            'rejected': self.rejected,
+        }
+
+
+__all__ = [
+    'VARIANTS',
+    'FORMATS',
+    'render',
+    'supported',
+    'ImageProcessor',
+    'ProcessingBusy',
+]
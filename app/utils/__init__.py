@@ -1,10 +1,17 @@
 from app.utils._types import *
+from .cache import LRUCache
+from .pagination import CursorField, next_link
 from . import exceptions
 
 __all__ = [
     'PathID',
     'NameField',
     'TitleField',
+    'UUIDList',
+    'UUIDItems',
     'SingleResponse',
-    'MultipleResponse'
+    'MultipleResponse',
+    'LRUCache',
+    'CursorField',
+    'next_link'
 ]
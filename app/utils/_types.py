@@ -3,8 +3,8 @@ from typing import Annotated, TypeAlias
 from fastapi import Path, File
 from fastapi.datastructures import UploadFile
 
-from pydantic import UUID4
-from pydantic import StringConstraints
+from pydantic import UUID4, TypeAdapter
+from pydantic import StringConstraints, AfterValidator
 
 from postgrest.base_request_builder import APIResponse, SingleAPIResponse
 
@@ -14,6 +14,22 @@ SingleResponse: TypeAlias = SingleAPIResponse
 NameField = Annotated[str, StringConstraints(strip_whitespace=True, max_length=80)]
 TitleField = Annotated[str, StringConstraints(min_length=10, max_length=200)]
 
+_uuids = TypeAdapter(list[UUID4])
+
+def _validate_items(value: str) -> str:
+    uuids = _uuids.validate_python([item.strip() for item in value.split(',') if item.strip()])
+    if not uuids:
+        raise ValueError('At least one id is required')
+    return ','.join(str(item) for item in uuids)
+
+def _validate_uuids(value: str) -> str:
+    return ','.join(dict.fromkeys(_validate_items(value).split(',')))
+
+# Comma separated UUIDs normalized without duplicates
+UUIDList = Annotated[str, AfterValidator(_validate_uuids)]
+# Comma separated UUIDs normalized, the repeated ones are kept in place
+UUIDItems = Annotated[str, AfterValidator(_validate_items)]
+
 PathID = Annotated[UUID4, Path(..., description='ID of the resource to get', )]
 # TODO: Add None in Annotated
 ImageFile = Annotated[UploadFile, File(description='Image file for the recipes')]
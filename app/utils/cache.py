@@ -0,0 +1,84 @@
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any, Generic, TypeVar
+
+_Key = TypeVar('_Key', bound=Hashable)
+_Value = TypeVar('_Value')
+
+_MISSING = object()
+
+
+class LRUCache(Generic[_Key, _Value]):
+    """LRUCache
+        Bounded mapping with least recently used eviction, every entry
+        expires after the cache ``ttl`` or at its own ``expires_at``
+        timestamp (seconds since Unix epoch), whichever comes first
+    """
+
+    def __init__(
+            self,
+            maxsize: int,
+            ttl: float | None = None,
+            clock: Callable[[], float] = time.time) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: OrderedDict[_Key, tuple[_Value, float | None]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: _Key) -> bool:
+        return self.get(key, _MISSING, count=False) is not _MISSING
+
+    def get(self, key: _Key, default: Any = None, *, count: bool = True) -> _Value | Any:
+        entry = self._entries.get(key, None)
+        if entry is not None and entry[1] is not None and entry[1] <= self._clock():
+            del self._entries[key]
+            self.evictions += 1
+            entry = None
+        if entry is None:
+            if count:
+                self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        if count:
+            self.hits += 1
+        return entry[0]
+
+    def set(self, key: _Key, value: _Value, expires_at: float | None = None) -> None:
+        if self.ttl is not None:
+            deadline = self._clock() + self.ttl
+            expires_at = deadline if expires_at is None else min(expires_at, deadline)
+        if expires_at is not None and expires_at <= self._clock():
+            return
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: _Key, default: Any = None) -> _Value | Any:
+        entry = self._entries.pop(key, None)
+        return default if entry is None else entry[0]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+
+__all__ = [
+    'LRUCache',
+]
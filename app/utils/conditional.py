@@ -0,0 +1,90 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response, status
+
+
+def parse_timestamp(value: datetime | str) -> datetime:
+    """Aware datetime of a timestamp of the DB, UTC when it has no offset"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def version(records: list[dict], count: int | None = None) -> tuple[str, datetime | None]:
+    """Digest of the ids and modification dates of the records, and the
+        latest of those dates. Only ``id`` and ``updated_at`` are read so
+        the cheap metadata queries get the same version as the full ones
+    """
+    digest = hashlib.sha1(str(count).encode())
+    updated_at = None
+    for record in records:
+        digest.update(f'{record["id"]}@{record["updated_at"]};'.encode())
+        modified = parse_timestamp(record['updated_at'])
+        if updated_at is None or modified > updated_at:
+            updated_at = modified
+    return digest.hexdigest(), updated_at
+
+
+def cache_headers(request: Request, digest: str | None, updated_at: datetime | None) -> dict[str, str]:
+    """ETag and Last-Modified of a response, the ETag is weak as the body
+        also depends on the projection and serialization of the request
+    """
+    if digest is None:
+        return {}
+    tag = hashlib.sha1(f'{digest}?{request.url.query}'.encode()).hexdigest()
+    headers = {
+        'ETag': f'W/"{tag}"',
+        'Cache-Control': 'no-cache',
+    }
+    if updated_at is not None:
+        headers['Last-Modified'] = format_datetime(
+            updated_at.astimezone(timezone.utc), usegmt=True)
+    return headers
+
+
+def is_conditional(request: Request) -> bool:
+    return 'if-none-match' in request.headers or 'if-modified-since' in request.headers
+
+
+def not_modified(request: Request, headers: dict[str, str]) -> bool:
+    """Evaluate the preconditions of a GET, If-None-Match takes precedence
+        over If-Modified-Since as stated by RFC 9110
+    """
+    if not headers:
+        return False
+    if (if_none_match := request.headers.get('if-none-match')) is not None:
+        if if_none_match.strip() == '*':
+            return True
+        current = headers['ETag'].removeprefix('W/')
+        return any(
+            tag.strip().removeprefix('W/') == current
+            for tag in if_none_match.split(','))
+    if (if_modified_since := request.headers.get('if-modified-since')) is not None \
+            and 'Last-Modified' in headers:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return parsedate_to_datetime(headers['Last-Modified']) <= since
+    return False
+
+
+def not_modified_response(headers: dict[str, str]) -> Response:
+    """Empty 304 response, the envelope is never serialized"""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+
+__all__ = [
+    'version',
+    'cache_headers',
+    'is_conditional',
+    'not_modified',
+    'not_modified_response',
+    'parse_timestamp',
+]
@@ -1,4 +1,4 @@
-from .handlers import validation_error
+from .handlers import validation_error, http_error
 from .common import (
     not_found,
     json_error,
@@ -13,5 +13,6 @@ __all__ = [
     'server_error',
     'expired_token',
     'unauthenticated',
-    'validation_error'
+    'validation_error',
+    'http_error'
 ]
@@ -1,4 +1,3 @@
-from fastapi.encoders import jsonable_encoder
 from fastapi import HTTPException, Request, status
 
 from app.schemas.response import Response
@@ -39,6 +38,45 @@ def server_error(request: Request, msg: str) -> HTTPException:
     )
 
 
+def bad_request(request: Request, msg: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=json_error(
+            status=status.HTTP_400_BAD_REQUEST,
+            message=msg,
+            path=request.url.path,
+            resource_type='Bad request'
+        ),
+        headers=COMMON_HEADERS
+    )
+
+
+def payload_too_large(request: Request, msg: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=json_error(
+            status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            message=msg,
+            path=request.url.path,
+            resource_type='Payload too large'
+        ),
+        headers={**COMMON_HEADERS, 'Connection': 'close'}
+    )
+
+
+def unsupported_media_type(request: Request, msg: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+        detail=json_error(
+            status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            message=msg,
+            path=request.url.path,
+            resource_type='Unsupported media type'
+        ),
+        headers={**COMMON_HEADERS, 'Connection': 'close'}
+    )
+
+
 def unauthenticated(request: Request) -> HTTPException:
     return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -89,7 +127,7 @@ def json_error(**kwargs):
         resource_type = type(data)
         if list == resource_type:
             resource_type = list[type(data[0])]
-    return jsonable_encoder(
-        Response[resource_type](**kwargs),
+    return Response[resource_type](**kwargs).model_dump(
+        mode='json',
         exclude_none=True
     )
@@ -1,8 +1,8 @@
 from fastapi import Request, status
-from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 
 from .common import unprocessed_entity
+from ..responses import CoreJSONResponse, http_error
 
 def validation_error(request: Request, exc: RequestValidationError):
     error_content = [
@@ -12,7 +12,7 @@ def validation_error(request: Request, exc: RequestValidationError):
             'msg': error['msg']
         } for error in exc.errors()
     ]
-    return JSONResponse(
+    return CoreJSONResponse(
         content=unprocessed_entity(
             request,
             msg='Unprocessable JSON object',
@@ -21,3 +21,9 @@ def validation_error(request: Request, exc: RequestValidationError):
         media_type='application/json',
         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY
     )
+
+
+__all__ = [
+    'http_error',
+    'validation_error',
+]
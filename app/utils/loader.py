@@ -0,0 +1,95 @@
+import asyncio
+import functools
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+
+class BatchLoader:
+    """BatchLoader
+        DataLoader-like batcher, the keys requested in the same tick of
+        the event loop are resolved together with a single call of the
+        batch function. Keys are grouped so only the loads that share the
+        same context, as the authorization of a client, are batched
+    """
+
+    def __init__(
+            self,
+            batch: Callable[[Any, list[Hashable]], Awaitable[dict[Hashable, Any]]],
+            max_batch: int = 100) -> None:
+        self._batch = batch
+        self.max_batch = max_batch
+        self._pending: dict[Hashable, tuple[Any, dict[Hashable, asyncio.Future]]] = {}
+        # Batches in flight, referenced until they end
+        self._tasks: set[asyncio.Task] = set()
+        self.batches = 0
+        self.loads = 0
+
+    async def load(self, context: Any, group: Hashable, key: Hashable) -> Any:
+        """load
+            Value of the key, None when the batch did not return it
+            \f
+            :param context: argument of the batch function, the one of
+                the first load of the group is used
+            :param group: loads batched together
+            :param key: key to resolve
+        """
+        loop = asyncio.get_running_loop()
+        pending = self._pending.get(group)
+        if pending is None:
+            pending = self._pending[group] = (context, {})
+            loop.call_soon(self._dispatch, group, pending)
+        futures = pending[1]
+        future = futures.get(key)
+        if future is None:
+            future = futures[key] = loop.create_future()
+        self.loads += 1
+        if len(futures) >= self.max_batch:
+            self._dispatch(group, pending)
+        return await asyncio.shield(future)
+
+    def _dispatch(self, group: Hashable, pending: tuple) -> None:
+        if self._pending.get(group) is not pending:
+            return
+        del self._pending[group]
+        self.batches += 1
+        task = asyncio.ensure_future(self._resolve(*pending))
+        self._tasks.add(task)
+        task.add_done_callback(functools.partial(self._done, pending[1]))
+
+    def _done(self, futures: dict[Hashable, asyncio.Future], task: asyncio.Task) -> None:
+        """Cancel the loads of a batch cancelled before it started"""
+        self._tasks.discard(task)
+        for future in futures.values():
+            if not future.done():
+                future.cancel()
+
+    async def _resolve(self, context: Any, futures: dict[Hashable, asyncio.Future]) -> None:
+        try:
+            values = await self._batch(context, list(futures))
+        except BaseException as error:
+            for future in futures.values():
+                if future.done():
+                    continue
+                if isinstance(error, Exception):
+                    future.set_exception(error)
+                    # Retrieved for the loads that were cancelled
+                    future.exception()
+                else:
+                    future.cancel()
+            if not isinstance(error, Exception):
+                raise
+            return
+        for key, future in futures.items():
+            if not future.done():
+                future.set_result(values.get(key))
+
+    def stats(self) -> dict[str, int]:
+        return {
+            'loads': self.loads,
+            'batches': self.batches,
+        }
+
+
+__all__ = [
+    'BatchLoader',
+]
@@ -0,0 +1,242 @@
+import math
+import bisect
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable, Iterator, Mapping
+
+# Buckets in seconds of the latency histograms, the defaults of the
+# Prometheus clients
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+_Labels = tuple[str, ...]
+_Sample = tuple[str, Mapping[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric(ABC):
+    """_Metric
+        Family of samples of a metric, one child per combination of the
+        values of its labels
+        \f
+        :param name: name of the metric
+        :param documentation: help text of the metric
+        :param labelnames: names of the labels
+    """
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: dict[_Labels, object] = {}
+
+    def labels(self, *values: str):
+        """Child of the values of the labels, created on its first use"""
+        if len(values) != len(self.labelnames):
+            raise ValueError(f'{self.name} expects the labels {self.labelnames}')
+        values = tuple(str(value) for value in values)
+        child = self._children.get(values)
+        if child is None:
+            child = self._children[values] = self._child()
+        return child
+
+    def clear(self) -> None:
+        self._children.clear()
+
+    def samples(self) -> Iterator[_Sample]:
+        for values, child in sorted(self._children.items()):
+            labels = dict(zip(self.labelnames, values))
+            yield from self._child_samples(labels, child)
+
+    @abstractmethod
+    def _child(self):
+        """New child of a combination of the values of the labels"""
+
+    def _child_samples(self, labels: dict[str, str], child) -> Iterator[_Sample]:
+        yield self.name, labels, child.value
+
+
+class _Value:
+    __slots__ = ('value',)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = float(value)
+
+
+class _Scalar(_Metric):
+    """_Scalar
+        Metric of a single value per child. A metric with a function reads
+        its values when the metrics are collected instead of being updated,
+        for the counters kept by other components
+        \f
+        :param function: values by the values of the labels
+    """
+
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            labelnames: Iterable[str] = (),
+            function: Callable[[], Mapping[_Labels, float]] | None = None) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.function = function
+
+    def _child(self) -> _Value:
+        return _Value()
+
+    def samples(self) -> Iterator[_Sample]:
+        if self.function is None:
+            yield from super().samples()
+            return
+        for values, value in sorted(self.function().items()):
+            child = self._child()
+            child.set(value)
+            yield from self._child_samples(dict(zip(self.labelnames, values)), child)
+
+
+class Counter(_Scalar):
+    """Monotonic counter, the ``_total`` suffix is added to its samples"""
+    kind = 'counter'
+
+    def _child_samples(self, labels: dict[str, str], child: _Value) -> Iterator[_Sample]:
+        yield f'{self.name}_total', labels, child.value
+
+
+class Gauge(_Scalar):
+    """Value that goes up and down"""
+    kind = 'gauge'
+
+
+class _Buckets:
+    __slots__ = ('bounds', 'counts', 'sum')
+
+    def __init__(self, bounds: tuple[float, ...]) -> None:
+        self.bounds = bounds
+        self.counts = [0] * len(bounds)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+
+class Histogram(_Metric):
+    """Histogram
+        Distribution of the observed values in cumulative buckets
+        \f
+        :param buckets: upper bounds of the buckets, +Inf is always added
+    """
+    kind = 'histogram'
+
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            labelnames: Iterable[str] = (),
+            buckets: Iterable[float] = DEFAULT_BUCKETS) -> None:
+        super().__init__(name, documentation, labelnames)
+        bounds = sorted(float(bound) for bound in buckets)
+        if not bounds or bounds[-1] != math.inf:
+            bounds.append(math.inf)
+        self.buckets = tuple(bounds)
+
+    def _child(self) -> _Buckets:
+        return _Buckets(self.buckets)
+
+    def _child_samples(self, labels: dict[str, str], child: _Buckets) -> Iterator[_Sample]:
+        total = 0
+        for bound, count in zip(child.bounds, child.counts):
+            total += count
+            yield f'{self.name}_bucket', {**labels, 'le': _number(bound)}, total
+        yield f'{self.name}_sum', labels, child.sum
+        yield f'{self.name}_count', labels, total
+
+
+class Registry:
+    """Metrics exposed by the API in the Prometheus text format"""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f'Metric "{metric.name}" already registered')
+        self._metrics[metric.name] = metric
+        return metric
+
+    def get(self, name: str) -> _Metric | None:
+        return self._metrics.get(name)
+
+    def render(self) -> bytes:
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f'# HELP {metric.name} {_escape(metric.documentation)}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for name, labels, value in metric.samples():
+                if labels:
+                    pairs = ','.join(f'{key}="{_escape(str(label))}"' for key, label in labels.items())
+                    name = f'{name}{{{pairs}}}'
+                lines.append(f'{name} {_number(value)}')
+        return ('\n'.join(lines) + '\n').encode()
+
+
+registry = Registry()
+
+
+def counter(
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        function: Callable[[], Mapping[_Labels, float]] | None = None) -> Counter:
+    return registry.register(Counter(name, documentation, labelnames, function))
+
+
+def gauge(
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        function: Callable[[], Mapping[_Labels, float]] | None = None) -> Gauge:
+    return registry.register(Gauge(name, documentation, labelnames, function))
+
+
+def histogram(
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+    return registry.register(Histogram(name, documentation, labelnames, buckets))
+
+
+__all__ = [
+    'CONTENT_TYPE',
+    'DEFAULT_BUCKETS',
+    'Counter',
+    'Gauge',
+    'Histogram',
+    'Registry',
+    'registry',
+    'counter',
+    'gauge',
+    'histogram',
+]
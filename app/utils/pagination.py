@@ -0,0 +1,68 @@
+import json
+import uuid
+import base64
+import binascii
+from typing import Annotated
+from datetime import datetime
+
+from fastapi import Request
+from pydantic import AfterValidator
+
+
+def encode_cursor(created_at: str, model_id: str) -> str:
+    """Opaque cursor of the keyset ``(created_at, id)`` of a record"""
+    raw = json.dumps([str(created_at), str(model_id)], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> tuple[str, str]:
+    """Recover the keyset ``(created_at, id)`` encoded in a cursor, the
+        values are normalized so they are safe to put in a filter
+
+        :raises ValueError: the cursor was not issued by the API
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        keyset = json.loads(raw)
+        if not isinstance(keyset, list) or len(keyset) != 2 \
+                or not all(isinstance(value, str) for value in keyset):
+            raise ValueError('The keyset is not a timestamp and an id')
+        created_at = datetime.fromisoformat(keyset[0])
+        model_id = uuid.UUID(keyset[1])
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as error:
+        raise ValueError('Invalid pagination cursor') from error
+    return created_at.isoformat(), str(model_id)
+
+
+def _validate_cursor(cursor: str) -> str:
+    decode_cursor(cursor)
+    return cursor
+
+
+def next_link(request: Request, cursor: str | None, page: int | None = None) -> str | None:
+    """Relative link of the page that follows the cursor, the offset
+        parameters are dropped as the cursor already sets the start.
+        Results without keyset, as the ranked ones, link the next page
+    """
+    if cursor is not None:
+        url = request.url\
+            .remove_query_params(['page', 'skip'])\
+            .include_query_params(cursor=cursor)
+    elif page is not None:
+        url = request.url\
+            .remove_query_params('cursor')\
+            .include_query_params(page=page)
+    else:
+        return None
+    return f'{url.path}?{url.query}'
+
+
+CursorField = Annotated[str, AfterValidator(_validate_cursor)]
+
+
+__all__ = [
+    'next_link',
+    'CursorField',
+    'encode_cursor',
+    'decode_cursor',
+]
@@ -0,0 +1,52 @@
+from typing import Any
+from collections.abc import Iterable
+
+from pydantic import BaseModel
+from pydantic_core import to_json
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+from starlette.exceptions import HTTPException
+from fastapi.utils import is_body_allowed_for_status_code
+
+
+class CoreJSONResponse(JSONResponse):
+    """CoreJSONResponse
+        JSON response encoded in Rust by pydantic-core, models, UUID,
+        datetimes and URLs are serialized natively without the previous
+        walk of ``jsonable_encoder``. The output is compact UTF-8 as the
+        one of ``JSONResponse``
+    """
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
+
+
+def ndjson(models: Iterable[BaseModel]) -> bytes:
+    """Newline delimited JSON of the models, one per line, as a single
+        chunk of a streamed body
+    """
+    return b''.join(
+        model.__pydantic_serializer__.to_json(model, exclude_none=True) + b'\n'
+        for model in models
+    )
+
+
+async def http_error(request: Request, exc: HTTPException) -> Response:
+    """Same response of the FastAPI handler of the HTTP exceptions,
+        rendered by ``CoreJSONResponse``
+    """
+    headers = getattr(exc, 'headers', None)
+    if not is_body_allowed_for_status_code(exc.status_code):
+        return Response(status_code=exc.status_code, headers=headers)
+    return CoreJSONResponse(
+        {'detail': exc.detail},
+        status_code=exc.status_code,
+        headers=headers
+    )
+
+
+__all__ = [
+    'CoreJSONResponse',
+    'http_error',
+    'ndjson',
+]
@@ -0,0 +1,61 @@
+import asyncio
+from collections import Counter
+from collections.abc import Awaitable, Callable, Hashable
+from typing import TypeVar
+
+_T = TypeVar('_T')
+
+
+class SingleFlight:
+    """SingleFlight
+        Collapse concurrent calls with the same key into one in-flight
+        task, the callers that arrive while it runs await its result.
+        The task is shielded so a cancelled caller does not cancel the
+        call of the others
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[Hashable, asyncio.Task] = {}
+        self.executed: Counter[str] = Counter()
+        self.collapsed: Counter[str] = Counter()
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[_T]], label: str = '') -> _T:
+        """do
+            Await the in-flight call of the key or start a new one
+            \f
+            :param key: identity of the call
+            :param call: coroutine function to run when nothing is in flight
+            :param label: name of the metrics of the call
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(call())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._done(key, done))
+            self.executed[label] += 1
+        else:
+            self.collapsed[label] += 1
+        return await asyncio.shield(task)
+
+    def _done(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # Retrieved for the case all the callers were cancelled
+            task.exception()
+
+    def stats(self) -> dict[str, int | dict[str, int]]:
+        return {
+            'in_flight': len(self._calls),
+            'executed': sum(self.executed.values()),
+            'collapsed': sum(self.collapsed.values()),
+            'collapsed_by': dict(self.collapsed),
+        }
+
+
+__all__ = [
+    'SingleFlight',
+]
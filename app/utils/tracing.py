@@ -0,0 +1,379 @@
+import sys
+import json
+import time
+import random
+import asyncio
+import contextlib
+from abc import ABC, abstractmethod
+from pathlib import Path
+from collections import deque
+from contextvars import ContextVar
+from collections.abc import Iterator
+
+import anyio
+import httpx
+
+from app.logging import logger
+
+# Kinds and status codes of the spans of the OTLP protocol
+KINDS = {'INTERNAL': 1, 'SERVER': 2, 'CLIENT': 3}
+STATUS = {'UNSET': 0, 'OK': 1, 'ERROR': 2}
+
+
+def _attribute(key: str, value) -> dict:
+    if isinstance(value, bool):
+        return {'key': key, 'value': {'boolValue': value}}
+    if isinstance(value, int):
+        return {'key': key, 'value': {'intValue': str(value)}}
+    if isinstance(value, float):
+        return {'key': key, 'value': {'doubleValue': value}}
+    return {'key': key, 'value': {'stringValue': str(value)}}
+
+
+class Span:
+    """Span
+        Timed operation of a trace, serialized as a span of the OTLP JSON
+        encoding. The spans of a trace not sampled are not recorded, they
+        only propagate its context
+        \f
+        :param name: name of the operation
+        :param trace_id: 32 hex digits of the trace
+        :param parent_id: 16 hex digits of the parent span
+        :param kind: INTERNAL, SERVER or CLIENT
+        :param sampled: if the span is exported
+    """
+    __slots__ = (
+        'name', 'trace_id', 'span_id', 'parent_id', 'kind', 'sampled',
+        'attributes', 'status', 'message', 'start', 'end')
+
+    def __init__(
+            self,
+            name: str,
+            trace_id: str,
+            parent_id: str | None = None,
+            kind: str = 'INTERNAL',
+            sampled: bool = True) -> None:
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = f'{random.getrandbits(64):016x}'
+        self.parent_id = parent_id
+        self.kind = kind
+        self.sampled = sampled
+        self.attributes: dict[str, str | int | float | bool] = {}
+        self.status = 'UNSET'
+        self.message = ''
+        self.start = time.time_ns()
+        self.end: int | None = None
+
+    @property
+    def traceparent(self) -> str:
+        """W3C Trace Context header of the span"""
+        return f'00-{self.trace_id}-{self.span_id}-{"01" if self.sampled else "00"}'
+
+    def set_attribute(self, key: str, value) -> None:
+        if self.sampled and value is not None:
+            self.attributes[key] = value
+
+    def record_exception(self, error: BaseException) -> None:
+        self.status = 'ERROR'
+        self.message = str(error)
+        self.set_attribute('exception.type', type(error).__name__)
+
+    def to_otlp(self) -> dict:
+        span = {
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'name': self.name,
+            'kind': KINDS[self.kind],
+            'startTimeUnixNano': str(self.start),
+            'endTimeUnixNano': str(self.end),
+            'attributes': [_attribute(key, value) for key, value in self.attributes.items()],
+            'status': {'code': STATUS[self.status]},
+        }
+        if self.parent_id:
+            span['parentSpanId'] = self.parent_id
+        if self.message:
+            span['status']['message'] = self.message
+        return span
+
+
+def parse_traceparent(value: str | None) -> tuple[str, str, bool] | None:
+    """Trace id, parent span id and sampled flag of a traceparent header,
+        None when it is missing or invalid
+    """
+    if not value:
+        return None
+    parts = value.strip().lower().split('-')
+    if len(parts) < 4 or parts[0] == 'ff' or len(parts[0]) != 2:
+        return None
+    _, trace_id, parent_id, flags = parts[:4]
+    try:
+        if len(trace_id) != 32 or len(parent_id) != 16 or len(flags) != 2 \
+                or int(trace_id, 16) == 0 or int(parent_id, 16) == 0:
+            return None
+        return trace_id, parent_id, bool(int(flags, 16) & 1)
+    except ValueError:
+        return None
+
+
+class Exporter(ABC):
+    """Destination of the finished spans"""
+
+    @abstractmethod
+    async def export(self, spans: list[dict]) -> None:
+        """Send a batch of spans of the OTLP JSON encoding"""
+
+    async def aclose(self) -> None:
+        """Release the resources of the exporter"""
+
+
+class ConsoleExporter(Exporter):
+    """Spans written to the standard error, one JSON per line"""
+
+    def __init__(self, stream=None) -> None:
+        self.stream = stream or sys.stderr
+
+    async def export(self, spans: list[dict]) -> None:
+        lines = ''.join(json.dumps(span) + '\n' for span in spans)
+        await anyio.to_thread.run_sync(self._write, lines)
+
+    def _write(self, lines: str) -> None:
+        self.stream.write(lines)
+        self.stream.flush()
+
+
+class FileExporter(Exporter):
+    """Spans appended to a file, one JSON per line"""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+
+    async def export(self, spans: list[dict]) -> None:
+        lines = ''.join(json.dumps(span) + '\n' for span in spans)
+        await anyio.to_thread.run_sync(self._write, lines)
+
+    def _write(self, lines: str) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open('a', encoding='utf-8') as file:
+            file.write(lines)
+
+
+class OTLPExporter(Exporter):
+    """OTLPExporter
+        Spans sent to a collector with the OTLP/HTTP JSON encoding, as the
+        OpenTelemetry Collector or Jaeger listening on localhost
+        \f
+        :param endpoint: URL of the traces of the collector
+        :param service: name of the service of the spans
+    """
+
+    def __init__(self, endpoint: str, service: str, timeout: float = 5.0) -> None:
+        self.endpoint = endpoint
+        self.service = service
+        # Not traced, the export must not create spans of its own
+        self.http = httpx.AsyncClient(timeout=timeout)
+
+    async def export(self, spans: list[dict]) -> None:
+        await self.http.post(self.endpoint, json={
+            'resourceSpans': [{
+                'resource': {'attributes': [_attribute('service.name', self.service)]},
+                'scopeSpans': [{'scope': {'name': 'app'}, 'spans': spans}],
+            }],
+        })
+
+    async def aclose(self) -> None:
+        await self.http.aclose()
+
+
+def exporter(kind: str, path: str, endpoint: str, service: str) -> Exporter | None:
+    """Exporter of a kind of the settings, None when tracing is disabled"""
+    if kind == 'console':
+        return ConsoleExporter()
+    if kind == 'file':
+        return FileExporter(Path(path))
+    if kind == 'otlp':
+        return OTLPExporter(endpoint, service)
+    return None
+
+
+_current: ContextVar[Span | None] = ContextVar('span', default=None)
+
+
+class Tracer:
+    """Tracer
+        Create the spans of the requests, the current span is kept in a
+        context variable so the spans of a task are nested. The finished
+        spans are buffered and exported in batches by a background task,
+        the buffer is bounded and the spans beyond it are dropped. Without
+        exporter the spans are not created at all
+        \f
+        :param max_queue: spans buffered before they are dropped
+        :param batch_size: spans of each export
+        :param interval: seconds between the exports
+    """
+
+    def __init__(self, max_queue: int = 2048, batch_size: int = 512, interval: float = 5.0) -> None:
+        self.exporter: Exporter | None = None
+        self.sample_ratio = 1.0
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.interval = interval
+        self.dropped = 0
+        self._queue: deque[Span] = deque()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def configure(self, exporter: Exporter | None, sample_ratio: float = 1.0) -> None:
+        self.exporter = exporter
+        self.sample_ratio = sample_ratio
+
+    @staticmethod
+    def current() -> Span | None:
+        return _current.get()
+
+    @contextlib.contextmanager
+    def span(
+            self,
+            name: str,
+            kind: str = 'INTERNAL',
+            traceparent: str | None = None,
+            **attributes) -> Iterator[Span | None]:
+        """span
+            Span child of the current one, or of the remote parent of the
+            traceparent, a new trace is sampled by the ratio of the
+            settings. The exceptions raised inside are recorded
+            \f
+            :param name: name of the operation
+            :param kind: INTERNAL, SERVER or CLIENT
+            :param traceparent: header of the remote parent
+            :param attributes: attributes of the span
+        """
+        if self.exporter is None:
+            yield None
+            return
+        parent = _current.get()
+        if parent is not None:
+            span = Span(name, parent.trace_id, parent.span_id, kind, parent.sampled)
+        elif (remote := parse_traceparent(traceparent)) is not None:
+            span = Span(name, remote[0], remote[1], kind, remote[2])
+        else:
+            span = Span(
+                name,
+                f'{random.getrandbits(128):032x}',
+                kind=kind,
+                sampled=random.random() < self.sample_ratio)
+        for key, value in attributes.items():
+            span.set_attribute(key, value)
+        token = _current.set(span)
+        try:
+            yield span
+        except BaseException as error:
+            span.record_exception(error)
+            raise
+        finally:
+            _current.reset(token)
+            self._finish(span)
+
+    def _finish(self, span: Span) -> None:
+        span.end = time.time_ns()
+        if not span.sampled:
+            return
+        if len(self._queue) >= self.max_queue:
+            self.dropped += 1
+            return
+        self._queue.append(span)
+
+    async def flush(self) -> None:
+        """Export the buffered spans, the errors of the exporter are not
+            raised as tracing never breaks a request nor stops the exports
+        """
+        while self._queue and self.exporter is not None:
+            count = min(self.batch_size, len(self._queue))
+            batch = [self._queue.popleft().to_otlp() for _ in range(count)]
+            try:
+                await self.exporter.export(batch)
+            except Exception as error:
+                self.dropped += len(batch)
+                logger.warning('Cannot export %d spans "%s"', len(batch), error)
+                return
+
+    async def start(self) -> None:
+        if self.exporter is not None and self._task is None:
+            self._task = asyncio.create_task(self._export())
+
+    async def shutdown(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        await self.flush()
+        if self.exporter is not None:
+            await self.exporter.aclose()
+
+    async def _export(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception('Cannot flush the spans')
+
+    def stats(self) -> dict[str, int]:
+        return {
+            'queued': len(self._queue),
+            'dropped': self.dropped,
+        }
+
+
+tracer = Tracer()
+
+
+class TracingTransport(httpx.AsyncBaseTransport):
+    """TracingTransport
+        Transport that wraps each outgoing request in a client span and
+        propagates its context with the traceparent header
+        \f
+        :param transport: transport that sends the requests
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport) -> None:
+        self.transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if not tracer.enabled or tracer.current() is None:
+            return await self.transport.handle_async_request(request)
+        with tracer.span(
+                f'{request.method} {request.url.host}',
+                kind='CLIENT',
+                **{
+                    'http.request.method': request.method,
+                    'server.address': request.url.host,
+                    'url.path': request.url.path,
+                }) as span:
+            request.headers['traceparent'] = span.traceparent
+            response = await self.transport.handle_async_request(request)
+            span.set_attribute('http.response.status_code', response.status_code)
+            if response.status_code >= 500:
+                span.status = 'ERROR'
+            return response
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+__all__ = [
+    'Span',
+    'Tracer',
+    'tracer',
+    'exporter',
+    'Exporter',
+    'ConsoleExporter',
+    'FileExporter',
+    'OTLPExporter',
+    'TracingTransport',
+    'parse_traceparent',
+]
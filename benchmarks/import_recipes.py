@@ -0,0 +1,77 @@
+"""Benchmark of the recipes import command
+
+    Streams synthetic recipes as NDJSON through the importer against a
+    stand-in of the ``insert_recipes`` function that answers after a fixed
+    latency, the throughput measured is the one of the client side, the
+    parsing, validation and serialization of the batches.
+
+    Run it with the same environment of the API:
+
+        python -m benchmarks.import_recipes --recipes 1000000 --latency 0.05
+"""
+import io
+import json
+import uuid
+import asyncio
+import argparse
+from pathlib import Path
+
+import httpx
+
+from app.core.settings import settings
+from app.cli.importer import Importer, read_records
+from app.db import Repository
+
+DATA_FILE = Path(__file__).absolute().parent.parent.joinpath('app/db/dummy/data.json')
+
+
+def synthetic(total: int) -> io.BytesIO:
+    records = json.loads(DATA_FILE.read_text())
+    lines = []
+    for index in range(total):
+        record = records[index % len(records)]
+        lines.append(json.dumps({
+            **record,
+            'id': str(uuid.uuid4()),
+            'title': f'{record["title"][:80]} {index}',
+            'ingredients': record['description'][:120],
+        }).encode())
+    return io.BytesIO(b'\n'.join(lines))
+
+
+def backend(latency: float) -> httpx.AsyncBaseTransport:
+    async def insert_recipes(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(latency)
+        return httpx.Response(200, json=len(json.loads(request.content)['recipes_json']))
+    return httpx.MockTransport(insert_recipes)
+
+
+async def run(args: argparse.Namespace, source: io.BytesIO):
+    await Repository.init_pool(backend(args.latency))
+    try:
+        importer = Importer(
+            Repository.pool.view('service-token'),
+            batch_size=args.batch_size,
+            concurrency=args.concurrency)
+        return await importer.run(read_records(source), progress=args.progress)
+    finally:
+        await Repository.close_pool()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--recipes', type=int, default=100_000, help='synthetic recipes to import')
+    parser.add_argument('--latency', type=float, default=0.05, help='seconds of each insert')
+    parser.add_argument('--batch-size', type=int, default=settings.IMPORT_BATCH_SIZE)
+    parser.add_argument('--concurrency', type=int, default=settings.IMPORT_CONCURRENCY)
+    parser.add_argument('--progress', type=float, default=None, help='seconds between reports')
+    args = parser.parse_args()
+
+    source = synthetic(args.recipes)
+    print(f'{len(source.getbuffer()) / 2 ** 20:.1f} MiB of NDJSON')
+    stats = asyncio.run(run(args, source))
+    print(stats)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""Benchmark of the response path of the recipes list
+
+    Compares the previous path, a validation per record in the controller,
+    the validation of the envelope and the response_model validation and
+    serialization of FastAPI, against the single validation with the cached
+    adapter and the direct JSON serialization of ``Response.render``.
+
+    Run it with the same environment of the API:
+
+        python -m benchmarks.response_path --rows 100 --number 200
+"""
+import json
+import uuid
+import asyncio
+import argparse
+import timeit
+from pathlib import Path
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.controller.base import BaseController
+from app.schemas.recipes import RecipeOut
+from app.schemas.response import ControllerResponse, Response
+
+DATA_FILE = Path(__file__).absolute().parent.parent.joinpath('app/db/dummy/data.json')
+
+Responses = Response[list[RecipeOut] | RecipeOut | dict]
+FIELD = create_response_field(name='Response_recipes', type_=Responses)
+LOOP = asyncio.new_event_loop()
+
+
+def load_rows(total: int) -> list[dict]:
+    records = json.loads(DATA_FILE.read_text())
+    for record in records:
+        record.setdefault('ingredients', record['description'])
+    return [
+        {**records[index % len(records)], 'id': str(uuid.uuid4())}
+        for index in range(total)
+    ]
+
+
+def previous_path(rows: list[dict]) -> bytes:
+    response = ControllerResponse[list[RecipeOut]]()
+    response.data = [
+        RecipeOut.model_validate(record, from_attributes=True)
+        for record in rows
+    ]
+    envelope = Response[list[RecipeOut]](
+        count=len(rows),
+        data=response.data,
+        resource_type='Recipe',
+        path='/api/v1.0/recipes/')
+    content = LOOP.run_until_complete(serialize_response(
+        field=FIELD,
+        response_content=envelope,
+        exclude_none=True))
+    return JSONResponse(content).body
+
+
+def fast_path(rows: list[dict]) -> bytes:
+    response = ControllerResponse[list[RecipeOut]]()
+    response.data = BaseController._validate(RecipeOut, rows)
+    return Response[list[RecipeOut]].render(
+        count=len(rows),
+        data=response.data,
+        resource_type='Recipe',
+        path='/api/v1.0/recipes/').body
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100, help='records of the page')
+    parser.add_argument('--number', type=int, default=200, help='runs of each path')
+    args = parser.parse_args()
+
+    rows = load_rows(args.rows)
+    assert json.loads(previous_path(rows)) == json.loads(fast_path(rows))
+
+    results = {}
+    for name, path in (('previous', previous_path), ('fast', fast_path)):
+        best = min(timeit.repeat(lambda: path(rows), number=args.number, repeat=5))
+        results[name] = best / args.number * 1e6
+        print(f'{name:>8}: {results[name]:10.1f} us per page of {args.rows} recipes')
+    print(f' speedup: {results["previous"] / results["fast"]:10.2f}x')
+
+
+if __name__ == '__main__':
+    main()
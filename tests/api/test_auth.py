@@ -0,0 +1,47 @@
+import jwt
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app.schemas.auth import TokenPayload
+from tests.backend import PostgrestStub
+
+
+class TestAPIAuth:
+
+    def test_token_decoded_once(
+            self,
+            stub_client: TestClient,
+            token: str,
+            monkeypatch: pytest.MonkeyPatch):
+        calls = []
+        decode = jwt.decode
+        monkeypatch.setattr(jwt, 'decode', lambda *args, **kwargs: calls.append(1) or decode(*args, **kwargs))
+        stats = TokenPayload.cache_stats()
+
+        for _ in range(3):
+            response = stub_client.post(
+                '/api/v1.0/tags/',
+                headers={'Authorization': f'Bearer {token}'},
+                json={'name': 'TestTag'}
+            )
+            assert response.status_code == status.HTTP_201_CREATED
+
+        after = TokenPayload.cache_stats()
+        assert len(calls) == 1
+        assert after['misses'] - stats['misses'] == 1
+        assert after['hits'] - stats['hits'] == 2
+
+    def test_client_uses_bearer_token(
+            self,
+            stub_client: TestClient,
+            backend: PostgrestStub,
+            token: str):
+        response = stub_client.post(
+            '/api/v1.0/tags/',
+            headers={'Authorization': f'Bearer {token}'},
+            json={'name': 'TestTag'}
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        request = backend.table_requests('tags')[-1]
+        assert request.headers['Authorization'] == f'Bearer {token}'
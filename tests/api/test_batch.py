@@ -0,0 +1,106 @@
+import uuid
+import asyncio
+
+import httpx
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.db import Repository
+from app.controller import RecipesController
+from app.utils.loader import BatchLoader
+from tests.backend import PostgrestStub
+
+
+class TestAPIIds:
+
+    @pytest.mark.parametrize('resource', ['tags', 'categories', 'recipes'])
+    def test_ids_filter(self, resource: str, stub_client: TestClient, backend: PostgrestStub):
+        table = 'recipes_full' if resource == 'recipes' else resource
+        ids = [row['id'] for row in backend.tables[table][:3]]
+        response = stub_client.get(f'/api/v1.0/{resource}/?ids={",".join(ids)},{ids[0]}')
+        assert response.status_code == status.HTTP_200_OK
+        assert sorted(item['id'] for item in response.json()['data']) == sorted(ids)
+        assert len(backend.table_requests(table)) == 1
+        assert backend.table_requests(table)[-1].url.params['id'] == f'in.({",".join(ids)})'
+
+    @pytest.mark.parametrize('resource', ['tags', 'categories', 'recipes'])
+    def test_unknown_ids(self, resource: str, stub_client: TestClient):
+        response = stub_client.get(f'/api/v1.0/{resource}/?ids={uuid.uuid4()},{uuid.uuid4()}&count=exact')
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()['data'] == []
+        assert response.json()['count'] == 0
+
+    def test_invalid_ids(self, stub_client: TestClient):
+        response = stub_client.get('/api/v1.0/tags/?ids=1,2')
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+class TestBatchLoader:
+
+    def test_same_tick(self):
+        batches = []
+
+        async def batch(context, keys):
+            batches.append(keys)
+            return {key: key * 2 for key in keys if key != 3}
+
+        async def scenario():
+            loader = BatchLoader(batch, max_batch=4)
+            first = await asyncio.gather(*[loader.load(None, 'scope', key) for key in (1, 2, 3, 2)])
+            second = await asyncio.gather(*[loader.load(None, 'scope', key) for key in range(6)])
+            return first, second
+
+        first, second = asyncio.run(scenario())
+        assert first == [2, 4, None, 4]
+        assert second == [0, 2, 4, None, 8, 10]
+        assert batches == [[1, 2, 3], [0, 1, 2, 3], [4, 5]]
+
+    @pytest.mark.parametrize('started', [False, True])
+    def test_cancelled_batch(self, started: bool):
+        calls = []
+
+        async def batch(context, keys):
+            calls.append(keys)
+            await asyncio.sleep(10)
+
+        async def scenario():
+            loader = BatchLoader(batch)
+            load = asyncio.ensure_future(loader.load(None, 'scope', 1))
+            while not (calls if started else loader._tasks):
+                await asyncio.sleep(0)
+            for task in loader._tasks:
+                task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await asyncio.wait_for(load, 1)
+            await asyncio.sleep(0)
+            return loader
+
+        loader = asyncio.run(scenario())
+        assert not loader._tasks
+
+    def test_concurrent_unique(self):
+        backend = PostgrestStub()
+        ids = [row['id'] for row in backend.tables['recipes_full'][:5]]
+
+        async def scenario():
+            await Repository.init_pool(httpx.MockTransport(backend))
+            batches = RecipesController._loader.batches
+            try:
+                async with httpx.AsyncClient(
+                        transport=httpx.ASGITransport(app),
+                        base_url='http://test') as client:
+                    responses = await asyncio.gather(*[
+                        client.get(f'/api/v1.0/recipes/{model_id}') for model_id in ids
+                    ])
+            finally:
+                await Repository.close_pool()
+            return responses, RecipesController._loader.batches - batches
+
+        responses, batches = asyncio.run(scenario())
+        assert [response.json()['data']['id'] for response in responses] == ids
+        assert batches == 1
+        requests = backend.table_requests('recipes_full')
+        assert len(requests) == 1
+        assert requests[0].url.params['id'].startswith('in.(')
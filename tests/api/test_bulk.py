@@ -0,0 +1,122 @@
+import uuid
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app.core.settings import settings
+from tests.backend import PostgrestStub
+
+
+RESOURCES = ['tags', 'categories']
+
+
+class TestAPIBulk:
+
+    @pytest.mark.parametrize('resource', RESOURCES)
+    def test_unauthenticated(self, resource: str, stub_client: TestClient):
+        response = stub_client.post(f'/api/v1.0/{resource}/bulk', json=[{'name': 'New'}])
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    @pytest.mark.parametrize('resource', RESOURCES)
+    def test_save_many(self, resource: str, stub_client: TestClient, backend: PostgrestStub, token: str):
+        stored = backend.tables[resource][0]['name']
+        total = len(backend.tables[resource])
+        response = stub_client.post(
+            f'/api/v1.0/{resource}/bulk',
+            json=[{'name': 'First'}, {'name': stored}, {'name': 'Second'}, {'name': 'First'}],
+            headers={'Authorization': f'Bearer {token}'})
+        assert response.status_code == status.HTTP_200_OK
+        body = response.json()
+        assert [item['status'] for item in body['data']] == ['created', 'exists', 'created', 'duplicate']
+        assert body['count'] == 2
+        assert body['data'][0]['data']['name'] == 'First'
+        assert len(backend.tables[resource]) == total + 2
+        assert len(backend.table_requests(resource)) == 1
+
+    @pytest.mark.parametrize('resource', RESOURCES)
+    def test_update_many(self, resource: str, stub_client: TestClient, backend: PostgrestStub, token: str):
+        total = len(backend.tables[resource])
+        model_id = backend.tables[resource][0]['id']
+        other_id, taken = backend.tables[resource][1]['id'], backend.tables[resource][2]['name']
+        missing = str(uuid.uuid4())
+        response = stub_client.patch(
+            f'/api/v1.0/{resource}/bulk',
+            json=[
+                {'id': model_id, 'name': 'Renamed'},
+                {'id': missing, 'name': 'Ghost'},
+                {'id': model_id, 'name': 'Again'},
+                {'id': other_id, 'name': taken},
+            ],
+            headers={'Authorization': f'Bearer {token}'})
+        assert response.status_code == status.HTTP_200_OK
+        body = response.json()
+        assert [item['status'] for item in body['data']] == ['updated', 'not_found', 'duplicate', 'conflict']
+        assert body['count'] == 1
+        assert backend.tables[resource][0]['name'] == 'Renamed'
+        assert len(backend.tables[resource]) == total
+        requests = backend.table_requests(resource)
+        assert [request.method for request in requests] == ['PATCH'] * 3
+        assert all('on_conflict' not in request.url.params for request in requests)
+
+    @pytest.mark.parametrize('resource', RESOURCES)
+    def test_update_many_item_error(
+            self, resource: str, stub_client: TestClient, backend: PostgrestStub, token: str, monkeypatch):
+        model_id, denied = backend.tables[resource][0]['id'], backend.tables[resource][1]['id']
+        assert stub_client.get(f'/api/v1.0/{resource}/{model_id}').status_code == status.HTTP_200_OK
+        patch = backend._patch
+
+        def deny(table: str, request):
+            if request.url.params['id'] == f'eq.{denied}':
+                return backend._error(403, '42501', 'permission denied')
+            return patch(table, request)
+
+        monkeypatch.setattr(backend, '_patch', deny)
+        response = stub_client.patch(
+            f'/api/v1.0/{resource}/bulk',
+            json=[{'id': model_id, 'name': 'Renamed'}, {'id': denied, 'name': 'Denied'}],
+            headers={'Authorization': f'Bearer {token}'})
+        assert response.status_code == status.HTTP_200_OK
+        body = response.json()
+        assert [item['status'] for item in body['data']] == ['updated', 'failed']
+        assert body['count'] == 1
+        # The cached resource is not served after the partial update
+        assert stub_client.get(f'/api/v1.0/{resource}/{model_id}').json()['data']['name'] == 'Renamed'
+
+    @pytest.mark.parametrize('resource', RESOURCES)
+    def test_delete_many(self, resource: str, stub_client: TestClient, backend: PostgrestStub, token: str):
+        ids = [row['id'] for row in backend.tables[resource][:2]]
+        missing = str(uuid.uuid4())
+        total = stub_client.get(f'/api/v1.0/{resource}/').json()['count']
+        response = stub_client.delete(
+            f'/api/v1.0/{resource}/bulk',
+            params={'ids': ','.join([ids[0], missing, ids[0], ids[1]])},
+            headers={'Authorization': f'Bearer {token}'})
+        assert response.status_code == status.HTTP_200_OK
+        body = response.json()
+        assert [(item['index'], item['status'], item['id']) for item in body['data']] == [
+            (0, 'deleted', ids[0]),
+            (1, 'not_found', missing),
+            (2, 'duplicate', ids[0]),
+            (3, 'deleted', ids[1]),
+        ]
+        assert body['count'] == 2
+        assert stub_client.get(f'/api/v1.0/{resource}/').json()['count'] == total - 2
+
+    @pytest.mark.parametrize('resource', RESOURCES)
+    def test_max_size(self, resource: str, stub_client: TestClient, token: str, monkeypatch):
+        headers = {'Authorization': f'Bearer {token}'}
+        response = stub_client.post(
+            f'/api/v1.0/{resource}/bulk',
+            json=[{'name': f'Tag {index}'} for index in range(settings.BULK_MAX_SIZE + 1)],
+            headers=headers)
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        response = stub_client.post(f'/api/v1.0/{resource}/bulk', json=[], headers=headers)
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+        monkeypatch.setattr(settings, 'BULK_MAX_SIZE', 2)
+        response = stub_client.delete(
+            f'/api/v1.0/{resource}/bulk',
+            params={'ids': ','.join(str(uuid.uuid4()) for _ in range(3))},
+            headers=headers)
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
@@ -0,0 +1,114 @@
+import gzip
+import threading
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.routing import Route
+from starlette.responses import Response, StreamingResponse
+
+from app.core.middleware import CompressionMiddleware, negotiate
+
+
+class TestCompression:
+
+    @pytest.mark.parametrize('header, expected', [
+        ('gzip, deflate', 'gzip'),
+        ('br;q=1.0, gzip;q=0.5', 'gzip'),
+        ('gzip;q=0', None),
+        ('*', 'zstd'),
+        ('identity', None),
+        ('', None),
+    ])
+    def test_negotiate(self, header: str, expected: str | None):
+        assert negotiate(header, ('zstd', 'gzip')) == expected
+
+    def test_large_list(self, stub_client: TestClient):
+        response = stub_client.get('/api/v1.0/recipes/?fields=*', headers={'Accept-Encoding': 'gzip'})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers['content-encoding'] == 'gzip'
+        assert 'accept-encoding' in response.headers['vary'].lower()
+        assert int(response.headers['content-length']) < len(response.content)
+        assert response.json()['data']
+
+    def test_identity(self, stub_client: TestClient):
+        response = stub_client.get('/api/v1.0/recipes/?fields=*', headers={'Accept-Encoding': 'identity'})
+        assert 'content-encoding' not in response.headers
+        assert int(response.headers['content-length']) == len(response.content)
+
+    def test_small_body(self, stub_client: TestClient, backend):
+        model_id = backend.tables['tags'][0]['id']
+        response = stub_client.get(f'/api/v1.0/tags/{model_id}', headers={'Accept-Encoding': 'gzip'})
+        assert response.status_code == status.HTTP_200_OK
+        assert 'content-encoding' not in response.headers
+
+
+class TestCompressionMiddleware:
+
+    @staticmethod
+    def build(**options) -> tuple[CompressionMiddleware, TestClient]:
+        payload = b'{"name":"' + b'tag ' * 2048 + b'"}'
+
+        async def stream(request):
+            async def chunks():
+                for _ in range(3):
+                    yield payload
+            return StreamingResponse(chunks(), media_type='application/json')
+
+        async def tags(request):
+            return Response(payload, media_type='application/json')
+
+        inner = Starlette(routes=[Route('/stream', stream), Route('/tags', tags)])
+        compression = CompressionMiddleware(inner, **options)
+        return compression, TestClient(compression)
+
+    def test_streaming_untouched(self):
+        _, client = self.build()
+        response = client.get('/stream', headers={'Accept-Encoding': 'gzip'})
+        assert 'content-encoding' not in response.headers
+        assert len(response.content) == 3 * len(b'{"name":"' + b'tag ' * 2048 + b'"}')
+
+    @pytest.mark.parametrize('encoding, module', [('br', 'brotli'), ('zstd', 'zstandard')])
+    def test_optional_encodings(self, encoding: str, module: str):
+        codec = pytest.importorskip(module)
+        _, client = self.build()
+        with client.stream('GET', '/tags', headers={'Accept-Encoding': f'gzip;q=0.5, {encoding}'}) as response:
+            assert response.headers['content-encoding'] == encoding
+            raw = b''.join(response.iter_raw())
+        if encoding == 'br':
+            body = codec.decompress(raw)
+        else:
+            body = codec.ZstdDecompressor().decompress(raw)
+        assert body == b'{"name":"' + b'tag ' * 2048 + b'"}'
+
+    def test_server_preference(self):
+        pytest.importorskip('zstandard')
+        pytest.importorskip('brotli')
+        _, client = self.build()
+        response = client.get('/tags', headers={'Accept-Encoding': 'gzip, br, zstd'})
+        assert response.headers['content-encoding'] == 'zstd'
+
+    def test_precompressed_cache(self):
+        compression, client = self.build()
+        bodies = [
+            client.get('/tags', headers={'Accept-Encoding': 'gzip'}).content
+            for _ in range(3)
+        ]
+        assert bodies[0] == bodies[1] == bodies[2]
+        assert compression.cache.stats()['hits'] == 2
+        assert compression.cache.stats()['size'] == 1
+
+    def test_thread_offload(self, monkeypatch: pytest.MonkeyPatch):
+        calls = []
+        original = gzip.compress
+
+        def compress(*args, **kwargs):
+            calls.append(threading.current_thread().name)
+            return original(*args, **kwargs)
+
+        monkeypatch.setattr(gzip, 'compress', compress)
+        compression, client = self.build(thread_size=1024, cache_size=1)
+        response = client.get('/tags', headers={'Accept-Encoding': 'gzip'})
+        assert response.headers['content-encoding'] == 'gzip'
+        assert calls and calls[0] != 'MainThread'
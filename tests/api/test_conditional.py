@@ -0,0 +1,63 @@
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from tests.backend import PostgrestStub
+
+
+def table_of(resource: str) -> str:
+    return 'recipes_full' if resource == 'recipes' else resource
+
+
+class TestAPIConditional:
+
+    @pytest.mark.parametrize('resource', ['tags', 'categories', 'recipes'])
+    def test_list_not_modified(self, resource: str, stub_client: TestClient):
+        response = stub_client.get(f'/api/v1.0/{resource}/?limit=5')
+        etag = response.headers['etag']
+        assert response.status_code == status.HTTP_200_OK
+        assert etag.startswith('W/"') and 'last-modified' in response.headers
+
+        response = stub_client.get(f'/api/v1.0/{resource}/?limit=5', headers={'If-None-Match': etag})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.content == b''
+        assert response.headers['etag'] == etag
+
+        response = stub_client.get(f'/api/v1.0/{resource}/?limit=6', headers={'If-None-Match': etag})
+        assert response.status_code == status.HTTP_200_OK
+
+    @pytest.mark.parametrize('resource', ['tags', 'categories', 'recipes'])
+    def test_unique_cheap_query(self, resource: str, stub_client: TestClient, backend: PostgrestStub):
+        model_id = backend.tables[table_of(resource)][0]['id']
+        response = stub_client.get(f'/api/v1.0/{resource}/{model_id}')
+        etag, last_modified = response.headers['etag'], response.headers['last-modified']
+        requests = len(backend.requests)
+
+        response = stub_client.get(f'/api/v1.0/{resource}/{model_id}', headers={'If-None-Match': etag})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        response = stub_client.get(
+            f'/api/v1.0/{resource}/{model_id}',
+            headers={'If-Modified-Since': last_modified})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        selects = [request.url.params.get('select') for request in backend.requests[requests:]]
+        assert all(select == 'id,updated_at' for select in selects)
+
+    def test_modified_after_update(self, stub_client: TestClient, backend: PostgrestStub, token: str):
+        model_id = backend.tables['tags'][0]['id']
+        etag = stub_client.get(f'/api/v1.0/tags/{model_id}').headers['etag']
+        stub_client.patch(
+            f'/api/v1.0/tags/{model_id}',
+            json={'name': 'Renamed'},
+            headers={'Authorization': f'Bearer {token}'})
+        response = stub_client.get(f'/api/v1.0/tags/{model_id}', headers={'If-None-Match': etag})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers['etag'] != etag
+        assert response.json()['data']['name'] == 'Renamed'
+
+    def test_old_if_modified_since(self, stub_client: TestClient, backend: PostgrestStub):
+        model_id = backend.tables['recipes_full'][0]['id']
+        response = stub_client.get(
+            f'/api/v1.0/recipes/{model_id}',
+            headers={'If-Modified-Since': 'Mon, 01 Jan 1990 00:00:00 GMT'})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()['data']['id'] == model_id
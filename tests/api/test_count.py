@@ -0,0 +1,36 @@
+import uuid
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from tests.backend import PostgrestStub
+
+
+class TestAPICount:
+
+    @pytest.mark.parametrize('strategy', ['exact', 'planned', 'estimated', 'none'])
+    def test_list_strategy(self, strategy: str, stub_client: TestClient, backend: PostgrestStub):
+        response = stub_client.get(f'/api/v1.0/categories/?count={strategy}')
+        content = response.json()
+        assert response.status_code == status.HTTP_200_OK
+        assert content['count_strategy'] == strategy
+        prefer = backend.table_requests('categories')[-1].headers.get('prefer', '')
+        if strategy == 'none':
+            assert 'count' not in content
+            assert 'count=' not in prefer
+        else:
+            assert content['count'] == len(backend.tables['categories'])
+            assert f'count={strategy}' in prefer
+
+    @pytest.mark.parametrize('resource', ['tags', 'categories', 'recipes'])
+    def test_unique_without_count(self, resource: str, stub_client: TestClient, backend: PostgrestStub):
+        table = 'recipes_full' if resource == 'recipes' else resource
+        model_id = backend.tables[table][0]['id']
+        response = stub_client.get(f'/api/v1.0/{resource}/{model_id}')
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()['data']['id'] == model_id
+        assert 'count=' not in backend.table_requests(table)[-1].headers.get('prefer', '')
+
+        response = stub_client.get(f'/api/v1.0/{resource}/{uuid.uuid4()}')
+        assert response.status_code == status.HTTP_404_NOT_FOUND
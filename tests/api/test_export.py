@@ -0,0 +1,46 @@
+import json
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app.core.settings import settings
+from tests.backend import PostgrestStub
+
+
+class TestAPIRecipeExport:
+
+    @pytest.fixture(autouse=True)
+    def batch_size(self, monkeypatch):
+        monkeypatch.setattr(settings, 'EXPORT_BATCH_SIZE', 3)
+
+    def test_export_catalog(self, stub_client: TestClient, backend: PostgrestStub):
+        with stub_client.stream('GET', '/api/v1.0/recipes/export') as response:
+            assert response.status_code == status.HTTP_200_OK
+            assert response.headers['content-type'] == 'application/x-ndjson'
+            lines = [json.loads(line) for line in response.iter_lines() if line]
+
+        records = sorted(backend.tables['recipes_full'], key=lambda row: (row['created_at'], row['id']))
+        assert [line['id'] for line in lines] == [row['id'] for row in records]
+        assert all('description' in line and 'tags' in line for line in lines)
+
+        requests = backend.table_requests('recipes_full')
+        assert len(requests) == 4
+        assert all('count=' not in request.headers.get('prefer', '') for request in requests)
+        assert all(request.url.params['limit'] == '4' for request in requests)
+
+    def test_export_fields_and_filters(self, stub_client: TestClient, backend: PostgrestStub):
+        category = backend.tables['recipes_full'][0]['category_id']
+        response = stub_client.get(
+            '/api/v1.0/recipes/export',
+            params={'fields': 'title', 'category': category})
+        assert response.status_code == status.HTTP_200_OK
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        expected = [row for row in backend.tables['recipes_full'] if row['category_id'] == category]
+        assert len(lines) == len(expected)
+        assert all(set(line) == {'id', 'title'} for line in lines)
+
+    def test_export_error(self, stub_client: TestClient, backend: PostgrestStub, monkeypatch):
+        monkeypatch.delitem(backend.tables, 'recipes_full')
+        response = stub_client.get('/api/v1.0/recipes/export')
+        assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
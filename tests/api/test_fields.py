@@ -0,0 +1,38 @@
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from tests.backend import PostgrestStub
+
+
+class TestAPIRecipeFields:
+
+    def test_summary_by_default(self, stub_client: TestClient, backend: PostgrestStub):
+        response = stub_client.get('/api/v1.0/recipes/?limit=5')
+        content = response.json()
+        assert response.status_code == status.HTTP_200_OK
+        assert backend.table_requests('recipes_full')[-1].url.params['select'] == \
+            'id,title,image,images,category,created_at,updated_at'
+        for recipe in content['data']:
+            assert set(recipe) <= {'id', 'title', 'image', 'images', 'category'}
+            assert 'instructions' not in recipe
+        assert 'cursor=' in content['next']
+
+    def test_sparse_fields(self, stub_client: TestClient, backend: PostgrestStub):
+        response = stub_client.get('/api/v1.0/recipes/?fields=title,tags&limit=5')
+        assert response.status_code == status.HTTP_200_OK
+        assert backend.table_requests('recipes_full')[-1].url.params['select'] == \
+            'id,title,tags,created_at,updated_at'
+        for recipe in response.json()['data']:
+            assert set(recipe) <= {'id', 'title', 'tags'}
+
+    def test_all_fields(self, stub_client: TestClient, backend: PostgrestStub):
+        response = stub_client.get('/api/v1.0/recipes/?fields=*&limit=5')
+        assert response.status_code == status.HTTP_200_OK
+        assert backend.table_requests('recipes_full')[-1].url.params['select'] == '*'
+        assert all('instructions' in recipe for recipe in response.json()['data'])
+
+    @pytest.mark.parametrize('fields', ['password', 'title,secret', ','])
+    def test_unknown_fields(self, fields: str, stub_client: TestClient):
+        response = stub_client.get(f'/api/v1.0/recipes/?fields={fields}')
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
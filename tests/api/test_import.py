@@ -0,0 +1,139 @@
+import io
+import json
+import itertools
+import uuid
+import asyncio
+
+import httpx
+import pytest
+
+from app.db import Repository
+from app.cli.importer import Importer, read_records
+from tests.backend import PostgrestStub, DATA_FILE
+
+
+def _recipes(total: int) -> list[dict]:
+    records = json.loads(DATA_FILE.read_text())
+    return [
+        {
+            **records[index % len(records)],
+            'id': str(uuid.uuid4()),
+            'ingredients': 'flour, water',
+        }
+        for index in range(total)
+    ]
+
+
+def _import(backend: PostgrestStub, records, **kwargs):
+    async def scenario():
+        await Repository.init_pool(httpx.MockTransport(backend))
+        try:
+            client = Repository.pool.view('service-token')
+            importer = Importer(client, **kwargs)
+            return await importer.run(records)
+        finally:
+            await Repository.close_pool()
+    return asyncio.run(scenario())
+
+
+class TestRecipeImport:
+
+    @pytest.mark.parametrize('shape', ['array', 'ndjson'])
+    def test_read_records(self, shape: str):
+        records = _recipes(25)
+        if shape == 'array':
+            content = json.dumps(records, indent=2).encode()
+        else:
+            content = b'\n'.join(json.dumps(record).encode() for record in records) + b'\n\n'
+        read = list(read_records(io.BytesIO(content)))
+        assert [position for position, _ in read] == list(range(1, 26))
+        assert [
+            record['id'] if isinstance(record, dict) else json.loads(record)['id']
+            for _, record in read
+        ] == [record['id'] for record in records]
+
+    def test_json_array_across_chunks(self, monkeypatch):
+        monkeypatch.setattr('app.cli.importer.CHUNK_SIZE', 64)
+        records = _recipes(5)
+        read = list(read_records(io.BytesIO(json.dumps(records).encode())))
+        assert [record for _, record in read] == records
+
+    @pytest.mark.parametrize('chunk_size', [64, 1 << 20])
+    def test_json_array_invalid_item(self, chunk_size: int, monkeypatch):
+        monkeypatch.setattr('app.cli.importer.CHUNK_SIZE', chunk_size)
+        records = _recipes(5)
+        valid = json.dumps(records[:2]).encode()[:-1]
+        content = '\ufeff'.encode() + valid + b', {"title": "caf\xc3\xa9" x}, ' + json.dumps(records[2:]).encode()[1:]
+        read = read_records(io.BytesIO(content))
+        assert [record for _, record in itertools.islice(read, 2)] == records[:2]
+        with pytest.raises(ValueError, match=f'at byte {content.index(b" x}") + 1}:'):
+            next(read)
+
+    def test_json_array_truncated(self):
+        content = json.dumps(_recipes(2)).encode()
+        with pytest.raises(ValueError, match='at byte'):
+            list(read_records(io.BytesIO(content[:len(content) // 2])))
+
+    def test_import_batches(self, backend: PostgrestStub):
+        total = len(backend.tables['recipes_full'])
+        user_id = str(uuid.uuid4())
+        records = _recipes(95)
+        del records[3]['title']
+        for record in records[:10]:
+            del record['user_id']
+        rejects = io.StringIO()
+        content = b'\n'.join(json.dumps(record).encode() for record in records)
+
+        stats = _import(
+            backend,
+            read_records(io.BytesIO(content)),
+            user_id=user_id,
+            batch_size=10,
+            concurrency=3,
+            rejects=rejects)
+
+        assert (stats.read, stats.imported, stats.invalid, stats.failed) == (95, 94, 1, 0)
+        assert json.loads(rejects.getvalue())['position'] == 4
+        assert len(backend.tables['recipes_full']) == total + 94
+        assert len([request for request in backend.requests if 'insert_recipes' in request.url.path]) == 10
+        stored = {recipe['id']: recipe for recipe in backend.tables['recipes_full']}
+        assert stored[records[0]['id']]['user_id'] == user_id
+        assert stored[records[0]['id']]['tags'] == [tag['id'] for tag in records[0]['tags']]
+        assert stored[records[0]['id']]['category_id'] == records[0]['category']['id']
+
+    def test_retry_failed_batches(self, backend: PostgrestStub):
+        insert = backend.rpcs['insert_recipes']
+        calls = []
+
+        def flaky(stub: PostgrestStub, payload: dict):
+            calls.append(len(payload['recipes_json']))
+            if len(calls) % 2:
+                return httpx.Response(503, json={'code': '57014', 'message': 'canceling statement'})
+            return insert(stub, payload)
+
+        backend.rpcs['insert_recipes'] = flaky
+        records = enumerate(_recipes(20), 1)
+        stats = _import(backend, records, batch_size=10, concurrency=1, backoff=0.001)
+        assert (stats.imported, stats.failed, stats.retries) == (20, 0, 2)
+        assert calls == [10, 10, 10, 10]
+
+        backend.rpcs['insert_recipes'] = lambda stub, payload: httpx.Response(
+            500, json={'code': 'XX000', 'message': 'internal error'})
+        stats = _import(backend, enumerate(_recipes(5), 1), retries=1, backoff=0.001)
+        assert (stats.imported, stats.failed, stats.retries) == (0, 5, 1)
+
+    def test_import_again(self, backend: PostgrestStub):
+        total = len(backend.tables['recipes_full'])
+        user_id = str(uuid.uuid4())
+        records = _recipes(3)
+        for index, record in enumerate(records):
+            del record['id']
+            record['title'] = f'Imported recipe {index}'
+        content = json.dumps(records).encode()
+
+        first = _import(backend, read_records(io.BytesIO(content)), user_id=user_id)
+        again = _import(backend, read_records(io.BytesIO(content)), user_id=user_id)
+        assert (first.imported, first.existing) == (3, 0)
+        assert (again.imported, again.existing) == (0, 3)
+        assert len(backend.tables['recipes_full']) == total + 3
+        assert all(uuid.UUID(recipe['id']).version == 4 for recipe in backend.tables['recipes_full'][total:])
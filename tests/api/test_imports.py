@@ -0,0 +1,21 @@
+import os
+import sys
+import subprocess
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).absolute().parents[2]
+
+
+@pytest.mark.parametrize('module', ['app.db', 'app.controller', 'app.cli.importer', 'app.main'])
+def test_import(module: str):
+    # A fresh interpreter, the modules of the tests are already imported
+    result = subprocess.run(
+        [sys.executable, '-c', f'import {module}'],
+        cwd=ROOT,
+        env=os.environ.copy(),
+        capture_output=True,
+        text=True,
+        timeout=60)
+    assert result.returncode == 0, result.stderr
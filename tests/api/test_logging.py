@@ -0,0 +1,91 @@
+import json
+import logging
+from logging.handlers import QueueHandler
+
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app.logging import LogQueue, JSONFormatter, ContextFilter, SamplingFilter, request_id
+
+
+def _record(level: int = logging.INFO, msg: str = 'Message %s', args=('value', )) -> logging.LogRecord:
+    return logging.LogRecord('tests', level, __file__, 10, msg, args, None, 'test_function')
+
+
+def test_json_formatter():
+    record = _record()
+    token = request_id.set('request-1')
+    try:
+        assert ContextFilter().filter(record)
+    finally:
+        request_id.reset(token)
+    entry = json.loads(JSONFormatter().format(record))
+    assert entry['message'] == 'Message value'
+    assert entry['request_id'] == 'request-1'
+    assert entry['trace_id'] is None
+    assert (entry['level'], entry['logger'], entry['function'], entry['line']) == ('INFO', 'tests', 'test_function', 10)
+
+
+def test_sampling_filter():
+    dropped = SamplingFilter(0.0)
+    assert not dropped.filter(_record(logging.DEBUG))
+    assert dropped.filter(_record(logging.INFO))
+    assert SamplingFilter(1.0).filter(_record(logging.DEBUG))
+
+
+def test_log_queue(tmp_path):
+    path = tmp_path.joinpath('app.log')
+    config = tmp_path.joinpath('logging.json')
+    config.write_text(json.dumps({
+        'version': 1,
+        'disable_existing_loggers': False,
+        'formatters': {'json': {'()': 'app.logging.JSONFormatter'}},
+        'handlers': {'file': {'class': 'logging.FileHandler', 'filename': str(path), 'formatter': 'json'}},
+        'loggers': {'tests.queue': {'level': 'DEBUG', 'handlers': ['file'], 'propagate': False}},
+    }))
+    queued = LogQueue(config)
+    queued.start(debug_sample_ratio=0.0)
+    named = logging.getLogger('tests.queue')
+    try:
+        assert len(named.handlers) == 1
+        assert isinstance(named.handlers[0], QueueHandler)
+        token = request_id.set('request-2')
+        named.debug('Sampled out')
+        named.info('Queued %d', 1)
+        try:
+            raise ValueError('failure')
+        except ValueError:
+            named.exception('With exception')
+        request_id.reset(token)
+    finally:
+        queued.stop()
+
+    assert isinstance(named.handlers[0], logging.FileHandler)
+    named.handlers[0].close()
+    entries = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [entry['message'] for entry in entries] == ['Queued 1', 'With exception']
+    assert {entry['request_id'] for entry in entries} == {'request-2'}
+    assert 'ValueError: failure' in entries[1]['exception']
+
+
+def test_server_loggers():
+    queued = LogQueue()
+    queued.start(debug_sample_ratio=0.5, level='DEBUG')
+    try:
+        for name in ('uvicorn', 'uvicorn.error', 'uvicorn.access', 'fastapi', 'httpx'):
+            named = logging.getLogger(name)
+            assert len(named.handlers) == 1
+            assert isinstance(named.handlers[0], QueueHandler)
+            assert named.isEnabledFor(logging.DEBUG)
+    finally:
+        queued.stop()
+    assert not isinstance(logging.getLogger('uvicorn.access').handlers[0], QueueHandler)
+
+
+def test_request_id(stub_client: TestClient):
+    response = stub_client.get('/api/v1.0/tags/', headers={'X-Request-ID': 'client-id.1'})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers['x-request-id'] == 'client-id.1'
+
+    response = stub_client.get('/api/v1.0/tags/', headers={'X-Request-ID': 'invalid id'})
+    assert len(response.headers['x-request-id']) == 32
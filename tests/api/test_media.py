@@ -0,0 +1,163 @@
+import os
+import asyncio
+import hashlib
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.core.middleware import CompressionMiddleware
+from app.storage import LocalStorage, MediaFiles
+from app.storage.serving import parse_range
+
+CONTENT = os.urandom(10_000)
+DIGEST = hashlib.sha256(CONTENT).hexdigest()
+KEY = f'images/{DIGEST[:2]}/{DIGEST}.png'
+
+
+@pytest.fixture(name='media')
+def media_storage(tmp_path, monkeypatch) -> LocalStorage:
+    storage = LocalStorage(tmp_path, 'http://testserver/media')
+    path = storage.path(KEY)
+    path.parent.mkdir(parents=True)
+    path.write_bytes(CONTENT)
+    mount = next(route for route in app.routes if getattr(route, 'name', None) == 'media')
+    monkeypatch.setattr(mount.app, 'storage', storage)
+    return storage
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('bytes=0-99', (0, 99)),
+    ('bytes=9900-', (9900, 9999)),
+    ('bytes=-100', (9900, 9999)),
+    ('bytes=9990-20000', (9990, 9999)),
+    ('bytes=-20000', (0, 9999)),
+    ('bytes=0-1,5-6', None),
+    ('items=0-1', None),
+])
+def test_parse_range(value: str, expected):
+    assert parse_range(value, 10_000) == expected
+
+
+@pytest.mark.parametrize('value', ['bytes=10000-', 'bytes=5-4', 'bytes=-0'])
+def test_unsatisfiable_range(value: str):
+    with pytest.raises(ValueError):
+        parse_range(value, 10_000)
+
+
+class TestMediaFiles:
+
+    def test_get(self, stub_client: TestClient, media: LocalStorage):
+        response = stub_client.get(f'/media/{KEY}', headers={'Accept-Encoding': 'gzip'})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.content == CONTENT
+        assert response.headers['content-type'] == 'image/png'
+        assert response.headers['content-length'] == str(len(CONTENT))
+        assert response.headers['cache-control'] == 'public, max-age=31536000, immutable'
+        assert response.headers['accept-ranges'] == 'bytes'
+        assert 'content-encoding' not in response.headers
+
+        response = stub_client.head(f'/media/{KEY}')
+        assert response.status_code == status.HTTP_200_OK
+        assert response.content == b''
+        assert response.headers['content-length'] == str(len(CONTENT))
+
+    @pytest.mark.parametrize('path', [
+        'images/missing.png',
+        '.staging/upload',
+        '../outside.png',
+        'images',
+        '',
+    ])
+    def test_not_found(self, stub_client: TestClient, media: LocalStorage, path: str):
+        media.staging.mkdir(exist_ok=True)
+        media.staging.joinpath('upload').write_bytes(CONTENT)
+        response = stub_client.get(f'/media/{path}')
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_method_not_allowed(self, stub_client: TestClient, media: LocalStorage):
+        response = stub_client.delete(f'/media/{KEY}')
+        assert response.status_code == status.HTTP_405_METHOD_NOT_ALLOWED
+        assert response.headers['allow'] == 'GET, HEAD'
+
+    def test_range(self, stub_client: TestClient, media: LocalStorage):
+        response = stub_client.get(f'/media/{KEY}', headers={'Range': 'bytes=100-199'})
+        assert response.status_code == status.HTTP_206_PARTIAL_CONTENT
+        assert response.content == CONTENT[100:200]
+        assert response.headers['content-range'] == f'bytes 100-199/{len(CONTENT)}'
+        assert response.headers['content-length'] == '100'
+
+        response = stub_client.get(f'/media/{KEY}', headers={'Range': 'bytes=20000-'})
+        assert response.status_code == status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE
+        assert response.headers['content-range'] == f'bytes */{len(CONTENT)}'
+
+    def test_if_range(self, stub_client: TestClient, media: LocalStorage):
+        etag = stub_client.head(f'/media/{KEY}').headers['etag']
+        response = stub_client.get(f'/media/{KEY}', headers={'Range': 'bytes=-10', 'If-Range': etag})
+        assert response.status_code == status.HTTP_206_PARTIAL_CONTENT
+        assert response.content == CONTENT[-10:]
+
+        response = stub_client.get(f'/media/{KEY}', headers={'Range': 'bytes=-10', 'If-Range': '"other"'})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.content == CONTENT
+
+    def test_conditional(self, stub_client: TestClient, media: LocalStorage):
+        headers = stub_client.head(f'/media/{KEY}').headers
+        for condition in (
+                {'If-None-Match': f'"other", {headers["etag"]}'},
+                {'If-None-Match': '*'},
+                {'If-Modified-Since': headers['last-modified']}):
+            response = stub_client.get(f'/media/{KEY}', headers=condition)
+            assert response.status_code == status.HTTP_304_NOT_MODIFIED
+            assert response.content == b''
+            assert response.headers['etag'] == headers['etag']
+
+        response = stub_client.get(f'/media/{KEY}', headers={'If-None-Match': '"other"'})
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_mutable_keys(self, stub_client: TestClient, media: LocalStorage):
+        media.root.joinpath('logo.png').write_bytes(CONTENT)
+        response = stub_client.get('/media/logo.png')
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers['cache-control'] == 'no-cache'
+
+    @pytest.mark.parametrize('extension, whole', [
+        ('http.response.pathsend', True),
+        ('http.response.zerocopysend', True),
+        ('http.response.zerocopysend', False),
+    ])
+    def test_zero_copy(self, media: LocalStorage, extension: str, whole: bool):
+        messages = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': b''}
+
+        async def send(message):
+            if message['type'] == 'http.response.zerocopysend':
+                message = {**message, 'file': message['file'].fileno() >= 0}
+            messages.append(message)
+
+        headers = [(b'accept-encoding', b'gzip')]
+        if not whole:
+            headers.append((b'range', b'bytes=10-19'))
+        scope = {
+            'type': 'http',
+            'method': 'GET',
+            'path': f'/media/{KEY}',
+            'root_path': '/media',
+            'headers': headers,
+            'extensions': {extension: {}},
+        }
+        # The held start of the compression is sent before the file
+        asyncio.run(CompressionMiddleware(MediaFiles(media))(scope, receive, send))
+        assert [message['type'] for message in messages] == ['http.response.start', extension]
+        if extension == 'http.response.pathsend':
+            assert messages[1]['path'] == str(media.path(KEY))
+        else:
+            assert messages[1] == {
+                'type': extension,
+                'file': True,
+                'offset': 0 if whole else 10,
+                'count': len(CONTENT) if whole else 10,
+            }
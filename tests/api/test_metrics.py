@@ -0,0 +1,95 @@
+import re
+
+import httpx
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app.utils.metrics import Registry, Counter, Gauge, Histogram
+from tests.backend import PostgrestStub
+
+
+def _samples(text: str) -> dict[str, float]:
+    return {
+        line.rsplit(' ', 1)[0]: float(line.rsplit(' ', 1)[1])
+        for line in text.splitlines()
+        if line and not line.startswith('#')
+    }
+
+
+def test_exposition_format():
+    registry = Registry()
+    requests = registry.register(Counter('requests', 'Requests "served"', ('path', )))
+    in_flight = registry.register(Gauge('in_flight', 'Requests\nbeing served'))
+    latency = registry.register(Histogram('latency_seconds', 'Latency', ('path', ), buckets=(0.1, 1)))
+    registry.register(Gauge('computed', 'Values of a function', ('name', ), lambda: {('b', ): 2, ('a', ): 1.5}))
+
+    requests.labels('/a"b').inc()
+    requests.labels('/a"b').inc(2)
+    in_flight.labels().inc()
+    for value in (0.05, 0.1, 0.5, 3):
+        latency.labels('/').observe(value)
+
+    assert registry.render().decode().splitlines() == [
+        '# HELP requests Requests \\"served\\"',
+        '# TYPE requests counter',
+        'requests_total{path="/a\\"b"} 3',
+        '# HELP in_flight Requests\\nbeing served',
+        '# TYPE in_flight gauge',
+        'in_flight 1',
+        '# HELP latency_seconds Latency',
+        '# TYPE latency_seconds histogram',
+        'latency_seconds_bucket{path="/",le="0.1"} 2',
+        'latency_seconds_bucket{path="/",le="1"} 3',
+        'latency_seconds_bucket{path="/",le="+Inf"} 4',
+        'latency_seconds_sum{path="/"} 3.65',
+        'latency_seconds_count{path="/"} 4',
+        '# HELP computed Values of a function',
+        '# TYPE computed gauge',
+        'computed{name="a"} 1.5',
+        'computed{name="b"} 2',
+    ]
+
+
+class TestMetrics:
+
+    def _metrics(self, client: TestClient) -> dict[str, float]:
+        response = client.get('/metrics')
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers['content-type'] == 'text/plain; version=0.0.4; charset=utf-8'
+        return _samples(response.text)
+
+    def test_requests_and_controllers(self, stub_client: TestClient, backend: PostgrestStub):
+        before = self._metrics(stub_client)
+        recipe_id = backend.tables['recipes_full'][0]['id']
+        assert stub_client.get('/api/v1.0/tags/').status_code == status.HTTP_200_OK
+        assert stub_client.get(f'/api/v1.0/recipes/{recipe_id}').status_code == status.HTTP_200_OK
+        after = self._metrics(stub_client)
+
+        def delta(sample: str) -> float:
+            return after.get(sample, 0) - before.get(sample, 0)
+
+        assert delta('http_request_duration_seconds_count{method="GET",route="/api/v1.0/tags/",status="200"}') == 1
+        # The ids of the paths are not part of the labels
+        assert delta(
+            'http_request_duration_seconds_count{method="GET",route="/api/v1.0/recipes/{model_id:uuid}",status="200"}'
+        ) == 1
+        assert not any(recipe_id in sample for sample in after)
+        assert delta('controller_call_duration_seconds_count{table="tags",method="select"}') == 1
+        assert delta('controller_call_duration_seconds_count{table="recipes",method="unique"}') == 1
+        assert after['http_requests_in_flight'] == 1
+        assert after['supabase_clients{state="views"}'] >= 0
+        assert 'cache_hits_total{cache="tags"}' in after
+        assert 'image_processing_pending' in after
+
+    def test_controller_errors(self, stub_client: TestClient, backend: PostgrestStub):
+        sample = 'controller_errors_total{controller="RecipesController",error="APIError"}'
+        before = self._metrics(stub_client).get(sample, 0)
+        backend.rpcs['search_recipes'] = lambda stub, payload: httpx.Response(
+            500, json={'code': 'XX000', 'message': 'internal error', 'details': None, 'hint': None})
+        response = stub_client.get('/api/v1.0/recipes/?q=luctus')
+        assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+        after = self._metrics(stub_client)
+        assert after[sample] - before == 1
+        assert any(
+            re.match(r'http_request_duration_seconds_count\{method="GET",route="/api/v1.0/recipes/",status="500"\}', name)
+            for name in after)
@@ -0,0 +1,68 @@
+import json
+import uuid
+import base64
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from tests.backend import PostgrestStub
+
+
+class TestAPIPagination:
+
+    @pytest.mark.parametrize('resource', ['tags', 'categories', 'recipes'])
+    def test_cursor_walk(self, resource: str, stub_client: TestClient, backend: PostgrestStub):
+        table = 'recipes_full' if resource == 'recipes' else resource
+        expected = [
+            row['id'] for row in sorted(
+                backend.tables[table],
+                key=lambda row: (row['created_at'], row['id']))
+        ]
+        seen = []
+        url = f'/api/v1.0/{resource}/?limit=3'
+        while url:
+            response = stub_client.get(url)
+            content = response.json()
+            assert response.status_code == status.HTTP_200_OK
+            assert len(content['data']) <= 3
+            seen.extend(item['id'] for item in content['data'])
+            url = content.get('next')
+        assert seen == expected
+
+    def test_offset_mode(self, stub_client: TestClient):
+        first = stub_client.get('/api/v1.0/tags/?limit=4').json()
+        second = stub_client.get('/api/v1.0/tags/?limit=4&page=2').json()
+        skipped = stub_client.get('/api/v1.0/tags/?limit=4&skip=2').json()
+        assert len(first['data']) == len(second['data']) == 4
+        assert [item['id'] for item in skipped['data']] == \
+            [item['id'] for item in first['data'][2:] + second['data'][:2]]
+        assert 'page' not in first['next'] and 'cursor=' in first['next']
+
+    @staticmethod
+    def _cursor(keyset) -> str:
+        return base64.urlsafe_b64encode(json.dumps(keyset).encode()).decode().rstrip('=')
+
+    @pytest.mark.parametrize('keyset', [
+        None,
+        ['x', 'y'],
+        {'created_at': 1, 'id': 2},
+        ['2024-01-01T00:00:00+00:00', 'x),id.gt.(0'],
+        ['2024-01-01T00:00:00"),or(id', str(uuid.uuid4())],
+        ['2024-01-01T00:00:00+00:00', str(uuid.uuid4()), 'extra'],
+        [20240101, str(uuid.uuid4())],
+    ])
+    def test_invalid_cursor(self, keyset, stub_client: TestClient, backend: PostgrestStub):
+        cursor = 'not-a-cursor' if keyset is None else self._cursor(keyset)
+        response = stub_client.get(f'/api/v1.0/tags/?cursor={cursor}')
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert backend.table_requests('tags') == []
+
+    def test_normalized_cursor(self, stub_client: TestClient, backend: PostgrestStub):
+        model_id = uuid.uuid4()
+        cursor = self._cursor(['2024-01-01 10:00:00.5+02:00', str(model_id).upper()])
+        response = stub_client.get(f'/api/v1.0/tags/?cursor={cursor}')
+        assert response.status_code == status.HTTP_200_OK
+        created_at = '2024-01-01T10:00:00.500000+02:00'
+        assert backend.table_requests('tags')[-1].url.params['or'] == \
+            f'(created_at.gt."{created_at}",and(created_at.eq."{created_at}",id.gt.{model_id}))'
@@ -0,0 +1,159 @@
+import time
+import socket
+import asyncio
+import threading
+
+import httpx
+import uvicorn
+import pytest
+from fastapi import status
+
+from app.main import app
+from app.db import Repository, ClientPool
+from app.core.settings import settings
+from tests.backend import PostgrestStub
+
+
+@pytest.fixture(scope='module')
+def stub_server():
+    """Serve the PostgREST stand-in over a real local socket"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(
+        uvicorn.Config(
+            PostgrestStub().asgi,
+            port=port,
+            lifespan='off',
+            log_level='error',
+            interface='asgi3'))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    yield f'http://127.0.0.1:{port}'
+    server.should_exit = True
+    thread.join()
+
+
+class TestAnonymousPool:
+
+    requests = 500
+    concurrency = 50
+
+    def test_anonymous_connections_flat(self, stub_server: str):
+        async def scenario():
+            Repository.pool = ClientPool(
+                stub_server,
+                settings.ANON_KEY.get_secret_value(),
+                limits=httpx.Limits(
+                    max_connections=settings.POOL_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.POOL_MAX_KEEPALIVE),
+                timeout=httpx.Timeout(settings.POOL_TIMEOUT))
+            connections = Repository.pool._transport._pool.connections
+            anonymous = await Repository.get_client()
+            opened = []
+            try:
+                async with httpx.AsyncClient(
+                        transport=httpx.ASGITransport(app),
+                        base_url='http://test') as client:
+                    for batch in range(TestAnonymousPool.requests // TestAnonymousPool.concurrency):
+                        responses = await asyncio.gather(*[
+                            client.get('/api/v1.0/recipes/')
+                            for _ in range(TestAnonymousPool.concurrency)
+                        ])
+                        assert all(
+                            response.status_code == status.HTTP_200_OK
+                            for response in responses)
+                        opened.append(len(connections))
+                assert await Repository.get_client() is anonymous
+            finally:
+                await Repository.close_pool()
+            return opened
+
+        opened = asyncio.run(scenario())
+        assert max(opened) <= TestAnonymousPool.concurrency
+        assert opened[-1] <= max(opened[:len(opened) // 10])
+
+    def test_authenticated_views_cached_until_exp(self):
+        pool = ClientPool(
+            'http://127.0.0.1',
+            settings.ANON_KEY.get_secret_value(),
+            limits=httpx.Limits(),
+            timeout=httpx.Timeout(settings.POOL_TIMEOUT),
+            max_views=2)
+        expires_at = time.time() + 60
+        view = pool.view('token-a', expires_at)
+        assert pool.view('token-a', expires_at) is view
+        assert pool.view('token-b', expires_at) is not view
+        assert pool.view('token-expired', time.time() - 1) is not pool.view('token-expired', time.time() - 1)
+        pool.view('token-c', expires_at)
+        assert pool.view('token-a', expires_at) is not view
+        assert len(pool.views) == 2
+        asyncio.run(pool.aclose())
+        assert len(pool.views) == 0
+
+
+class TestClientView:
+
+    @staticmethod
+    def build() -> tuple[ClientPool, list[httpx.Request]]:
+        sent: list[httpx.Request] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            sent.append(request)
+            return httpx.Response(200, json=[])
+
+        pool = ClientPool(
+            'http://127.0.0.1',
+            'anon-key',
+            limits=httpx.Limits(),
+            timeout=httpx.Timeout(settings.POOL_TIMEOUT),
+            transport=httpx.MockTransport(handler))
+        return pool, sent
+
+    def test_scoped_authorization(self):
+        pool, sent = self.build()
+
+        async def scenario():
+            first, second = pool.view('token-a'), pool.view('token-b')
+            await asyncio.gather(
+                first.table('tags').select('*').execute(),
+                second.table('tags').select('*').execute(),
+                pool.anonymous.table('tags').select('*').execute())
+            await pool.aclose()
+
+        asyncio.run(scenario())
+        assert sorted(request.headers['authorization'] for request in sent) == \
+            ['Bearer anon-key', 'Bearer token-a', 'Bearer token-b']
+        assert {request.headers['apikey'] for request in sent} == {'anon-key'}
+
+    def test_shared_session_read_only(self):
+        pool, sent = self.build()
+        view = pool.view('token-a')
+        with pytest.raises(TypeError):
+            view.postgrest.auth('token-b')
+        with pytest.raises(TypeError):
+            view.postgrest.session.headers['x-leak'] = 'leak'
+        with pytest.raises(AttributeError):
+            view.postgrest.session.auth = ('user', 'password')
+        with pytest.raises(AttributeError):
+            view.postgrest.session.cookies
+        assert view.postgrest.session.headers['authorization'] == 'Bearer token-a'
+
+        asyncio.run(pool.anonymous.table('tags').select('*').execute())
+        assert sent[-1].headers['authorization'] == 'Bearer anon-key'
+        assert 'x-leak' not in sent[-1].headers
+        assert pool.postgrest.session.headers['authorization'] == 'Bearer anon-key'
+        asyncio.run(pool.aclose())
+
+    def test_storage_view(self):
+        pool, sent = self.build()
+
+        async def scenario():
+            await pool.view('token-a').storage.from_('images').list()
+            await pool.aclose()
+
+        asyncio.run(scenario())
+        assert sent[-1].url.path.startswith('/storage/v1/')
+        assert sent[-1].headers['authorization'] == 'Bearer token-a'
@@ -0,0 +1,46 @@
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app.controller import TagsController, CategoriesController
+from tests.backend import PostgrestStub
+
+
+class TestAPIReferenceCache:
+
+    @pytest.mark.parametrize('resource', ['tags', 'categories'])
+    def test_read_through(self, resource: str, stub_client: TestClient, backend: PostgrestStub):
+        controller = TagsController if resource == 'tags' else CategoriesController
+        hits = controller.cache_stats()['hits']
+        model_id = backend.tables[resource][0]['id']
+        for _ in range(3):
+            assert stub_client.get(f'/api/v1.0/{resource}/?limit=5').status_code == status.HTTP_200_OK
+            assert stub_client.get(f'/api/v1.0/{resource}/{model_id}').status_code == status.HTTP_200_OK
+        assert len(backend.table_requests(resource)) == 2
+        assert controller.cache_stats()['hits'] - hits == 4
+
+        stub_client.get(f'/api/v1.0/{resource}/?limit=6')
+        assert len(backend.table_requests(resource)) == 3
+
+    @pytest.mark.parametrize('resource', ['tags', 'categories'])
+    def test_invalidation(
+            self,
+            resource: str,
+            stub_client: TestClient,
+            backend: PostgrestStub,
+            token: str):
+        headers = {'Authorization': f'Bearer {token}'}
+        model_id = backend.tables[resource][0]['id']
+        before = stub_client.get(f'/api/v1.0/{resource}/{model_id}').json()['data']
+
+        response = stub_client.patch(
+            f'/api/v1.0/{resource}/{model_id}',
+            json={'name': 'Renamed'},
+            headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        after = stub_client.get(f'/api/v1.0/{resource}/{model_id}').json()['data']
+        assert before['name'] != after['name'] == 'Renamed'
+
+        total = stub_client.get(f'/api/v1.0/{resource}/').json()['count']
+        stub_client.delete(f'/api/v1.0/{resource}/{model_id}', headers=headers)
+        assert stub_client.get(f'/api/v1.0/{resource}/').json()['count'] == total - 1
@@ -0,0 +1,59 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from pydantic import AnyHttpUrl
+
+from app.utils.responses import CoreJSONResponse
+from tests.backend import PostgrestStub
+
+MISSING_ID = uuid.uuid4()
+
+
+class TestCoreJSONResponse:
+
+    def test_native_types(self):
+        content = {
+            'id': uuid.uuid4(),
+            'created_at': datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone(timedelta(hours=-5))),
+            'image': AnyHttpUrl('http://dummyimage.com/217x100.png/5fa2dd/ffffff'),
+            'title': 'Ñandú asado',
+        }
+        assert CoreJSONResponse(content).body == JSONResponse(jsonable_encoder(content)).body
+
+    @pytest.mark.parametrize('url', [
+        '/api/v1.0/tags/?limit=0',
+        f'/api/v1.0/tags/{MISSING_ID}',
+        '/api/v1.0/recipes/?fields=secret',
+    ])
+    def test_errors_output(self, url: str, stub_client: TestClient):
+        response = stub_client.get(url)
+        assert response.status_code in (
+            status.HTTP_404_NOT_FOUND,
+            status.HTTP_422_UNPROCESSABLE_ENTITY)
+        assert response.headers['content-type'] == 'application/json'
+        assert response.content == JSONResponse(response.json()).body
+
+    def test_not_found_envelope(self, stub_client: TestClient):
+        response = stub_client.get(f'/api/v1.0/tags/{MISSING_ID}')
+        assert response.json() == {
+            'detail': {
+                'status': status.HTTP_404_NOT_FOUND,
+                'message': f'Resource with id: {MISSING_ID}. Not found',
+                'resource_type': 'Server error',
+                'path': f'/api/v1.0/tags/{MISSING_ID}',
+            }
+        }
+
+    def test_default_class(self, stub_client: TestClient, backend: PostgrestStub, token: str):
+        response = stub_client.post(
+            '/api/v1.0/tags/',
+            json={'name': 'Fresh'},
+            headers={'Authorization': f'Bearer {token}'})
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.content == JSONResponse(response.json()).body
+        assert response.json()['data']['name'] == 'Fresh'
@@ -0,0 +1,63 @@
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from tests.backend import PostgrestStub
+
+
+class TestAPIRecipeSearch:
+
+    def test_ranked_search(self, stub_client: TestClient, backend: PostgrestStub):
+        response = stub_client.get('/api/v1.0/recipes/?q=luctus&fields=title,description')
+        content = response.json()
+        assert response.status_code == status.HTTP_200_OK
+        request = backend.requests[-1]
+        assert request.url.path.endswith('/rpc/search_recipes')
+        assert request.url.params['order'] == 'rank.desc,created_at.asc,id.asc'
+        expected = {
+            recipe['id'] for recipe in backend.tables['recipes_full']
+            if 'luctus' in f'{recipe["title"]} {recipe["description"]}'.split()
+        }
+        assert {recipe['id'] for recipe in content['data']} == expected
+        assert content['count'] == len(expected)
+        first = content['data'][0]
+        assert 'luctus' in first['title'].split()
+
+    def test_search_pages(self, stub_client: TestClient):
+        first = stub_client.get('/api/v1.0/recipes/?q=luctus&limit=1').json()
+        assert 'page=2' in first['next'] and 'cursor=' not in first['next']
+        second = stub_client.get(first['next']).json()
+        assert second['data'][0]['id'] != first['data'][0]['id']
+
+    def test_no_match(self, stub_client: TestClient):
+        response = stub_client.get('/api/v1.0/recipes/?q=zzzzqqq')
+        content = response.json()
+        assert response.status_code == status.HTTP_200_OK
+        assert content['data'] == []
+        assert content['count'] == 0
+        assert 'next' not in content
+
+    def test_search_cursor(self, stub_client: TestClient, backend: PostgrestStub):
+        cursor = stub_client.get('/api/v1.0/recipes/?limit=1').json()['next'].split('cursor=')[1]
+        requests = len(backend.requests)
+        response = stub_client.get(f'/api/v1.0/recipes/?q=luctus&limit=1&cursor={cursor}')
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert len(backend.requests) == requests
+
+    def test_prefix_fallback(self, stub_client: TestClient, backend: PostgrestStub):
+        title = backend.tables['recipes_full'][0]['title']
+        response = stub_client.get(f'/api/v1.0/recipes/?q={title[:2]}')
+        assert response.status_code == status.HTTP_200_OK
+        assert backend.tables['recipes_full'][0]['id'] in \
+            {recipe['id'] for recipe in response.json()['data']}
+
+    def test_title_ilike(self, stub_client: TestClient, backend: PostgrestStub):
+        title = backend.tables['recipes_full'][0]['title']
+        response = stub_client.get(f'/api/v1.0/recipes/?title={title[5:20].upper()}')
+        assert response.status_code == status.HTTP_200_OK
+        assert backend.table_requests('recipes_full')[-1].url.params['title'].startswith('ilike.')
+
+    @pytest.mark.parametrize('q', ['', '   ', 'x' * 201])
+    def test_invalid_search(self, q: str, stub_client: TestClient):
+        response = stub_client.get(f'/api/v1.0/recipes/?q={q}')
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
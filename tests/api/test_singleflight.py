@@ -0,0 +1,81 @@
+import asyncio
+
+import httpx
+from fastapi import status
+
+from app.main import app
+from app.db import Repository
+from app.controller.base import flights
+from app.utils.singleflight import SingleFlight
+from tests.backend import PostgrestStub
+
+
+class TestSingleFlight:
+
+    def test_leader_cancelled(self):
+        async def scenario():
+            flight = SingleFlight()
+            release = asyncio.Event()
+            calls = []
+
+            async def call():
+                calls.append(1)
+                await release.wait()
+                return 'row'
+
+            leader = asyncio.create_task(flight.do('key', call, 'test'))
+            await asyncio.sleep(0)
+            follower = asyncio.create_task(flight.do('key', call, 'test'))
+            await asyncio.sleep(0)
+            leader.cancel()
+            release.set()
+            assert await follower == 'row'
+            assert leader.cancelled()
+            assert len(calls) == 1 and len(flight) == 0
+            return flight.stats()
+
+        stats = asyncio.run(scenario())
+        assert stats['executed'] == 1 and stats['collapsed'] == 1
+
+    def test_errors_shared(self):
+        async def scenario():
+            flight = SingleFlight()
+
+            async def call():
+                await asyncio.sleep(0.01)
+                raise RuntimeError('backend down')
+
+            return await asyncio.gather(
+                *[flight.do('key', call) for _ in range(5)],
+                return_exceptions=True)
+
+        results = asyncio.run(scenario())
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+    def test_concurrent_unique(self):
+        backend = PostgrestStub()
+        model_id = backend.tables['recipes_full'][0]['id']
+
+        async def slow(request: httpx.Request) -> httpx.Response:
+            await asyncio.sleep(0.05)
+            return backend(request)
+
+        async def scenario():
+            await Repository.init_pool(httpx.MockTransport(slow))
+            before = flights.collapsed['RecipesController.unique']
+            try:
+                async with httpx.AsyncClient(
+                        transport=httpx.ASGITransport(app),
+                        base_url='http://test') as client:
+                    responses = await asyncio.gather(*[
+                        client.get(f'/api/v1.0/recipes/{model_id}')
+                        for _ in range(50)
+                    ])
+            finally:
+                await Repository.close_pool()
+            return responses, flights.collapsed['RecipesController.unique'] - before
+
+        responses, collapsed = asyncio.run(scenario())
+        assert all(response.status_code == status.HTTP_200_OK for response in responses)
+        assert len(backend.table_requests('recipes_full')) == 1
+        assert collapsed == 49
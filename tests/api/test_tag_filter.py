@@ -0,0 +1,60 @@
+import uuid
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from tests.backend import PostgrestStub
+
+
+class TestAPIRecipeTagFilter:
+
+    @staticmethod
+    def tag_pair(backend: PostgrestStub) -> tuple[str, str]:
+        recipe = next(
+            recipe for recipe in backend.tables['recipes_full']
+            if len(recipe['tag_ids']) > 1)
+        return recipe['tag_ids'][0], recipe['tag_ids'][1]
+
+    @staticmethod
+    def ids(response) -> set[str]:
+        return {recipe['id'] for recipe in response.json().get('data', [])}
+
+    @pytest.mark.parametrize('match', ['any', 'all'])
+    def test_tag_filter(self, match: str, stub_client: TestClient, backend: PostgrestStub):
+        first, second = self.tag_pair(backend)
+        response = stub_client.get(
+            f'/api/v1.0/recipes/?tag={first},{second}&tag_match={match}&limit=100')
+        assert response.status_code == status.HTTP_200_OK
+        check = all if match == 'all' else any
+        expected = {
+            recipe['id'] for recipe in backend.tables['recipes_full']
+            if check(tag in recipe['tag_ids'] for tag in (first, second))
+        }
+        assert self.ids(response) == expected
+        operator = 'cs' if match == 'all' else 'ov'
+        assert backend.table_requests('recipes_full')[-1].url.params['tag_ids'] == \
+            f'{operator}.{{{first},{second}}}'
+
+    def test_single_tag(self, stub_client: TestClient, backend: PostgrestStub):
+        first, _ = self.tag_pair(backend)
+        response = stub_client.get(f'/api/v1.0/recipes/?tag={first}&limit=100')
+        assert response.status_code == status.HTTP_200_OK
+        assert self.ids(response) == {
+            recipe['id'] for recipe in backend.tables['recipes_full']
+            if first in recipe['tag_ids']
+        }
+
+    @pytest.mark.parametrize('tag', ['not-a-uuid', ',', f'{uuid.uuid4()},1'])
+    def test_invalid_tag(self, tag: str, stub_client: TestClient):
+        response = stub_client.get(f'/api/v1.0/recipes/?tag={tag}')
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    @pytest.mark.parametrize('match', ['any', 'all'])
+    def test_no_match(self, match: str, stub_client: TestClient):
+        response = stub_client.get(f'/api/v1.0/recipes/?tag={uuid.uuid4()}&tag_match={match}&count=exact')
+        content = response.json()
+        assert response.status_code == status.HTTP_200_OK
+        assert content['data'] == []
+        assert content['count'] == 0
+        assert 'next' not in content
@@ -0,0 +1,116 @@
+import json
+import asyncio
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app.utils.tracing import tracer, Tracer, Exporter, FileExporter, parse_traceparent
+from tests.backend import PostgrestStub
+
+TRACE_ID = '4bf92f3577b34da6a3ce929d0e0e4736'
+PARENT_ID = '00f067aa0ba902b7'
+
+
+class MemoryExporter(Exporter):
+
+    def __init__(self) -> None:
+        self.spans: list[dict] = []
+
+    async def export(self, spans: list[dict]) -> None:
+        self.spans.extend(spans)
+
+
+@pytest.fixture(name='exported')
+def memory_exporter(stub_client: TestClient):
+    memory = MemoryExporter()
+    tracer.configure(memory)
+    yield memory
+    tracer.configure(None)
+
+
+def _spans(client: TestClient, memory: MemoryExporter) -> dict[str, dict]:
+    client.portal.call(tracer.flush)
+    return {span['name']: span for span in memory.spans}
+
+
+@pytest.mark.parametrize('value, expected', [
+    (f'00-{TRACE_ID}-{PARENT_ID}-01', (TRACE_ID, PARENT_ID, True)),
+    (f'00-{TRACE_ID.upper()}-{PARENT_ID}-00', (TRACE_ID, PARENT_ID, False)),
+    (f'01-{TRACE_ID}-{PARENT_ID}-01-future', (TRACE_ID, PARENT_ID, True)),
+    (f'ff-{TRACE_ID}-{PARENT_ID}-01', None),
+    (f'00-{"0" * 32}-{PARENT_ID}-01', None),
+    (f'00-{TRACE_ID}-{PARENT_ID[:8]}-01', None),
+    ('00-trace-span-01', None),
+    (None, None),
+])
+def test_parse_traceparent(value, expected):
+    assert parse_traceparent(value) == expected
+
+
+def test_file_exporter(tmp_path):
+    path = tmp_path.joinpath('traces/spans.ndjson')
+    exporter = FileExporter(path)
+    asyncio.run(exporter.export([{'name': 'first'}, {'name': 'second'}]))
+    asyncio.run(exporter.export([{'name': 'third'}]))
+    assert [json.loads(line)['name'] for line in path.read_text().splitlines()] == ['first', 'second', 'third']
+
+
+def test_abstract_exporter():
+    with pytest.raises(TypeError):
+        Exporter()
+
+
+class FailingExporter(Exporter):
+
+    async def export(self, spans: list[dict]) -> None:
+        raise RuntimeError('collector down')
+
+
+def test_export_error():
+    local = Tracer(batch_size=1)
+    local.configure(FailingExporter())
+    for name in ('first', 'second'):
+        with local.span(name):
+            pass
+    asyncio.run(local.flush())
+    assert local.dropped == 1
+    assert local.stats()['queued'] == 1
+
+
+class TestTracing:
+
+    def test_request_spans(self, stub_client: TestClient, backend: PostgrestStub, exported: MemoryExporter):
+        response = stub_client.get(
+            '/api/v1.0/recipes/?limit=5',
+            headers={'traceparent': f'00-{TRACE_ID}-{PARENT_ID}-01'})
+        assert response.status_code == status.HTTP_200_OK
+        spans = _spans(stub_client, exported)
+
+        server = spans['GET /api/v1.0/recipes/']
+        assert (server['traceId'], server['parentSpanId'], server['kind']) == (TRACE_ID, PARENT_ID, 2)
+        assert {'key': 'http.response.status_code', 'value': {'intValue': '200'}} in server['attributes']
+        assert spans['Repository.get_client']['parentSpanId'] == server['spanId']
+        controller = spans['RecipesController.select']
+        assert controller['parentSpanId'] == server['spanId']
+        client = next(span for span in exported.spans if span['kind'] == 3)
+        assert client['parentSpanId'] == controller['spanId']
+        assert spans['validate']['parentSpanId'] == controller['spanId']
+        assert spans['serialize']['parentSpanId'] == server['spanId']
+        assert {span['traceId'] for span in exported.spans} == {TRACE_ID}
+
+        # The context is propagated to PostgREST
+        traceparent = parse_traceparent(backend.table_requests('recipes_full')[-1].headers['traceparent'])
+        assert traceparent == (TRACE_ID, client['spanId'], True)
+
+    def test_not_sampled(self, stub_client: TestClient, backend: PostgrestStub, exported: MemoryExporter):
+        tracer.configure(exported, sample_ratio=0.0)
+        response = stub_client.get('/api/v1.0/recipes/?limit=5')
+        assert response.status_code == status.HTTP_200_OK
+        assert _spans(stub_client, exported) == {}
+        assert parse_traceparent(backend.table_requests('recipes_full')[-1].headers['traceparent'])[2] is False
+
+    def test_disabled(self, stub_client: TestClient, backend: PostgrestStub):
+        response = stub_client.get('/api/v1.0/recipes/?limit=5')
+        assert response.status_code == status.HTTP_200_OK
+        assert 'traceparent' not in backend.table_requests('recipes_full')[-1].headers
@@ -0,0 +1,92 @@
+import os
+import json
+import hashlib
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app.core.settings import settings
+from app.storage import LocalStorage
+from tests.backend import PostgrestStub
+
+PNG = b'\x89PNG\r\n\x1a\n' + os.urandom(4096)
+RECIPE = {
+    'title': 'Uploaded recipe with an image',
+    'description': 'A recipe',
+    'ingredients': 'flour, water',
+    'instructions': 'Mix them',
+}
+
+
+@pytest.fixture(name='local_storage')
+def local_storage(tmp_path, monkeypatch) -> LocalStorage:
+    backend = LocalStorage(tmp_path, 'http://testserver/media')
+    monkeypatch.setattr('app.routers.v1.recipe.storage', backend)
+    return backend
+
+
+def _files(storage: LocalStorage) -> list:
+    return [path for path in storage.root.rglob('*') if path.is_file()]
+
+
+class TestAPIRecipeUpload:
+
+    def _post(self, client: TestClient, token: str, image=None, recipe=RECIPE):
+        return client.post(
+            '/api/v1.0/recipes/',
+            data={'recipe_new': json.dumps(recipe)},
+            files={'image': image} if image else None,
+            headers={'Authorization': f'Bearer {token}'})
+
+    def test_unauthenticated(self, stub_client: TestClient, local_storage: LocalStorage):
+        response = stub_client.post('/api/v1.0/recipes/', data={'recipe_new': json.dumps(RECIPE)})
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_upload_and_dedup(
+            self,
+            stub_client: TestClient,
+            backend: PostgrestStub,
+            local_storage: LocalStorage,
+            token: str):
+        urls = []
+        for name in ('first.png', 'second.png'):
+            response = self._post(stub_client, token, (name, PNG, 'image/png'))
+            assert response.status_code == status.HTTP_201_CREATED
+            urls.append(response.json()['data']['image'])
+
+        digest = hashlib.sha256(PNG).hexdigest()
+        assert urls == [f'http://testserver/media/images/{digest[:2]}/{digest}.png'] * 2
+        assert _files(local_storage) == [local_storage.root.joinpath(f'images/{digest[:2]}/{digest}.png')]
+        assert _files(local_storage)[0].read_bytes() == PNG
+        assert backend.tables['recipes_full'][-1]['image'] == urls[0]
+
+    def test_without_image(self, stub_client: TestClient, local_storage: LocalStorage, token: str):
+        response = self._post(stub_client, token)
+        assert response.status_code == status.HTTP_201_CREATED
+        assert 'image' not in response.json()['data']
+        assert _files(local_storage) == []
+
+    def test_limits(self, stub_client: TestClient, local_storage: LocalStorage, token: str, monkeypatch):
+        monkeypatch.setattr(settings, 'IMAGE_MAX_SIZE', 1024)
+        response = self._post(stub_client, token, ('large.png', PNG, 'image/png'))
+        assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+
+        response = self._post(stub_client, token, ('large.png', PNG * 32, 'image/png'))
+        assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        assert _files(local_storage) == []
+
+    @pytest.mark.parametrize('image', [
+        ('fake.png', b'GIF89a' + PNG, 'image/png'),
+        ('notes.txt', b'plain text content', 'text/plain'),
+        ('tiny.png', b'\x89PNG', 'image/png'),
+    ])
+    def test_unsupported_type(self, stub_client: TestClient, local_storage: LocalStorage, token: str, image):
+        response = self._post(stub_client, token, image)
+        assert response.status_code == status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+        assert _files(local_storage) == []
+
+    def test_invalid_recipe(self, stub_client: TestClient, local_storage: LocalStorage, token: str):
+        response = self._post(stub_client, token, ('image.png', PNG, 'image/png'), {'title': 'short'})
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert _files(local_storage) == []
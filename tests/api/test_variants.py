@@ -0,0 +1,123 @@
+import os
+import json
+import shutil
+import asyncio
+import tempfile
+import hashlib
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app.storage import LocalStorage, ImageProcessor, ProcessingBusy, VARIANTS
+from tests.backend import PostgrestStub
+
+PNG = b'\x89PNG\r\n\x1a\n' + os.urandom(4096)
+RECIPE = {
+    'title': 'Uploaded recipe with variants',
+    'description': 'A recipe',
+    'ingredients': 'flour, water',
+    'instructions': 'Mix them',
+}
+
+
+def copy_renderer(source, directory, sizes, formats, quality):
+    """Stand-in of the renderer without Pillow, run in the pool"""
+    variants = []
+    for name in sizes:
+        for format_name in formats:
+            descriptor, path = tempfile.mkstemp(dir=directory, suffix=f'.{format_name}')
+            os.close(descriptor)
+            shutil.copyfile(source, path)
+            variants.append((name, format_name, path, os.path.getsize(path)))
+    return variants
+
+
+@pytest.fixture(name='local_storage')
+def local_storage(tmp_path, monkeypatch) -> LocalStorage:
+    backend = LocalStorage(tmp_path, 'http://testserver/media')
+    monkeypatch.setattr('app.routers.v1.recipe.storage', backend)
+    return backend
+
+
+@pytest.fixture(name='processor')
+def image_processor(monkeypatch) -> ImageProcessor:
+    processor = ImageProcessor(workers=1, queue_depth=1, renderer=copy_renderer)
+    processor.formats = ('webp',)
+    monkeypatch.setattr('app.routers.v1.recipe.processor', processor)
+    yield processor
+    processor.shutdown()
+
+
+class TestImageVariants:
+
+    def _post(self, client: TestClient, token: str):
+        return client.post(
+            '/api/v1.0/recipes/',
+            data={'recipe_new': json.dumps(RECIPE)},
+            files={'image': ('image.png', PNG, 'image/png')},
+            headers={'Authorization': f'Bearer {token}'})
+
+    def test_variants_stored(
+            self,
+            stub_client: TestClient,
+            backend: PostgrestStub,
+            local_storage: LocalStorage,
+            processor: ImageProcessor,
+            token: str):
+        response = self._post(stub_client, token)
+        assert response.status_code == status.HTTP_201_CREATED
+
+        # The background task runs before the test client returns
+        digest = hashlib.sha256(PNG).hexdigest()
+        prefix = f'http://testserver/media/images/{digest[:2]}/{digest}'
+        recipe = backend.tables['recipes_full'][-1]
+        assert recipe['image'] == f'{prefix}.png'
+        assert recipe['images'] == {name: {'webp': f'{prefix}/{name}.webp'} for name in VARIANTS}
+        assert processor.stats() == {'pending': 0, 'processed': 1, 'rejected': 0}
+        assert processor._pool._mp_context.get_start_method() == 'spawn'
+        assert list(local_storage.staging.iterdir()) == []
+        assert local_storage.root.joinpath(f'images/{digest[:2]}/{digest}/card.webp').read_bytes() == PNG
+
+    def test_queue_full(
+            self,
+            stub_client: TestClient,
+            backend: PostgrestStub,
+            local_storage: LocalStorage,
+            processor: ImageProcessor,
+            token: str):
+        processor.pending = processor.workers + processor.queue_depth
+        response = self._post(stub_client, token)
+        assert response.status_code == status.HTTP_201_CREATED
+        assert backend.tables['recipes_full'][-1].get('images') is None
+        assert processor.rejected == 1
+        assert list(local_storage.staging.iterdir()) == []
+
+        with pytest.raises(ProcessingBusy):
+            asyncio.run(processor.variants(local_storage.root, local_storage.staging))
+
+    def test_without_pillow(
+            self,
+            stub_client: TestClient,
+            backend: PostgrestStub,
+            local_storage: LocalStorage,
+            processor: ImageProcessor,
+            token: str):
+        processor.formats = ()
+        response = self._post(stub_client, token)
+        assert response.status_code == status.HTTP_201_CREATED
+        assert backend.tables['recipes_full'][-1].get('images') is None
+        assert processor.stats()['processed'] == 0
+        assert list(local_storage.staging.iterdir()) == []
+
+    def test_render(self, tmp_path):
+        image_module = pytest.importorskip('PIL.Image')
+        source = tmp_path.joinpath('source.png')
+        image_module.new('RGB', (2000, 1000), 'orange').save(source)
+        processor = ImageProcessor(1, 0)
+        rendered = asyncio.run(processor.variants(source, tmp_path))
+        processor.shutdown()
+        assert {name for name, _, _ in rendered} == set(VARIANTS)
+        for name, _, file in rendered:
+            with image_module.open(file.path) as variant:
+                assert max(variant.size) == VARIANTS[name]
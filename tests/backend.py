@@ -0,0 +1,367 @@
+"""Local stand-in of the Supabase PostgREST API used by the tests
+
+    Implements the subset of the PostgREST syntax issued by the controllers
+    over in-memory tables seeded from ``app/db/dummy/data.json``
+"""
+import re
+import json
+import uuid
+import copy
+from pathlib import Path
+from datetime import datetime, timezone
+
+import httpx
+
+DATA_FILE = Path(__file__).absolute().parent.parent.joinpath('app/db/dummy/data.json')
+
+SINGLE_OBJECT = 'application/vnd.pgrst.object+json'
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _split_top(value: str, sep: str = ',') -> list[str]:
+    """Split a logic tree expression only at the top level"""
+    parts, depth, current = [], 0, ''
+    for char in value:
+        if char in '({':
+            depth += 1
+        elif char in ')}':
+            depth -= 1
+        if char == sep and depth == 0:
+            parts.append(current)
+            current = ''
+            continue
+        current += char
+    if current:
+        parts.append(current)
+    return parts
+
+
+def _unquote(value: str) -> str:
+    if len(value) > 1 and value[0] == value[-1] == '"':
+        return value[1:-1]
+    return value
+
+
+def _as_list(value: str) -> list[str]:
+    return [_unquote(item) for item in _split_top(value.strip('(){}'))]
+
+
+def _compare(value, operator: str, criteria: str) -> bool:
+    if operator == 'not':
+        operator, _, criteria = criteria.partition('.')
+        return not _compare(value, operator, criteria)
+    if operator == 'is':
+        return value is None if criteria == 'null' else value is not None
+    if value is None:
+        return False
+    if operator in ('cs', 'ov', 'cd'):
+        values = set(_as_list(criteria))
+        current = {str(item) for item in value}
+        if operator == 'cs':
+            return values <= current
+        if operator == 'cd':
+            return current <= values
+        return bool(values & current)
+    if operator == 'in':
+        return str(value) in _as_list(criteria)
+    if operator in ('like', 'ilike'):
+        pattern = re.escape(criteria).replace(r'\*', '.*').replace('%', '.*')
+        flags = re.IGNORECASE if operator == 'ilike' else 0
+        return re.fullmatch(pattern, str(value), flags) is not None
+    value, criteria = _comparable(str(value), _unquote(criteria))
+    return {
+        'eq': value == criteria,
+        'neq': value != criteria,
+        'gt': value > criteria,
+        'gte': value >= criteria,
+        'lt': value < criteria,
+        'lte': value <= criteria,
+    }[operator]
+
+
+def _comparable(value: str, criteria: str) -> tuple:
+    """Timestamps are compared as dates as PostgreSQL does, whatever
+        their ISO format, the other values as strings
+    """
+    try:
+        dates = datetime.fromisoformat(value), datetime.fromisoformat(criteria)
+    except ValueError:
+        return value, criteria
+    return tuple(date if date.tzinfo else date.replace(tzinfo=timezone.utc) for date in dates)
+
+
+def _search_recipes(stub: 'PostgrestStub', payload: dict) -> list[dict]:
+    """Approximation of the ``search_recipes`` function of the migrations,
+        terms matched over the weighted text columns and a prefix fallback
+    """
+    term = payload['q'].strip().lower()
+    terms = re.findall(r'\w+', term)
+    rows = []
+    if len(term) >= 3 and terms:
+        for recipe in stub.tables['recipes_full']:
+            rank = sum(
+                weight * str(recipe.get(column) or '').lower().split().count(word)
+                for word in terms
+                for column, weight in (('title', 1.0), ('description', 0.4), ('ingredients', 0.2))
+            )
+            if all(
+                    any(word in str(recipe.get(column) or '').lower().split()
+                        for column in ('title', 'description', 'ingredients'))
+                    for word in terms):
+                rows.append({**recipe, 'rank': rank})
+    if not rows:
+        rows = [
+            {**recipe, 'rank': 0.1}
+            for recipe in stub.tables['recipes_full']
+            if recipe['title'].lower().startswith(term)
+        ]
+    return rows
+
+
+def _insert_recipe(stub: 'PostgrestStub', payload: dict) -> dict:
+    """Approximation of the ``insert_recipe`` function, the stored recipe"""
+    recipe = {
+        **payload['recipe_json'],
+        'id': payload['recipe_json'].get('id') or str(uuid.uuid4()),
+        'created_at': _now(),
+        'updated_at': _now(),
+    }
+    stub.tables['recipes_full'].append(recipe)
+    return recipe
+
+
+def _insert_recipes(stub: 'PostgrestStub', payload: dict) -> int:
+    """Approximation of the ``insert_recipes`` function of the migrations,
+        the recipes with an id already stored are skipped
+    """
+    stored = {recipe['id'] for recipe in stub.tables['recipes_full']}
+    inserted = 0
+    for recipe in payload['recipes_json']:
+        if recipe['id'] in stored:
+            continue
+        stored.add(recipe['id'])
+        stub.tables['recipes_full'].append({
+            **recipe,
+            'created_at': _now(),
+            'updated_at': _now(),
+            'tag_ids': recipe.get('tags') or [],
+        })
+        inserted += 1
+    return inserted
+
+
+def _logic(row: dict, expression: str, conjunction: bool) -> bool:
+    """Evaluate ``or=(...)``/``and=(...)`` logic trees"""
+    results = []
+    for term in _split_top(expression.strip()[1:-1]):
+        if term.startswith(('and(', 'or(')):
+            name, _, rest = term.partition('(')
+            results.append(_logic(row, f'({rest}', name == 'and'))
+            continue
+        column, operator, criteria = term.split('.', 2)
+        results.append(_compare(row.get(column), operator, criteria))
+    return all(results) if conjunction else any(results)
+
+
+class PostgrestStub:
+    """In-memory PostgREST compatible backend
+
+        Can be mounted as an ``httpx.MockTransport`` handler or served as
+        an ASGI application through the ``asgi`` coroutine
+    """
+    RESERVED = {'select', 'order', 'limit', 'offset', 'or', 'and', 'on_conflict', 'columns'}
+    # Unique columns of the tables besides the id
+    UNIQUE = {'tags': 'name', 'categories': 'name'}
+
+    def __init__(self, data_file: Path = DATA_FILE) -> None:
+        self.requests: list[httpx.Request] = []
+        self.rpcs = {
+            'search_recipes': _search_recipes,
+            'insert_recipe': _insert_recipe,
+            'insert_recipes': _insert_recipes,
+        }
+        self.tables: dict[str, list[dict]] = {
+            'tags': [],
+            'categories': [],
+            'recipes_full': []
+        }
+        self.load(json.loads(data_file.read_text()))
+
+    def load(self, records: list[dict]) -> None:
+        tags, categories = {}, {}
+        for record in records:
+            record = copy.deepcopy(record)
+            for tag in record.get('tags') or []:
+                tags.setdefault(tag['id'], tag)
+            if record.get('category'):
+                categories.setdefault(record['category']['id'], record['category'])
+            record.setdefault('ingredients', record['description'])
+            record['category_id'] = (record.get('category') or {}).get('id')
+            record['tag_ids'] = [tag['id'] for tag in record.get('tags') or []]
+            self.tables['recipes_full'].append(record)
+        self.tables['tags'].extend(tags.values())
+        self.tables['categories'].extend(categories.values())
+        self.tables['recipes'] = self.tables['recipes_full']
+
+    def table_requests(self, table: str) -> list[httpx.Request]:
+        return [
+            request for request in self.requests
+            if request.url.path.endswith(f'/{table}')
+        ]
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        path = request.url.path.split('/rest/v1/', 1)[-1]
+        if path.startswith('rpc/'):
+            handler = self.rpcs.get(path[len('rpc/'):])
+            if handler is None:
+                return self._error(404, 'PGRST202', 'Could not find the function')
+            result = handler(self, json.loads(request.content or b'{}'))
+            if isinstance(result, httpx.Response):
+                return result
+            if isinstance(result, list):
+                return self._query(result, request)
+            return httpx.Response(200, json=result)
+        if path not in self.tables:
+            return self._error(404, '42P01', f'relation "{path}" does not exist')
+        return getattr(self, f'_{request.method.lower()}')(path, request)
+
+    async def asgi(self, scope, receive, send) -> None:
+        if scope['type'] != 'http':
+            return
+        body = b''
+        more_body = True
+        while more_body:
+            message = await receive()
+            body += message.get('body', b'')
+            more_body = message.get('more_body', False)
+        query = scope['query_string'].decode()
+        request = httpx.Request(
+            scope['method'],
+            f'http://stub{scope["path"]}' + (f'?{query}' if query else ''),
+            headers=[(key.decode(), value.decode()) for key, value in scope['headers']],
+            content=body
+        )
+        response = self(request)
+        await send({
+            'type': 'http.response.start',
+            'status': response.status_code,
+            'headers': [
+                (key.encode(), value.encode())
+                for key, value in response.headers.items()
+            ],
+        })
+        await send({'type': 'http.response.body', 'body': response.content})
+
+    @staticmethod
+    def _error(status: int, code: str, message: str, details: str | None = None) -> httpx.Response:
+        return httpx.Response(
+            status,
+            json={'code': code, 'message': message, 'details': details, 'hint': None}
+        )
+
+    def _filter(self, rows: list[dict], params: httpx.QueryParams) -> list[dict]:
+        for key, value in params.multi_items():
+            if key in ('or', 'and'):
+                rows = [row for row in rows if _logic(row, value, key == 'and')]
+            elif key not in self.RESERVED:
+                operator, _, criteria = value.partition('.')
+                rows = [row for row in rows if _compare(row.get(key), operator, criteria)]
+        return rows
+
+    @staticmethod
+    def _project(row: dict, select: str | None) -> dict:
+        if not select or select == '*':
+            return copy.deepcopy(row)
+        columns = [column.split(':')[-1].split('(')[0] for column in _split_top(select)]
+        if '*' in columns:
+            return copy.deepcopy(row)
+        return {column: copy.deepcopy(row.get(column)) for column in columns}
+
+    def _get(self, table: str, request: httpx.Request) -> httpx.Response:
+        return self._query(self.tables[table], request)
+
+    def _query(self, rows: list[dict], request: httpx.Request) -> httpx.Response:
+        params = request.url.params
+        rows = self._filter(rows, params)
+        for order in reversed(params.get('order', '').split(',') if params.get('order') else []):
+            column, *flags = order.split('.')
+            rows = sorted(
+                rows,
+                key=lambda row: (row.get(column) is None, row.get(column)
+                                 if isinstance(row.get(column), (int, float)) else str(row.get(column))),
+                reverse='desc' in flags)
+        total = len(rows)
+        start = int(params.get('offset', 0))
+        end = start + int(params['limit']) if 'limit' in params else None
+        if (range_header := request.headers.get('range')):
+            first, _, last = range_header.partition('-')
+            start, end = int(first), int(last) + 1
+        rows = [self._project(row, params.get('select')) for row in rows[start:end]]
+        headers = {}
+        if 'count=' in request.headers.get('prefer', ''):
+            last = start + len(rows) - 1 if rows else '*'
+            headers['content-range'] = f'{start}-{last}/{total}' if rows else f'*/{total}'
+        if SINGLE_OBJECT in request.headers.get('accept', ''):
+            if len(rows) != 1:
+                return self._error(
+                    406, 'PGRST116',
+                    'JSON object requested, multiple (or no) rows returned',
+                    f'The result contains {len(rows)} rows')
+            return httpx.Response(200, json=rows[0], headers=headers)
+        if request.method == 'HEAD':
+            return httpx.Response(200, headers=headers)
+        return httpx.Response(200, json=rows, headers=headers)
+
+    _head = _get
+
+    def _post(self, table: str, request: httpx.Request) -> httpx.Response:
+        payload = json.loads(request.content)
+        items = payload if isinstance(payload, list) else [payload]
+        prefer = request.headers.get('prefer', '')
+        conflict = request.url.params.get('on_conflict', 'id')
+        stored = []
+        for item in items:
+            existing = next(
+                (row for row in self.tables[table] if item.get(conflict) is not None
+                 and row.get(conflict) == item.get(conflict)),
+                None)
+            if existing is not None:
+                if 'resolution=ignore-duplicates' in prefer:
+                    continue
+                if 'resolution=merge-duplicates' not in prefer:
+                    return self._error(409, '23505', 'duplicate key value violates unique constraint')
+                existing.update(item, updated_at=_now())
+                stored.append(existing)
+                continue
+            row = {'id': str(uuid.uuid4()), 'created_at': _now(), 'updated_at': _now(), **item}
+            self.tables[table].append(row)
+            stored.append(row)
+        return self._written(stored, request, status=201)
+
+    def _patch(self, table: str, request: httpx.Request) -> httpx.Response:
+        changes = json.loads(request.content)
+        rows = self._filter(self.tables[table], request.url.params)
+        if (column := self.UNIQUE.get(table)) in changes and any(
+                row.get(column) == changes[column] and row not in rows
+                for row in self.tables[table]):
+            return self._error(409, '23505', 'duplicate key value violates unique constraint')
+        for row in rows:
+            row.update(changes, updated_at=_now())
+        return self._written(rows, request)
+
+    def _delete(self, table: str, request: httpx.Request) -> httpx.Response:
+        rows = self._filter(self.tables[table], request.url.params)
+        self.tables[table][:] = [row for row in self.tables[table] if row not in rows]
+        return self._written(rows, request)
+
+    def _written(self, rows: list[dict], request: httpx.Request, status: int = 200) -> httpx.Response:
+        headers = {}
+        if 'count=' in request.headers.get('prefer', ''):
+            headers['content-range'] = f'*/{len(rows)}'
+        if 'return=minimal' in request.headers.get('prefer', ''):
+            return httpx.Response(204 if status == 200 else status, headers=headers)
+        return httpx.Response(status, json=copy.deepcopy(rows), headers=headers)
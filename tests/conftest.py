@@ -1,10 +1,18 @@
+import time
+import uuid
 from pathlib import Path
 
+import jwt
+import httpx
 import pytest
 from dotenv import dotenv_values
 from fastapi.testclient import TestClient
 
 from app.main import app
+from app.db import Repository
+from app.controller import TagsController, CategoriesController
+from app.core.settings import settings
+from tests.backend import PostgrestStub
 
 
 @pytest.fixture(scope='session', name='client')
@@ -37,3 +45,44 @@ def login(client: TestClient):
         timeout=500
     )
     yield response.json()
+
+
+@pytest.fixture(name='backend')
+def stub_backend():
+    """In-memory stand-in of the Supabase PostgREST API"""
+    return PostgrestStub()
+
+
+@pytest.fixture(name='stub_client')
+def stub_app_client(backend: PostgrestStub):
+    """Test client with the Supabase pool served by the stand-in backend"""
+    for controller in (TagsController, CategoriesController):
+        controller._cache.clear()
+    with TestClient(app, headers={'Accept': 'application/json'}) as client:
+        client.portal.call(Repository.init_pool, httpx.MockTransport(backend))
+        yield client
+
+
+@pytest.fixture
+def token() -> str:
+    """Access token signed with the API secret"""
+    now = int(time.time())
+    return jwt.encode(
+        {
+            'aud': 'authenticated',
+            'exp': now + 600,
+            'iat': now,
+            'iss': 'http://localhost/login',
+            'sub': str(uuid.uuid4()),
+            'email': 'tester@example.com',
+            'phone': '',
+            'app_metadata': {'provider': 'email', 'providers': ['email']},
+            'user_metadata': {},
+            'role': 'authenticated',
+            'aal': 'aal1',
+            'amr': [{'method': 'password', 'timestamp': now}],
+            'session_id': str(uuid.uuid4()),
+        },
+        key=settings.SECRET.get_secret_value(),
+        algorithm=settings.ALGORITHM
+    )